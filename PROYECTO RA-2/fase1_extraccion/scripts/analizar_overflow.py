@@ -1,10 +1,10 @@
 """Analizar campos numéricos que causan overflow"""
-import pandas as pd
-import numpy as np
+from delta_query import get_engine
 
-df_markets = pd.read_csv("data/exported/markets_20260216_193645.csv", low_memory=False)
+engine = get_engine()
+market_columns = set(engine.columns('markets'))
 
-print("Analizando campos numericos en markets_CSV...\n")
+print("Analizando campos numericos en markets...\n")
 
 # Columnas numericas que se insertan en fact_market_metrics
 numeric_cols = [
@@ -18,40 +18,47 @@ numeric_cols = [
     'oneMonthPriceChange', 'oneYearPriceChange',
     'fee', 'takerBaseFee', 'makerBaseFee', 'competitive'
 ]
+present_cols = [col for col in numeric_cols if col in market_columns]
+
+# Una sola pasada sobre la tabla: max, min y conteo de overflow por columna
+# NUMERIC(20,10) limit: abs(value) < 10^10
+aggregates = []
+for col in present_cols:
+    value = f'TRY_CAST("{col}" AS DOUBLE)'
+    aggregates.append(f'MAX({value}) AS "{col}__max"')
+    aggregates.append(f'MIN({value}) AS "{col}__min"')
+    aggregates.append(f'COUNT(*) FILTER (WHERE ABS({value}) >= 1e10) AS "{col}__overflow"')
+
+stats = engine.query(f"SELECT {', '.join(aggregates)} FROM markets").to_pylist()[0] if present_cols else {}
 
 print("MAXIMOS POR COLUMNA:")
 print("="*80)
 
 for col in numeric_cols:
-    if col in df_markets.columns:
-        # Convertir a numeric ignorando errores
-        values = pd.to_numeric(df_markets[col], errors='coerce')
-        
-        max_val = values.max()
-        min_val = values.min()
+    if col in market_columns:
+        max_val = stats[f"{col}__max"]
+        min_val = stats[f"{col}__min"]
         
-        # Verificar si excede NUMERIC(20,10) limit: abs(value) < 10^10
-        exceeds = False
-        if pd.notna(max_val) and abs(max_val) >= 10**10:
-            exceeds = True
-        if pd.notna(min_val) and abs(min_val) >= 10**10:
-            exceeds = True
+        flag = "!!! OVERFLOW" if stats[f"{col}__overflow"] else ""
         
-        flag = "!!! OVERFLOW" if exceeds else ""
-        
-        print(f"{col:25s} | MAX: {max_val:20.2f} | MIN: {min_val:20.2f} {flag}")
+        max_str = f"{max_val:20.2f}" if max_val is not None else f"{'nan':>20s}"
+        min_str = f"{min_val:20.2f}" if min_val is not None else f"{'nan':>20s}"
+        print(f"{col:25s} | MAX: {max_str} | MIN: {min_str} {flag}")
     else:
-        print(f"{col:25s} | NO EXISTE EN CSV")
+        print(f"{col:25s} | NO EXISTE EN LA TABLA")
 
 print("\n" + "="*80)
 print("\nBuscando valores especificos que excedan 10^10...")
 
-for col in numeric_cols:
-    if col in df_markets.columns:
-        values = pd.to_numeric(df_markets[col], errors='coerce')
-        overflow_mask = values.abs() >= 10**10
-        
-        if overflow_mask.any():
-            overflow_count = overflow_mask.sum()
-            print(f"\n{col}: {overflow_count:,} valores exceden 10^10")
-            print(f"  Valores: {values[overflow_mask].head(5).tolist()}")
+for col in present_cols:
+    overflow_count = stats[f"{col}__overflow"]
+    
+    if overflow_count:
+        examples = engine.query(f"""
+            SELECT TRY_CAST("{col}" AS DOUBLE) AS value
+            FROM markets
+            WHERE ABS(TRY_CAST("{col}" AS DOUBLE)) >= 1e10
+            LIMIT 5
+        """).column('value').to_pylist()
+        print(f"\n{col}: {overflow_count:,} valores exceden 10^10")
+        print(f"  Valores: {examples}")
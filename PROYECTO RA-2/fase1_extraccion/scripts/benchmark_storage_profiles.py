@@ -0,0 +1,127 @@
+"""
+Benchmark de perfiles de almacenamiento Parquet
+Reescribe cada tabla Delta con cada perfil de STORAGE_PROFILES en un
+directorio temporal y compara tiempo de escritura, tamaño en disco,
+tiempo de lectura completa y tiempo de lectura selectiva (proyección +
+filtro sobre id).
+
+Uso:
+    python benchmark_storage_profiles.py                # events y markets
+    python benchmark_storage_profiles.py tags series    # tablas concretas
+"""
+import os
+import shutil
+import sys
+import time
+from typing import Dict, List
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from deltalake import DeltaTable, write_deltalake
+
+from config import STORAGE_PROFILES
+from delta_utils import DeltaLakeManager, build_writer_properties
+
+BENCHMARK_DIR = os.path.join("tmp", "benchmark_storage_profiles")
+
+# Columnas leídas en la prueba de lectura selectiva (si existen)
+SELECTIVE_COLUMNS = ["id", "volume", "liquidity", "category", "active"]
+
+
+def directory_size(path: str) -> int:
+    """Tamaño en bytes de los archivos de datos de una tabla Delta"""
+    total = 0
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith("_")]
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def timed(func):
+    """Ejecuta func y retorna (resultado, segundos)"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def benchmark_table(table: pa.Table, table_name: str) -> List[Dict]:
+    """Mide cada perfil sobre una tabla Arrow ya cargada en memoria"""
+    results = []
+    selective_columns = [c for c in SELECTIVE_COLUMNS if c in table.column_names]
+
+    # Muestra de ids para el filtro selectivo (~1% de la tabla)
+    ids = table.column("id").cast(pa.string())
+    sample_ids = ids.take(pa.array(range(0, len(ids), 100))).to_pylist() if len(ids) else []
+
+    for profile_name, profile in STORAGE_PROFILES.items():
+        path = os.path.join(BENCHMARK_DIR, profile_name, table_name)
+        shutil.rmtree(path, ignore_errors=True)
+
+        _, write_seconds = timed(lambda: write_deltalake(
+            path,
+            table,
+            mode="overwrite",
+            engine="rust",
+            writer_properties=build_writer_properties(profile, table.column_names)
+        ))
+
+        dt = DeltaTable(path)
+        _, full_scan_seconds = timed(lambda: dt.to_pyarrow_table())
+
+        def selective_scan():
+            dataset = dt.to_pyarrow_dataset()
+            return dataset.to_table(
+                columns=selective_columns,
+                filter=pc.field("id").cast(pa.string()).isin(sample_ids)
+            )
+
+        selected, selective_seconds = timed(selective_scan)
+
+        results.append({
+            "profile": profile_name,
+            "size_mb": directory_size(path) / (1024 * 1024),
+            "files": len(dt.files()),
+            "write_s": write_seconds,
+            "full_scan_s": full_scan_seconds,
+            "selective_scan_s": selective_seconds,
+            "selected_rows": selected.num_rows
+        })
+
+    return results
+
+
+def print_results(table_name: str, num_rows: int, results: List[Dict]):
+    """Imprime la comparación de perfiles de una tabla"""
+    print(f"\n📊 {table_name.upper()} ({num_rows:,} registros)")
+    print("-" * 90)
+    print(f"{'Perfil':18s} {'Tamaño (MB)':>12s} {'Archivos':>9s} {'Escritura (s)':>14s} "
+          f"{'Lectura (s)':>12s} {'Selectiva (s)':>14s}")
+    for r in results:
+        print(f"{r['profile']:18s} {r['size_mb']:12.2f} {r['files']:9d} {r['write_s']:14.3f} "
+              f"{r['full_scan_s']:12.3f} {r['selective_scan_s']:14.3f}")
+
+
+def main():
+    """Función principal"""
+    print("\n" + "=" * 90)
+    print(" BENCHMARK DE PERFILES DE ALMACENAMIENTO ".center(90))
+    print("=" * 90)
+
+    manager = DeltaLakeManager()
+    tables = sys.argv[1:] or ["events", "markets"]
+
+    for table_name in tables:
+        table = manager.read_arrow_table(table_name)
+        if table is None:
+            print(f"\n✗ No se pudo leer la tabla {table_name}")
+            continue
+
+        print_results(table_name, table.num_rows, benchmark_table(table, table_name))
+
+    shutil.rmtree(BENCHMARK_DIR, ignore_errors=True)
+    print("\n" + "=" * 90)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,31 +21,20 @@ def main():
         print(f"\nTabla: {table_name.upper()}")
         print("-" * 60)
         
-        # Obtener información de la tabla
-        info = manager.get_table_info(table_name)
+        # Estadísticas desde el log Delta y los footers Parquet (sin leer datos)
+        stats = manager.get_table_stats(table_name)
         
-        if info:
-            print(f"Versión actual: {info['version']}")
-            print(f"Número de archivos: {len(info['files'])}")
-            
-            # Calcular tamaño total
-            total_size = 0
-            for file_path in info['files']:
-                full_path = os.path.join(info['path'], file_path)
-                if os.path.exists(full_path):
-                    total_size += os.path.getsize(full_path)
-            print(f"Tamaño total: {total_size / (1024*1024):.2f} MB")
-            
-            # Leer la tabla
-            df = manager.read_delta_table(table_name)
-            if df is not None:
-                print(f"Registros: {len(df)}")
-                print(f"Columnas: {len(df.columns)}")
-                print(f"Columnas: {', '.join(df.columns[:10])}")
-                if len(df.columns) > 10:
-                    print(f"          ... y {len(df.columns) - 10} más")
+        if "error" not in stats:
+            print(f"Versión actual: {stats['version']}")
+            print(f"Número de archivos: {stats['num_files']}")
+            print(f"Tamaño total: {stats['size_mb']:.2f} MB")
+            print(f"Registros: {stats['records']}")
+            print(f"Columnas: {stats['columns']}")
+            print(f"Columnas: {', '.join(stats['column_names'][:10])}")
+            if stats['columns'] > 10:
+                print(f"          ... y {stats['columns'] - 10} más")
         else:
-            print("No se pudo obtener información de la tabla")
+            print(f"No se pudo obtener información de la tabla: {stats['error']}")
     
     print("\n" + "="*60)
     print("COMPARACIÓN CON ARCHIVOS JSON")
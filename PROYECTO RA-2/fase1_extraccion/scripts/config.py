@@ -25,6 +25,7 @@ EXTRACTION_CONFIG = {
 DATA_DIR = "data"
 LOGS_DIR = "logs"
 DELTA_DIR = "delta_lake"  # Directorio para tablas Delta Lake
+SILVER_DIR = "delta_lake/silver"  # Tablas Delta tipadas (capa Silver)
 
 # Configuración de archivos JSON (legacy)
 JSON_CONFIG = {
@@ -35,11 +36,193 @@ JSON_CONFIG = {
 # Configuración Delta Lake
 DELTA_CONFIG = {
     "storage_format": "parquet",
-    "compression": "snappy",
+    "storage_profile": "write_optimized",  # Perfil por defecto (ver STORAGE_PROFILES)
     "enable_schema_evolution": True,
     "enable_versioning": True
 }
 
+# Perfiles de almacenamiento Parquet aplicados en cada escritura Delta
+# compression / compression_level: códec y nivel (ZSTD admite 1-22)
+# max_row_group_size: filas por row group; data_page_size_limit: bytes por página
+# dictionary_columns: columnas con codificación diccionario (el resto sin ella)
+# bloom_filter_columns: columnas con filtro de Bloom Parquet en el footer
+# max_statistics_size: tamaño máximo (bytes) de min/max por columna en el footer
+# indexed_columns: primeras N columnas con estadísticas en el log Delta
+#                  (solo se aplica al crear la tabla)
+STORAGE_PROFILES = {
+    # Escritura rápida: códec ligero, row groups pequeños, sin Bloom
+    "write_optimized": {
+        "compression": "SNAPPY",
+        "compression_level": None,
+        "max_row_group_size": 128 * 1024,
+        "data_page_size_limit": 1024 * 1024,
+        "dictionary_columns": [],
+        "bloom_filter_columns": [],
+        "max_statistics_size": 1024,
+        "indexed_columns": 32
+    },
+    # Lectura analítica: ZSTD, row groups grandes, diccionario en columnas
+    # de baja cardinalidad y estadísticas en todas las columnas
+    "scan_optimized": {
+        "compression": "ZSTD",
+        "compression_level": 6,
+        "max_row_group_size": 1024 * 1024,
+        "data_page_size_limit": 1024 * 1024,
+        "dictionary_columns": [
+            "category", "subcategory", "marketType", "active", "closed",
+            "archived", "restricted", "featured", "new", "resolutionSource",
+            "seriesType", "recurrence", "_extraction_date"
+        ],
+        "bloom_filter_columns": ["id", "slug", "conditionId"],
+        "max_statistics_size": 4096,
+        "indexed_columns": 64
+    },
+    # Histórico poco consultado: máxima compresión
+    "archive": {
+        "compression": "ZSTD",
+        "compression_level": 15,
+        "max_row_group_size": 1024 * 1024,
+        "data_page_size_limit": 4 * 1024 * 1024,
+        "dictionary_columns": ["category", "subcategory", "marketType", "_extraction_date"],
+        "bloom_filter_columns": [],
+        "max_statistics_size": 1024,
+        "indexed_columns": 32
+    }
+}
+
+# Perfil de cada tabla (las que no aparecen usan DELTA_CONFIG["storage_profile"])
+TABLE_STORAGE_PROFILES = {
+    "events": "scan_optimized",
+    "markets": "scan_optimized"
+}
+
+# Tablas hijas generadas al escribir: arrays anidados → tablas de relación
+# list_column: columna con la lista de objetos, parent_key: nombre de la
+# columna con el id del padre, fields: campo del objeto → columna destino
+CHILD_TABLES = {
+    "events": {
+        "event_markets": {
+            "list_column": "markets",
+            "parent_key": "event_id",
+            "fields": {"id": "market_id", "conditionId": "condition_id"}
+        },
+        "event_tags": {
+            "list_column": "tags",
+            "parent_key": "event_id",
+            "fields": {"id": "tag_id", "slug": "tag_slug", "label": "tag_label"}
+        },
+        "event_series": {
+            "list_column": "series",
+            "parent_key": "event_id",
+            "fields": {"id": "series_id", "slug": "series_slug"}
+        }
+    }
+}
+
+# Lectura por lotes (streaming) de tablas Delta
+STREAMING_CONFIG = {
+    "batch_size": 50000,        # Filas máximas por RecordBatch
+    "batch_readahead": 2,       # Lotes pre-leídos por archivo
+    "fragment_readahead": 1     # Archivos Parquet leídos en paralelo
+}
+
+# Tablas de histórico (SCD Tipo 2) en el lake: <tabla>_history
+# Solo se agrega una fila cuando cambia el hash de contenido de un id;
+# la versión anterior se cierra con valid_to (mismo commit Delta)
+HISTORY_CONFIG = {
+    "enabled": True,
+    "tables": ["series", "tags", "events", "markets"],
+    "suffix": "_history",
+    "partition_column": "valid_from_date"   # Fecha (YYYY-MM-DD) de valid_from
+}
+
+# Escrituras concurrentes sobre una misma tabla Delta
+COMMIT_CONFIG = {
+    "max_retries": 8,           # Reintentos de un append ante conflicto de commit
+    "retry_delay": 0.5,         # segundos antes del primer reintento
+    "backoff_factor": 2,        # multiplicador del delay en cada reintento
+    "max_delay": 30,            # delay máximo entre reintentos (segundos)
+    "queue_size": 64,           # Lotes en espera en la cola de commits (backpressure)
+    "pending_dir": "_pending"   # Appends fallidos guardados para reintento (dentro de DELTA_DIR)
+}
+
+# Índice lateral por id de cada tabla Delta (<tabla>/_index/)
+INDEX_CONFIG = {
+    "enabled": True,           # Actualizar el índice en cada escritura
+    "key_column": "id",        # Columna indexada (tablas sin ella no se indexan)
+    "index_dir": "_index",     # Directorio dentro de la tabla Delta
+    "bloom_fpp": 0.01,         # Tasa de falsos positivos del filtro de Bloom por archivo
+    "row_group_map": True      # Guardar el mapa id → (archivo, row group)
+}
+
+# Snapshot Arrow IPC de la última versión de cada tabla (<tabla>/_snapshot/)
+# Sin compresión el snapshot se lee por memory-map sin copiar ni decodificar;
+# con "lz4"/"zstd" ocupa menos disco pero se descomprime en cada lectura
+SNAPSHOT_CONFIG = {
+    "enabled": True,
+    "snapshot_dir": "_snapshot",
+    "compression": None
+}
+
+# Consultas SQL locales sobre las tablas Delta (DuckDB embebido)
+QUERY_CONFIG = {
+    "threads": 0,                    # Hilos de ejecución (0 = todos los núcleos)
+    "memory_limit": "2GB",           # Por encima de este límite DuckDB usa disco
+    "temp_directory": "tmp/duckdb"   # Directorio de spill para consultas out-of-core
+}
+
+# Tipado de la capa Silver por tabla
+# Cada grupo indica las columnas Bronze que se convierten a ese tipo;
+# las columnas que no existan en la tabla Bronze se ignoran
+SILVER_SCHEMAS = {
+    "series": {
+        "timestamps": ["startDate", "publishedAt", "createdAt", "updatedAt"],
+        "floats": ["volume", "volume24hr", "liquidity", "competitive"],
+        "integers": ["commentCount"],
+        "booleans": ["active", "closed", "archived", "restricted", "featured", "new",
+                     "isTemplate", "commentsEnabled"],
+        "outcome_prices": None
+    },
+    "tags": {
+        "timestamps": ["publishedAt", "createdAt", "updatedAt"],
+        "floats": [],
+        "integers": [],
+        "booleans": ["forceShow", "forceHide", "isCarousel", "requiresTranslation"],
+        "outcome_prices": None
+    },
+    "events": {
+        "timestamps": ["startDate", "creationDate", "endDate", "closedTime", "publishedAt",
+                       "published_at", "createdAt", "updatedAt", "eventDate"],
+        "floats": ["liquidity", "liquidityAmm", "liquidityClob", "volume", "volume24hr",
+                   "volume1wk", "volume1mo", "volume1yr", "openInterest", "competitive"],
+        "integers": ["commentCount", "tweetCount", "eventWeek", "parentEventId"],
+        "booleans": ["active", "closed", "archived", "new", "featured", "restricted", "cyom",
+                     "showAllOutcomes", "showMarketImages", "enableNegRisk", "enableOrderBook",
+                     "negRiskAugmented", "pendingDeployment", "deploying",
+                     "requiresTranslation", "commentsEnabled"],
+        "outcome_prices": None
+    },
+    "markets": {
+        "timestamps": ["startDate", "endDate", "closedTime", "createdAt", "updatedAt"],
+        "floats": ["liquidity", "liquidityAmm", "liquidityClob",
+                   "volume", "volume24hr", "volume1wk", "volume1mo", "volume1yr",
+                   "volumeAmm", "volumeClob", "volume24hrAmm", "volume24hrClob",
+                   "volume1wkAmm", "volume1wkClob", "volume1moAmm", "volume1moClob",
+                   "volume1yrAmm", "volume1yrClob", "openInterest",
+                   "lastTradePrice", "bestBid", "bestAsk", "spread",
+                   "oneHourPriceChange", "oneDayPriceChange", "oneWeekPriceChange",
+                   "oneMonthPriceChange", "oneYearPriceChange",
+                   "fee", "takerBaseFee", "makerBaseFee", "competitive",
+                   "lowerBound", "upperBound"],
+        "integers": [],
+        "booleans": ["active", "closed", "archived", "restricted", "new", "featured",
+                     "enableOrderBook", "clearBookOnStart", "fppmLive", "rfqEnabled",
+                     "negRisk", "wideFormat"],
+        # outcomePrices → outcomePriceYes / outcomePriceNo
+        "outcome_prices": "outcomePrices"
+    }
+}
+
 # Timeout para las peticiones HTTP (en segundos)
 REQUEST_TIMEOUT = 30
 
@@ -0,0 +1,268 @@
+"""
+Índice lateral por id para las tablas Delta
+Se guarda en <tabla>/_index/ (los directorios con prefijo '_' no son
+datos para Delta ni se borran con vacuum) y contiene:
+- manifest.json: versión indexada y, por archivo Parquet, min/max del id
+- blooms.npz: filtro de Bloom del id por archivo
+- ids.parquet: mapa id → (archivo, row group) para lecturas puntuales
+
+Los archivos de una tabla Delta son inmutables, así que al actualizar el
+índice solo se leen (columna id) los archivos añadidos desde la última
+versión indexada y se descartan los que ya no forman parte de la tabla.
+"""
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from deltalake import DeltaTable
+
+from config import INDEX_CONFIG
+
+# Claves de 16 caracteres para las dos funciones hash del filtro de Bloom
+BLOOM_HASH_KEYS = ("polymarket-idx-1", "polymarket-idx-2")
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un array de bits de numpy (hash doble)"""
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[np.ndarray] = None):
+        self.num_bits = max(int(num_bits), 8)
+        self.num_hashes = max(int(num_hashes), 1)
+        self.bits = bits if bits is not None else np.zeros(self.num_bits, dtype=bool)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fpp: float) -> "BloomFilter":
+        """Dimensiona el filtro para capacity elementos y la tasa de falsos positivos fpp"""
+        capacity = max(capacity, 1)
+        num_bits = math.ceil(-capacity * math.log(fpp) / (math.log(2) ** 2))
+        num_hashes = round(num_bits / capacity * math.log(2))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        """Posiciones de bits (len(keys) x num_hashes) de cada clave"""
+        h1 = pd.util.hash_array(keys, hash_key=BLOOM_HASH_KEYS[0])
+        h2 = pd.util.hash_array(keys, hash_key=BLOOM_HASH_KEYS[1]) | np.uint64(1)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+
+    def add(self, keys: np.ndarray):
+        """Agrega un array de claves (strings) al filtro"""
+        if len(keys):
+            self.bits[self._positions(keys).ravel()] = True
+
+    def might_contain(self, keys: np.ndarray) -> np.ndarray:
+        """Retorna, por clave, False si seguro no está y True si puede estar"""
+        if not len(keys):
+            return np.zeros(0, dtype=bool)
+        return self.bits[self._positions(keys)].all(axis=1)
+
+
+class DeltaIdIndex:
+    """Índice por id (min/max + Bloom por archivo y mapa a row groups) de una tabla Delta"""
+
+    def __init__(self, table_path: str, key: str = INDEX_CONFIG["key_column"]):
+        self.table_path = table_path
+        self.key = key
+        self.index_path = os.path.join(table_path, INDEX_CONFIG["index_dir"])
+        self.manifest = self._load_manifest()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.index_path, "manifest.json")
+
+    @property
+    def blooms_path(self) -> str:
+        return os.path.join(self.index_path, "blooms.npz")
+
+    @property
+    def map_path(self) -> str:
+        return os.path.join(self.index_path, "ids.parquet")
+
+    def _load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {"version": None, "files": {}}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _load_blooms(self) -> Dict[str, BloomFilter]:
+        if not os.path.exists(self.blooms_path):
+            return {}
+        blooms = {}
+        with np.load(self.blooms_path) as data:
+            for path, entry in self.manifest["files"].items():
+                bits = np.unpackbits(data[entry["bloom_key"]])[:entry["bloom_bits"]].astype(bool)
+                blooms[path] = BloomFilter(entry["bloom_bits"], entry["bloom_hashes"], bits)
+        return blooms
+
+    def is_current(self, version: int) -> bool:
+        """Indica si el índice corresponde a la versión dada de la tabla"""
+        return self.manifest["version"] == version
+
+    def update(self, dt: Optional[DeltaTable] = None) -> Dict:
+        """
+        Actualiza el índice a la versión actual de la tabla
+
+        Returns:
+            Diccionario con archivos indexados, añadidos y eliminados
+        """
+        dt = dt or DeltaTable(self.table_path)
+        current_files = dt.files()
+
+        if self.key not in dt.schema().to_pyarrow().names:
+            return {"files": 0, "added": 0, "removed": 0}
+
+        old_files = self.manifest["files"]
+        blooms = self._load_blooms()
+        kept = [p for p in current_files if p in old_files]
+        added = [p for p in current_files if p not in old_files]
+        removed = [p for p in old_files if p not in current_files]
+
+        files = {p: old_files[p] for p in kept}
+        maps = []
+
+        if INDEX_CONFIG["row_group_map"] and os.path.exists(self.map_path) and kept:
+            old_map = pq.read_table(self.map_path)
+            maps.append(old_map.filter(pc.is_in(old_map.column("file"), value_set=pa.array(kept))))
+
+        for path in added:
+            parquet_file = pq.ParquetFile(os.path.join(self.table_path, path))
+            ids_per_group = [
+                parquet_file.read_row_group(rg, columns=[self.key]).column(self.key).cast(pa.string())
+                for rg in range(parquet_file.num_row_groups)
+            ]
+            ids = pa.chunked_array(ids_per_group, type=pa.string()).combine_chunks()
+            valid_ids = ids.filter(pc.is_valid(ids))
+
+            bloom = BloomFilter.for_capacity(len(valid_ids), INDEX_CONFIG["bloom_fpp"])
+            bloom.add(np.asarray(valid_ids.to_numpy(zero_copy_only=False), dtype=object))
+            blooms[path] = bloom
+
+            bounds = pc.min_max(valid_ids)
+            files[path] = {
+                "min": bounds["min"].as_py(),
+                "max": bounds["max"].as_py(),
+                "num_rows": len(ids),
+                "bloom_bits": bloom.num_bits,
+                "bloom_hashes": bloom.num_hashes
+            }
+
+            if INDEX_CONFIG["row_group_map"]:
+                row_groups = np.repeat(
+                    np.arange(len(ids_per_group), dtype=np.int32),
+                    [len(chunk) for chunk in ids_per_group]
+                )
+                maps.append(pa.table({
+                    "id": ids,
+                    "file": pa.array([path] * len(ids), type=pa.string()),
+                    "row_group": pa.array(row_groups, type=pa.int32())
+                }).filter(pc.is_valid(ids)))
+
+        os.makedirs(self.index_path, exist_ok=True)
+
+        bloom_arrays = {}
+        for i, path in enumerate(files):
+            files[path]["bloom_key"] = f"f{i}"
+            bloom_arrays[f"f{i}"] = np.packbits(blooms[path].bits)
+        np.savez(self.blooms_path, **bloom_arrays)
+
+        if INDEX_CONFIG["row_group_map"]:
+            if maps:
+                id_map = pa.concat_tables(maps).sort_by("id")
+            else:
+                id_map = pa.table({"id": pa.array([], pa.string()),
+                                   "file": pa.array([], pa.string()),
+                                   "row_group": pa.array([], pa.int32())})
+            pq.write_table(id_map, self.map_path)
+
+        # El manifest se escribe al final: si algo falla, el índice queda
+        # marcado con la versión anterior y se reconstruye en la próxima lectura
+        self.manifest = {"version": dt.version(), "key": self.key, "files": files}
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=4)
+        os.replace(tmp_path, self.manifest_path)
+
+        return {"files": len(files), "added": len(added), "removed": len(removed)}
+
+    def candidate_files(self, ids: Iterable) -> Dict[str, List[str]]:
+        """
+        Archivos que pueden contener cada id (poda por min/max y Bloom)
+
+        Returns:
+            Diccionario archivo → ids que pueden estar en él
+        """
+        keys = np.array(sorted({str(i) for i in ids}), dtype=object)
+        blooms = self._load_blooms()
+        candidates = {}
+
+        for path, entry in self.manifest["files"].items():
+            if entry["min"] is None:
+                continue
+            in_range = keys[(keys >= entry["min"]) & (keys <= entry["max"])]
+            if not len(in_range):
+                continue
+            possible = in_range[blooms[path].might_contain(in_range)]
+            if len(possible):
+                candidates[path] = possible.tolist()
+
+        return candidates
+
+    def locate(self, ids: Iterable) -> Dict[str, List[int]]:
+        """
+        Row groups a leer para obtener los ids
+
+        Returns:
+            Diccionario archivo → lista de row groups
+        """
+        candidates = self.candidate_files(ids)
+        if not candidates:
+            return {}
+
+        if not INDEX_CONFIG["row_group_map"] or not os.path.exists(self.map_path):
+            return {
+                path: list(range(pq.ParquetFile(os.path.join(self.table_path, path)).num_row_groups))
+                for path in candidates
+            }
+
+        wanted = sorted({i for file_ids in candidates.values() for i in file_ids})
+        id_map = pq.read_table(
+            self.map_path,
+            filters=[("id", "in", wanted), ("file", "in", list(candidates))]
+        )
+        located = id_map.group_by(["file", "row_group"]).aggregate([]).to_pylist()
+
+        row_groups: Dict[str, List[int]] = {}
+        for entry in located:
+            row_groups.setdefault(entry["file"], []).append(entry["row_group"])
+        return {path: sorted(groups) for path, groups in row_groups.items()}
+
+    def read(self, ids: Iterable, columns: Optional[List[str]] = None) -> pa.Table:
+        """
+        Lee solo los row groups que contienen los ids y filtra las filas exactas
+
+        Returns:
+            Tabla Arrow con las filas encontradas
+        """
+        ids = {str(i) for i in ids}
+        read_columns = None if columns is None else list(dict.fromkeys([self.key] + columns))
+        tables = []
+
+        for path, groups in self.locate(ids).items():
+            parquet_file = pq.ParquetFile(os.path.join(self.table_path, path))
+            table = parquet_file.read_row_groups(groups, columns=read_columns)
+            mask = pc.is_in(table.column(self.key).cast(pa.string()), value_set=pa.array(sorted(ids)))
+            tables.append(table.filter(mask))
+
+        if not tables:
+            schema = DeltaTable(self.table_path).schema().to_pyarrow()
+            empty = schema.empty_table()
+            return empty if read_columns is None else empty.select(read_columns)
+
+        result = pa.concat_tables(tables, promote_options="default")
+        return result if columns is None else result.select(columns)
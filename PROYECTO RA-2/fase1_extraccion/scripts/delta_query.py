@@ -0,0 +1,177 @@
+"""
+Capa de consultas SQL sobre las tablas Delta con DuckDB embebido
+Registra cada tabla Delta (versión actual) como vista de DuckDB sobre su
+dataset Arrow, de modo que las consultas se ejecutan vectorizadas, en
+paralelo y con proyección/filtros empujados a los archivos Parquet.
+
+Vistas registradas:
+- Capa Bronze: con el nombre de la tabla (markets, events, event_tags, ...)
+- Capa Silver: con prefijo silver_ (silver_markets, silver_events, ...)
+
+Uso:
+    from delta_query import query
+    tabla = query("SELECT COUNT(*) AS total FROM markets")
+"""
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+from deltalake import DeltaTable
+
+from config import DELTA_DIR, SILVER_DIR, QUERY_CONFIG
+from delta_utils import DeltaLakeManager
+
+
+class DeltaQueryEngine:
+    """Motor SQL (DuckDB) sobre las tablas Delta Lake locales"""
+
+    def __init__(self, base_path: str = DELTA_DIR, silver_path: str = SILVER_DIR):
+        """
+        Inicializa la conexión DuckDB y registra las tablas Delta
+
+        Args:
+            base_path: Directorio de las tablas Bronze
+            silver_path: Directorio de las tablas Silver
+        """
+        self.base_path = base_path
+        self.silver_path = silver_path
+        self.logger = self._setup_logger()
+        self.views: Dict[str, str] = {}
+
+        self.con = duckdb.connect(database=":memory:")
+        self._configure()
+        self.register_all()
+
+    def _setup_logger(self) -> logging.Logger:
+        """Configurar el logger"""
+        logger = logging.getLogger("DeltaQueryEngine")
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.FileHandler(f"logs/delta_query_{datetime.now().strftime('%Y%m%d')}.log")
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    def _configure(self):
+        """Aplica QUERY_CONFIG a la conexión DuckDB"""
+        threads = QUERY_CONFIG["threads"] or os.cpu_count() or 1
+        os.makedirs(QUERY_CONFIG["temp_directory"], exist_ok=True)
+
+        self.con.execute(f"SET threads TO {int(threads)}")
+        self.con.execute(f"SET memory_limit = '{QUERY_CONFIG['memory_limit']}'")
+        self.con.execute(f"SET temp_directory = '{QUERY_CONFIG['temp_directory']}'")
+
+    def register_table(self, view_name: str, table_path: str) -> bool:
+        """
+        Registra una tabla Delta como vista DuckDB sobre su versión actual
+
+        Args:
+            view_name: Nombre de la vista en SQL
+            table_path: Ruta de la tabla Delta
+
+        Returns:
+            True si se registró exitosamente, False en caso contrario
+        """
+        try:
+            dt = DeltaTable(table_path)
+            # El dataset Arrow es perezoso: DuckDB solo lee las columnas
+            # y row groups que necesita cada consulta
+            self.con.register(view_name, dt.to_pyarrow_dataset())
+            self.views[view_name] = table_path
+            self.logger.info(f"Vista {view_name} registrada (versión {dt.version()})")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error al registrar {view_name}: {str(e)}")
+            return False
+
+    def register_all(self) -> List[str]:
+        """
+        Registra (o refresca) todas las tablas Bronze y Silver disponibles
+
+        Returns:
+            Lista de vistas registradas
+        """
+        for view_name in list(self.views):
+            self.con.unregister(view_name)
+        self.views = {}
+
+        layers = [(self.base_path, ""), (self.silver_path, "silver_")]
+        for base_path, prefix in layers:
+            manager = DeltaLakeManager(base_path)
+            for table_name in manager.list_tables():
+                self.register_table(f"{prefix}{table_name}", os.path.join(base_path, table_name))
+
+        return list(self.views)
+
+    def query(self, sql: str, params: Optional[list] = None) -> pa.Table:
+        """
+        Ejecuta una consulta SQL y retorna el resultado como tabla Arrow
+
+        Args:
+            sql: Consulta SQL (las tablas Delta se referencian por nombre)
+            params: Parámetros posicionales (?) de la consulta
+
+        Returns:
+            Tabla Arrow con el resultado
+        """
+        return self.con.execute(sql, params or []).arrow()
+
+    def query_df(self, sql: str, params: Optional[list] = None) -> pd.DataFrame:
+        """Ejecuta una consulta SQL y retorna el resultado como DataFrame"""
+        return self.con.execute(sql, params or []).df()
+
+    def columns(self, view_name: str) -> List[str]:
+        """Lista las columnas de una vista registrada"""
+        return self.query(f'SELECT * FROM "{view_name}" LIMIT 0').column_names
+
+    def close(self):
+        """Cierra la conexión DuckDB"""
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_engine: Optional[DeltaQueryEngine] = None
+
+
+def get_engine() -> DeltaQueryEngine:
+    """Retorna el motor compartido (se crea en la primera llamada)"""
+    global _engine
+    if _engine is None:
+        _engine = DeltaQueryEngine()
+    return _engine
+
+
+def query(sql: str, params: Optional[list] = None) -> pa.Table:
+    """Ejecuta una consulta SQL sobre las tablas Delta y retorna Arrow"""
+    return get_engine().query(sql, params)
+
+
+def main():
+    """Consola SQL mínima: ejecuta la consulta recibida como argumento"""
+    engine = get_engine()
+
+    if len(sys.argv) < 2:
+        print(f"\nVistas disponibles: {', '.join(sorted(engine.views))}")
+        print('Uso: python delta_query.py "SELECT COUNT(*) FROM markets"')
+        return 0
+
+    print(engine.query_df(" ".join(sys.argv[1:])).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,15 +2,34 @@
 Utilidades para manejo de Delta Lake
 Proporciona funciones para guardar y leer datos en formato Delta Lake
 """
+import numpy as np
 import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
-from deltalake import write_deltalake, DeltaTable
+from deltalake import write_deltalake, DeltaTable, WriterProperties, ColumnProperties, BloomFilterProperties
+from deltalake.exceptions import CommitFailedError
+from concurrent.futures import Future
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Union
+import ast
+import atexit
+import json
 import logging
 import os
-from config import DELTA_DIR, DELTA_CONFIG
+import queue
+import random
+import threading
+import time
+import uuid
+from config import (
+    DELTA_DIR, DELTA_CONFIG, STREAMING_CONFIG, CHILD_TABLES, INDEX_CONFIG, SNAPSHOT_CONFIG,
+    STORAGE_PROFILES, TABLE_STORAGE_PROFILES, COMMIT_CONFIG, HISTORY_CONFIG
+)
+from delta_index import DeltaIdIndex
+
+# Columnas agregadas en cada extracción: no forman parte del contenido
+METADATA_COLUMNS = ["_extraction_timestamp", "_extraction_date"]
 
 
 class DeltaLakeManager:
@@ -20,6 +39,7 @@ class DeltaLakeManager:
         self.base_path = base_path
         self.logger = self._setup_logger()
         self._ensure_base_directory()
+        self._commit_queue = None
     
     def _setup_logger(self) -> logging.Logger:
         """Configurar el logger"""
@@ -64,19 +84,86 @@ class DeltaLakeManager:
             df['_extraction_timestamp'] = datetime.now()
             df['_extraction_date'] = datetime.now().date()
             
+            if not self.write_table(df, table_name, mode=mode):
+                return False
+            
+            # Desanidar arrays en tablas de relación (p.ej. events → event_markets)
+            if table_name in CHILD_TABLES:
+                self.write_child_tables(table_name, df, mode=mode)
+            
+            # Registrar solo los registros que cambiaron en el histórico
+            if HISTORY_CONFIG["enabled"] and table_name in HISTORY_CONFIG["tables"]:
+                self.update_history(table_name, df, full_snapshot=(mode == "overwrite"))
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error al guardar datos en Delta Lake {table_name}: {str(e)}")
+            return False
+    
+    def write_table(self, data: Union[pd.DataFrame, pa.Table], table_name: str,
+                    mode: str = "overwrite", partition_by: Optional[List[str]] = None,
+                    predicate: Optional[str] = None) -> bool:
+        """
+        Escribe un DataFrame o tabla Arrow ya preparados en una tabla Delta
+        
+        Args:
+            data: DataFrame de pandas o tabla de PyArrow
+            table_name: Nombre de la tabla Delta
+            mode: Modo de escritura ('overwrite', 'append', 'error', 'ignore')
+            partition_by: Columnas de partición (opcional)
+            predicate: Con mode='overwrite', reemplaza solo las filas que
+                       cumplen el predicado (replaceWhere)
+        
+        Returns:
+            True si se guardó exitosamente, False si el commit siguió en
+            conflicto tras los reintentos (un append queda en _pending)
+        
+        Raises:
+            Cualquier otro error de escritura (esquema, permisos, datos):
+            reintentar el lote más tarde no lo arreglaría
+        """
+        try:
             # Ruta de la tabla Delta
             table_path = os.path.join(self.base_path, table_name)
             
-            self.logger.info(f"Guardando {len(df)} registros en tabla Delta: {table_name}")
+            profile_name = get_storage_profile(table_name)
+            profile = STORAGE_PROFILES[profile_name]
+            columns = data.columns if isinstance(data, pd.DataFrame) else data.column_names
             
-            # Escribir en formato Delta Lake
-            write_deltalake(
-                table_path,
-                df,
-                mode=mode,
-                schema_mode="merge" if DELTA_CONFIG["enable_schema_evolution"] else "overwrite"
+            self.logger.info(
+                f"Guardando {len(data)} registros en tabla Delta: {table_name} (perfil {profile_name})"
             )
             
+            # Escribir en formato Delta Lake (el motor rust aplica las
+            # propiedades de escritura Parquet del perfil). Un append no
+            # depende del estado leído de la tabla, así que si otro writer
+            # confirma antes se reintenta con backoff; en el resto de modos
+            # el conflicto es real y se reporta.
+            for attempt in range(COMMIT_CONFIG["max_retries"] + 1):
+                try:
+                    write_deltalake(
+                        table_path,
+                        data,
+                        mode=mode,
+                        partition_by=partition_by,
+                        predicate=predicate,
+                        schema_mode="merge" if DELTA_CONFIG["enable_schema_evolution"] else "overwrite",
+                        engine="rust",
+                        writer_properties=build_writer_properties(profile, list(columns)),
+                        configuration={"delta.dataSkippingNumIndexedCols": str(profile["indexed_columns"])}
+                    )
+                    break
+                except CommitFailedError as e:
+                    if mode != "append" or attempt == COMMIT_CONFIG["max_retries"]:
+                        raise
+                    delay = commit_retry_delay(attempt)
+                    self.logger.warning(
+                        f"Conflicto de commit en {table_name} (intento {attempt + 1}/"
+                        f"{COMMIT_CONFIG['max_retries']}): {str(e)}. Reintentando en {delay:.2f}s"
+                    )
+                    time.sleep(delay)
+            
             self.logger.info(f"Datos guardados exitosamente en {table_path}")
             
             # Obtener información de la tabla
@@ -85,11 +172,178 @@ class DeltaLakeManager:
             
             self.logger.info(f"Tabla {table_name} - Versión: {version}")
             
+            if INDEX_CONFIG["enabled"]:
+                self.update_index(table_name, dt)
+            
             return True
             
+        except CommitFailedError as e:
+            self.logger.error(f"Conflicto de commit sin resolver en {table_name}: {str(e)}")
+            # Un overwrite fallido se repite con la siguiente extracción;
+            # un append se guarda para no perder el lote
+            if mode == "append":
+                self._spill_pending(data, table_name)
+            return False
+        
         except Exception as e:
             self.logger.error(f"Error al guardar datos en Delta Lake {table_name}: {str(e)}")
-            return False
+            raise
+    
+    def _pending_path(self, table_name: str) -> str:
+        """Directorio de appends pendientes de una tabla"""
+        return os.path.join(self.base_path, COMMIT_CONFIG["pending_dir"], table_name)
+    
+    def _spill_pending(self, data: Union[pd.DataFrame, pa.Table], table_name: str):
+        """Guarda en Parquet un append que no se pudo confirmar"""
+        try:
+            table = pa.Table.from_pandas(data, preserve_index=False) if isinstance(data, pd.DataFrame) else data
+            pending_path = self._pending_path(table_name)
+            os.makedirs(pending_path, exist_ok=True)
+            
+            file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}.parquet"
+            pq.write_table(table, os.path.join(pending_path, file_name))
+            
+            self.logger.warning(f"Lote de {table.num_rows} registros de {table_name} guardado en pendientes: {file_name}")
+            
+        except Exception as e:
+            self.logger.error(f"No se pudo guardar el lote pendiente de {table_name}: {str(e)}")
+    
+    def pending_tables(self) -> List[str]:
+        """Tablas con appends pendientes de confirmar"""
+        pending_root = os.path.join(self.base_path, COMMIT_CONFIG["pending_dir"])
+        if not os.path.exists(pending_root):
+            return []
+        return sorted(os.listdir(pending_root))
+    
+    def replay_pending(self, table_name: Optional[str] = None) -> Dict[str, int]:
+        """
+        Reintenta los appends pendientes en orden de llegada
+        
+        Args:
+            table_name: Tabla a procesar (None = todas)
+        
+        Returns:
+            Diccionario tabla → lotes confirmados
+        """
+        tables = [table_name] if table_name else self.pending_tables()
+        results = {}
+        
+        for table in tables:
+            pending_path = self._pending_path(table)
+            if not os.path.isdir(pending_path):
+                continue
+            
+            results[table] = 0
+            for file_name in sorted(os.listdir(pending_path)):
+                file_path = os.path.join(pending_path, file_name)
+                data = pq.read_table(file_path)
+                
+                # Se elimina antes de escribir: si vuelve a haber conflicto,
+                # write_table lo guarda de nuevo como pendiente
+                os.remove(file_path)
+                try:
+                    written = self.write_table(data, table, mode="append")
+                except Exception:
+                    self._spill_pending(data, table)
+                    break
+                if not written:
+                    break
+                results[table] += 1
+            
+            self.logger.info(f"Pendientes de {table}: {results[table]} lotes confirmados")
+        
+        return results
+    
+    def submit_write(self, data: Union[pd.DataFrame, pa.Table], table_name: str,
+                     mode: str = "append", partition_by: Optional[List[str]] = None) -> Future:
+        """
+        Encola una escritura en la cola de commits de un solo writer
+        
+        Los productores (extractores en paralelo) no compiten por el log
+        Delta: un único hilo confirma los lotes en orden y agrupa los appends
+        consecutivos a una misma tabla en un solo commit.
+        
+        Returns:
+            Future que se resuelve con el resultado de write_table
+        """
+        return self._queue().submit(data, table_name, mode, partition_by)
+    
+    def submit_save(self, data: List[Dict], table_name: str, mode: str = "overwrite") -> Future:
+        """
+        Encola un save_to_delta completo (tabla, tablas hijas e histórico)
+        
+        El extractor sigue con el siguiente endpoint mientras el hilo writer
+        confirma el lote anterior.
+        
+        Returns:
+            Future que se resuelve con el resultado de save_to_delta
+        """
+        return self._queue().submit(data, table_name, mode, None, save=True)
+    
+    def _queue(self) -> "DeltaCommitQueue":
+        if self._commit_queue is None:
+            self._commit_queue = DeltaCommitQueue(self)
+        return self._commit_queue
+    
+    def close(self):
+        """Espera a que se confirmen los lotes encolados y detiene la cola"""
+        if self._commit_queue is not None:
+            self._commit_queue.close()
+            self._commit_queue = None
+    
+    def write_child_tables(self, table_name: str, data: pd.DataFrame,
+                           mode: str = "overwrite") -> Dict[str, int]:
+        """
+        Genera las tablas de relación definidas en CHILD_TABLES para una tabla
+        
+        Se desanida solo el lote recién escrito (id y columnas anidadas) con
+        operaciones de listas de Arrow (sin bucles por fila ni relectura de
+        la tabla padre). En append, las relaciones de los padres del lote
+        reemplazan a las que ya tenían (overwrite con predicado por
+        parent_key), así que repetir un padre no duplica sus relaciones.
+        
+        Args:
+            table_name: Tabla padre (p.ej. 'events')
+            data: Lote escrito en la tabla padre
+            mode: Modo de escritura de la tabla padre
+        
+        Returns:
+            Diccionario tabla hija → registros escritos
+        """
+        results = {}
+        parent_ids = data["id"].dropna().astype(str).unique().tolist()
+        
+        for child_name, spec in CHILD_TABLES[table_name].items():
+            try:
+                if spec["list_column"] not in data.columns:
+                    self.logger.warning(f"{table_name} no tiene columna {spec['list_column']}: se omite {child_name}")
+                    continue
+                
+                links = explode_list_column(
+                    nested_arrow_table(data, spec["list_column"]),
+                    spec["list_column"], spec["parent_key"], spec["fields"]
+                )
+                
+                if mode == "append" and self.table_exists(child_name):
+                    # Reemplaza las relaciones de los padres del lote (también
+                    # borra las de los que ya no tienen ninguna)
+                    written = self.write_table(
+                        links, child_name, mode="overwrite",
+                        predicate=in_predicate(spec["parent_key"], parent_ids)
+                    )
+                elif links.num_rows == 0:
+                    self.logger.warning(f"Sin relaciones para {child_name}")
+                    continue
+                else:
+                    written = self.write_table(links, child_name, mode=mode)
+                
+                if written:
+                    results[child_name] = links.num_rows
+                
+            except Exception as e:
+                self.logger.error(f"Error al generar tabla hija {child_name}: {str(e)}")
+        
+        return results
     
     def read_delta_table(self, table_name: str, version: Optional[int] = None) -> Optional[pd.DataFrame]:
         """
@@ -114,6 +368,9 @@ class DeltaLakeManager:
             if version is not None:
                 self.logger.info(f"Leyendo tabla {table_name} versión {version}")
                 df = dt.load_version(version).to_pandas()
+            elif SNAPSHOT_CONFIG["enabled"]:
+                self.logger.info(f"Leyendo última versión de tabla {table_name} (snapshot Arrow)")
+                df = load_snapshot(table_path, dt).to_pandas()
             else:
                 self.logger.info(f"Leyendo última versión de tabla {table_name}")
                 df = dt.to_pandas()
@@ -125,6 +382,435 @@ class DeltaLakeManager:
             self.logger.error(f"Error al leer tabla Delta {table_name}: {str(e)}")
             return None
     
+    def read_arrow_table(self, table_name: str) -> Optional[pa.Table]:
+        """
+        Lee la última versión de una tabla como tabla Arrow desde su snapshot
+        
+        La primera lectura de cada versión decodifica los Parquet y guarda el
+        snapshot IPC; las siguientes son un memory-map casi sin copia.
+        
+        Returns:
+            Tabla Arrow o None si hay error
+        """
+        try:
+            table_path = os.path.join(self.base_path, table_name)
+            
+            if not os.path.exists(table_path):
+                self.logger.error(f"Tabla Delta no existe: {table_path}")
+                return None
+            
+            table = load_snapshot(table_path)
+            self.logger.info(f"Leídos {table.num_rows} registros de {table_name} (snapshot Arrow)")
+            return table
+            
+        except Exception as e:
+            self.logger.error(f"Error al leer snapshot de {table_name}: {str(e)}")
+            return None
+    
+    def iter_batches(self, table_name: str, batch_size: Optional[int] = None,
+                     columns: Optional[List[str]] = None,
+                     filters: Optional[Union[List, pc.Expression]] = None,
+                     version: Optional[int] = None) -> Iterator[pa.RecordBatch]:
+        """
+        Itera una tabla Delta en lotes Arrow con memoria acotada
+        
+        La tabla se escanea como dataset de PyArrow: solo se decodifican las
+        columnas proyectadas, los filtros se aplican con las estadísticas de
+        los row groups y nunca hay más de unos pocos lotes en memoria.
+        
+        Args:
+            table_name: Nombre de la tabla
+            batch_size: Filas máximas por lote (None = STREAMING_CONFIG)
+            columns: Columnas a leer (None = todas)
+            filters: Expresión de pyarrow.compute o filtros en formato DNF
+                     [("col", "=", valor), ...]
+            version: Versión específica a leer (None = última versión)
+        
+        Yields:
+            pyarrow.RecordBatch con a lo sumo batch_size filas
+        """
+        table_path = os.path.join(self.base_path, table_name)
+        
+        if not os.path.exists(table_path):
+            self.logger.error(f"Tabla Delta no existe: {table_path}")
+            return
+        
+        if batch_size is None:
+            batch_size = STREAMING_CONFIG["batch_size"]
+        
+        if isinstance(filters, list):
+            filters = pq.filters_to_expression(filters)
+        
+        dt = DeltaTable(table_path, version=version)
+        dataset = dt.to_pyarrow_dataset()
+        
+        scanner = dataset.scanner(
+            columns=columns,
+            filter=filters,
+            batch_size=batch_size,
+            batch_readahead=STREAMING_CONFIG["batch_readahead"],
+            fragment_readahead=STREAMING_CONFIG["fragment_readahead"]
+        )
+        
+        self.logger.info(f"Leyendo tabla {table_name} por lotes de {batch_size} filas")
+        
+        total = 0
+        for batch in scanner.to_batches():
+            if batch.num_rows == 0:
+                continue
+            total += batch.num_rows
+            yield batch
+        
+        self.logger.info(f"Leídos {total} registros de {table_name} por lotes")
+    
+    def update_index(self, table_name: str, dt: Optional[DeltaTable] = None) -> bool:
+        """
+        Actualiza el índice por id de una tabla (solo indexa archivos nuevos)
+        
+        Un fallo del índice no invalida la escritura: el índice queda en la
+        versión anterior y get_by_ids lo reconstruye al detectarlo.
+        """
+        try:
+            table_path = os.path.join(self.base_path, table_name)
+            stats = DeltaIdIndex(table_path).update(dt)
+            self.logger.info(
+                f"Índice de {table_name}: {stats['files']} archivos "
+                f"(+{stats['added']} / -{stats['removed']})"
+            )
+            return True
+            
+        except Exception as e:
+            self.logger.warning(f"No se pudo actualizar el índice de {table_name}: {str(e)}")
+            return False
+    
+    def get_by_ids(self, table_name: str, ids: List, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Obtiene registros por id leyendo solo los row groups que los contienen
+        
+        Args:
+            table_name: Nombre de la tabla
+            ids: Lista de ids a buscar
+            columns: Columnas a retornar (None = todas)
+        
+        Returns:
+            DataFrame con los registros encontrados o None si hay error
+        """
+        try:
+            table_path = os.path.join(self.base_path, table_name)
+            
+            if not os.path.exists(table_path):
+                self.logger.error(f"Tabla Delta no existe: {table_path}")
+                return None
+            
+            index = DeltaIdIndex(table_path)
+            dt = DeltaTable(table_path)
+            if not index.is_current(dt.version()):
+                index.update(dt)
+            
+            df = index.read(ids, columns=columns).to_pandas()
+            self.logger.info(f"Búsqueda por id en {table_name}: {len(ids)} ids → {len(df)} registros")
+            
+            return df
+            
+        except Exception as e:
+            self.logger.error(f"Error al buscar ids en {table_name}: {str(e)}")
+            return None
+    
+    def contains_ids(self, table_name: str, ids: List) -> Dict[str, bool]:
+        """
+        Indica qué ids existen en la tabla
+        
+        Los ids descartados por min/max o Bloom no tocan los datos; el resto
+        se confirma con el mapa id → row group (sin falsos positivos).
+        """
+        found = self.get_by_ids(table_name, ids, columns=[INDEX_CONFIG["key_column"]])
+        present = set() if found is None else set(found[INDEX_CONFIG["key_column"]].astype(str))
+        return {str(i): str(i) in present for i in ids}
+    
+    def update_history(self, table_name: str, df: pd.DataFrame, full_snapshot: bool = True) -> Dict[str, int]:
+        """
+        Actualiza la tabla de histórico (SCD Tipo 2) de una entidad
+        
+        Compara el hash de contenido de cada id con su versión vigente en
+        <tabla>_history y, en un único commit (merge), cierra las versiones
+        que cambiaron o desaparecieron (valid_to) e inserta las nuevas. El
+        tamaño del histórico crece con los cambios, no con las extracciones.
+        
+        Args:
+            table_name: Tabla de origen (p.ej. 'markets')
+            df: Snapshot recién extraído (con _extraction_timestamp)
+            full_snapshot: True si df contiene todos los ids (los ausentes
+                           se cierran como borrados)
+        
+        Returns:
+            Diccionario con registros insertados, actualizados y cerrados
+        """
+        history_name = f"{table_name}{HISTORY_CONFIG['suffix']}"
+        history_path = os.path.join(self.base_path, history_name)
+        partition_column = HISTORY_CONFIG["partition_column"]
+        stats = {"inserted": 0, "updated": 0, "closed": 0}
+        
+        try:
+            snapshot = df.drop_duplicates(subset=["id"], keep="last")
+            valid_from = pd.Timestamp(snapshot["_extraction_timestamp"].max()) \
+                if "_extraction_timestamp" in snapshot.columns else pd.Timestamp(datetime.now())
+            
+            rows = snapshot.drop(columns=[c for c in METADATA_COLUMNS if c in snapshot.columns])
+            rows = rows.assign(
+                id=rows["id"].astype(str),
+                _content_hash=content_hash(rows).values.view(np.int64),
+                valid_from=pd.Series(valid_from, index=rows.index).astype("datetime64[us]"),
+                valid_to=pd.Series(pd.NaT, index=rows.index, dtype="datetime64[us]"),
+                is_current=True
+            )
+            rows[partition_column] = valid_from.strftime("%Y-%m-%d")
+            rows = rows.reset_index(drop=True)
+            
+            if not os.path.exists(os.path.join(history_path, "_delta_log")):
+                write_deltalake(history_path, rows, mode="overwrite", partition_by=[partition_column], engine="rust")
+                stats["inserted"] = len(rows)
+                self.logger.info(f"Histórico {history_name} creado con {len(rows)} registros")
+                return stats
+            
+            # Versiones vigentes: solo id y hash
+            dt = DeltaTable(history_path)
+            current = dt.to_pyarrow_dataset().to_table(
+                columns=["id", "_content_hash"],
+                filter=pc.field("is_current") == True
+            ).to_pandas()
+            current_hash = pd.Series(current["_content_hash"].values, index=current["id"].values)
+            
+            known = rows["id"].isin(current_hash.index)
+            changed = known & (rows["_content_hash"].values != current_hash.reindex(rows["id"]).values)
+            new_rows = rows[~known | changed]
+            
+            closed_ids = rows.loc[changed, "id"].tolist()
+            if full_snapshot:
+                closed_ids += current_hash.index[~current_hash.index.isin(rows["id"])].tolist()
+            
+            stats = {"inserted": int((~known).sum()), "updated": int(changed.sum()), "closed": len(closed_ids)}
+            
+            if new_rows.empty and not closed_ids:
+                self.logger.info(f"Histórico {history_name}: sin cambios")
+                return stats
+            
+            # Columnas nuevas en el origen: evolucionar el esquema antes del merge
+            source = pa.Table.from_pandas(new_rows, preserve_index=False)
+            target_schema = dt.schema().to_pyarrow()
+            if set(source.column_names) - set(target_schema.names):
+                write_deltalake(history_path, source.slice(0, 0), mode="append", schema_mode="merge", engine="rust")
+                dt = DeltaTable(history_path)
+                target_schema = dt.schema().to_pyarrow()
+            
+            # Fuente del merge: una fila con _merge_key = id por cada versión a
+            # cerrar y una fila con _merge_key nulo por cada versión a insertar
+            closes = pa.table({
+                "_merge_key": pa.array(closed_ids, pa.string()),
+                "_close_at": pa.array([valid_from] * len(closed_ids), pa.timestamp("us"))
+            })
+            inserts = source.append_column("_merge_key", pa.nulls(len(source), pa.string())) \
+                            .append_column("_close_at", pa.nulls(len(source), pa.timestamp("us")))
+            merge_source = pa.concat_tables([inserts, closes], promote_options="default")
+            
+            insert_columns = {f"`{col}`": f"s.`{col}`" for col in source.column_names}
+            
+            (
+                dt.merge(
+                    source=merge_source,
+                    predicate="t.id = s._merge_key AND t.is_current = true",
+                    source_alias="s",
+                    target_alias="t"
+                )
+                .when_matched_update(updates={"valid_to": "s._close_at", "is_current": "false"})
+                .when_not_matched_insert(updates=insert_columns, predicate="s._merge_key IS NULL")
+                .execute()
+            )
+            
+            self.logger.info(
+                f"Histórico {history_name}: {stats['inserted']} nuevos, "
+                f"{stats['updated']} actualizados, {stats['closed']} versiones cerradas"
+            )
+            return stats
+            
+        except Exception as e:
+            self.logger.error(f"Error al actualizar el histórico de {table_name}: {str(e)}")
+            return stats
+    
+    def read_history(self, table_name: str, ids: Optional[List] = None,
+                     as_of: Optional[datetime] = None,
+                     columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Lee el histórico de una entidad
+        
+        Args:
+            table_name: Tabla de origen (p.ej. 'markets')
+            ids: Ids a consultar (None = todos)
+            as_of: Fecha/hora: solo la versión vigente en ese momento
+                   (las particiones posteriores no se leen)
+            columns: Columnas a retornar (None = todas)
+        
+        Returns:
+            DataFrame ordenado por id y valid_from, o None si hay error
+        """
+        try:
+            history_path = os.path.join(self.base_path, f"{table_name}{HISTORY_CONFIG['suffix']}")
+            partition_column = HISTORY_CONFIG["partition_column"]
+            
+            conditions = []
+            if ids is not None:
+                conditions.append(pc.field("id").isin([str(i) for i in ids]))
+            if as_of is not None:
+                as_of = pd.Timestamp(as_of)
+                conditions.append(pc.field(partition_column) <= as_of.strftime("%Y-%m-%d"))
+                conditions.append(pc.field("valid_from") <= as_of)
+                conditions.append(pc.field("valid_to").is_null() | (pc.field("valid_to") > as_of))
+            
+            condition = None
+            for c in conditions:
+                condition = c if condition is None else condition & c
+            
+            if columns is not None:
+                columns = list(dict.fromkeys(["id", "valid_from", "valid_to", "is_current"] + columns))
+            
+            table = DeltaTable(history_path).to_pyarrow_dataset().to_table(columns=columns, filter=condition)
+            return table.to_pandas().sort_values(["id", "valid_from"]).reset_index(drop=True)
+            
+        except Exception as e:
+            self.logger.error(f"Error al leer el histórico de {table_name}: {str(e)}")
+            return None
+    
+    def get_changes(self, table_name: str, start_version: Optional[int],
+                    end_version: Optional[int] = None, key: str = "id") -> Optional[pd.DataFrame]:
+        """
+        Obtiene las filas insertadas, actualizadas o borradas entre dos versiones
+        
+        Las tablas se reescriben en modo overwrite en cada extracción, por lo
+        que el Change Data Feed de Delta marcaría todas las filas como
+        cambiadas; en su lugar se compara por clave y hash de contenido
+        (excluyendo las columnas de metadatos de extracción).
+        
+        Args:
+            table_name: Nombre de la tabla
+            start_version: Versión base (None = tabla vacía, todo es inserción)
+            end_version: Versión final (None = última versión)
+            key: Columna clave natural
+        
+        Returns:
+            DataFrame con las filas cambiadas y las columnas _change_type
+            ('insert', 'update', 'delete') y _commit_version, o None si hay error
+        """
+        try:
+            table_path = os.path.join(self.base_path, table_name)
+            
+            if not os.path.exists(table_path):
+                self.logger.error(f"Tabla Delta no existe: {table_path}")
+                return None
+            
+            dt_end = DeltaTable(table_path, version=end_version)
+            end_version = dt_end.version()
+            
+            new_df = dt_end.to_pandas().drop_duplicates(subset=[key], keep="last")
+            
+            if start_version is None or start_version < 0:
+                old_df = new_df.iloc[0:0]
+            elif start_version >= end_version:
+                return new_df.iloc[0:0].assign(_change_type=pd.Series(dtype=str), _commit_version=end_version)
+            else:
+                old_df = DeltaTable(table_path, version=start_version).to_pandas()
+                old_df = old_df.drop_duplicates(subset=[key], keep="last")
+            
+            new_hash = pd.Series(content_hash(new_df).values, index=new_df[key].astype(str).values)
+            old_hash = pd.Series(content_hash(old_df).values, index=old_df[key].astype(str).values)
+            
+            new_keys = new_df[key].astype(str)
+            old_keys = old_df[key].astype(str)
+            
+            inserted = ~new_keys.isin(old_hash.index)
+            common = new_keys.isin(old_hash.index)
+            updated = common.copy()
+            updated[common] = (
+                new_hash.loc[new_keys[common].values].values != old_hash.loc[new_keys[common].values].values
+            )
+            deleted = ~old_keys.isin(new_hash.index)
+            
+            changes = pd.concat([
+                new_df[inserted].assign(_change_type="insert"),
+                new_df[updated].assign(_change_type="update"),
+                old_df[deleted].assign(_change_type="delete")
+            ], ignore_index=True)
+            changes["_commit_version"] = end_version
+            
+            self.logger.info(
+                f"Cambios en {table_name} ({start_version} → {end_version}): "
+                f"{int(inserted.sum())} inserciones, {int(updated.sum())} actualizaciones, "
+                f"{int(deleted.sum())} borrados"
+            )
+            
+            return changes
+            
+        except Exception as e:
+            self.logger.error(f"Error al calcular cambios de {table_name}: {str(e)}")
+            return None
+    
+    def _watermark_path(self, consumer: str) -> str:
+        """Ruta del archivo de watermarks de un consumidor"""
+        return os.path.join(self.base_path, "_watermarks", f"{consumer}.json")
+    
+    def get_watermark(self, consumer: str, table_name: str) -> Optional[int]:
+        """
+        Obtiene la última versión consumida de una tabla por un consumidor
+        
+        Returns:
+            Versión consumida o None si el consumidor nunca leyó la tabla
+        """
+        path = self._watermark_path(consumer)
+        if not os.path.exists(path):
+            return None
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get(table_name)
+    
+    def set_watermark(self, consumer: str, table_name: str, version: int):
+        """Registra la última versión consumida de una tabla por un consumidor"""
+        path = self._watermark_path(consumer)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        watermarks = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                watermarks = json.load(f)
+        
+        watermarks[table_name] = version
+        
+        # Escritura atómica para no dejar el archivo a medias
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(watermarks, f, indent=4)
+        os.replace(tmp_path, path)
+        
+        self.logger.info(f"Watermark {consumer}/{table_name} → versión {version}")
+    
+    def read_changes_since(self, consumer: str, table_name: str, key: str = "id"):
+        """
+        Obtiene los cambios de una tabla desde la última versión consumida
+        
+        El watermark no se avanza aquí: el consumidor debe llamar a
+        set_watermark con la versión retornada tras procesar los cambios.
+        
+        Returns:
+            Tupla (DataFrame de cambios o None, versión final)
+        """
+        start_version = self.get_watermark(consumer, table_name)
+        changes = self.get_changes(table_name, start_version, key=key)
+        
+        if changes is None:
+            return None, start_version
+        
+        end_version = int(changes["_commit_version"].iloc[0]) if len(changes) else \
+            DeltaTable(os.path.join(self.base_path, table_name)).version()
+        
+        return changes, end_version
+    
     def get_table_info(self, table_name: str) -> Dict:
         """
         Obtiene información sobre una tabla Delta
@@ -164,6 +850,10 @@ class DeltaLakeManager:
         except Exception as e:
             return {"error": str(e)}
     
+    def table_exists(self, table_name: str) -> bool:
+        """Indica si existe una tabla Delta con ese nombre"""
+        return os.path.exists(os.path.join(self.base_path, table_name, "_delta_log"))
+    
     def list_tables(self) -> List[str]:
         """Lista todas las tablas Delta disponibles"""
         try:
@@ -184,26 +874,468 @@ class DeltaLakeManager:
             self.logger.error(f"Error al listar tablas: {str(e)}")
             return []
     
-    def get_table_stats(self, table_name: str) -> Dict:
-        """Obtiene estadísticas de una tabla"""
+    def get_table_stats(self, table_name: str, version: Optional[int] = None) -> Dict:
+        """
+        Obtiene estadísticas de una tabla sin leer sus datos
+        
+        Usa las estadísticas de las add-actions del log Delta (num_records,
+        null_count, min, max) y, para las columnas que no tienen estadísticas
+        en el log, los footers de los archivos Parquet. Nunca se decodifican
+        páginas de datos.
+        
+        Args:
+            table_name: Nombre de la tabla
+            version: Versión específica (None = última versión)
+        
+        Returns:
+            Diccionario con registros, columnas, nulos, min/max y tamaños
+        """
         try:
-            df = self.read_delta_table(table_name)
-            if df is None:
-                return {"error": "No se pudo leer la tabla"}
+            table_path = os.path.join(self.base_path, table_name)
+            
+            if not os.path.exists(table_path):
+                return {"error": f"Tabla no existe: {table_name}"}
+            
+            dt = DeltaTable(table_path, version=version)
+            column_names = dt.schema().to_pyarrow().names
+            actions = dt.get_add_actions(flatten=True).to_pydict()
+            
+            files = actions.get("path", [])
+            sizes = actions.get("size_bytes", [0] * len(files))
+            no_stats = [None] * len(files)
+            
+            records = 0
+            null_counts = {col: 0 for col in column_names}
+            min_values = {}
+            max_values = {}
+            file_stats = []
+            
+            for i, file_path in enumerate(files):
+                num_records = actions.get("num_records", no_stats)[i]
+                file_nulls = {col: actions.get(f"null_count.{col}", no_stats)[i] for col in column_names}
+                file_mins = {col: actions.get(f"min.{col}", no_stats)[i] for col in column_names}
+                file_maxs = {col: actions.get(f"max.{col}", no_stats)[i] for col in column_names}
+                
+                # Columnas sin estadísticas en el log (p.ej. más allá de
+                # delta.dataSkippingNumIndexedCols): se completan con el footer
+                missing = [col for col in column_names if file_nulls[col] is None]
+                if missing or num_records is None:
+                    footer = self._read_footer_stats(os.path.join(table_path, file_path), missing)
+                    if num_records is None:
+                        num_records = footer["num_rows"]
+                    for col, col_stats in footer["columns"].items():
+                        file_nulls[col] = col_stats["null_count"]
+                        file_mins[col] = col_stats["min"] if file_mins[col] is None else file_mins[col]
+                        file_maxs[col] = col_stats["max"] if file_maxs[col] is None else file_maxs[col]
+                
+                records += num_records or 0
+                for col in column_names:
+                    if null_counts[col] is not None:
+                        null_counts[col] = None if file_nulls[col] is None else null_counts[col] + file_nulls[col]
+                    min_values[col] = _merge_bound(min_values.get(col), file_mins[col], min)
+                    max_values[col] = _merge_bound(max_values.get(col), file_maxs[col], max)
+                
+                file_stats.append({
+                    "path": file_path,
+                    "size_bytes": sizes[i],
+                    "records": num_records
+                })
+            
+            size_bytes = sum(size or 0 for size in sizes)
             
             stats = {
-                "records": len(df),
-                "columns": len(df.columns),
-                "column_names": list(df.columns),
-                "memory_usage_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
-                "null_counts": df.isnull().sum().to_dict()
+                "version": dt.version(),
+                "records": records,
+                "columns": len(column_names),
+                "column_names": column_names,
+                "num_files": len(files),
+                "size_bytes": size_bytes,
+                "size_mb": size_bytes / 1024 / 1024,
+                "null_counts": null_counts,
+                "min_values": min_values,
+                "max_values": max_values,
+                "files": file_stats
             }
             
             return stats
             
         except Exception as e:
             return {"error": str(e)}
+    
+    def _read_footer_stats(self, file_path: str, columns: List[str]) -> Dict:
+        """
+        Lee estadísticas de columnas desde el footer de un archivo Parquet
+        
+        Solo se leen los metadatos del archivo; las columnas anidadas (que no
+        tienen estadísticas a nivel de columna raíz) se omiten.
+        
+        Args:
+            file_path: Ruta al archivo Parquet
+            columns: Columnas de primer nivel a consultar
+        
+        Returns:
+            Diccionario con num_rows y estadísticas por columna
+        """
+        metadata = pq.read_metadata(file_path)
+        column_index = {metadata.schema.column(j).path: j for j in range(metadata.num_columns)}
+        
+        result = {"num_rows": metadata.num_rows, "columns": {}}
+        
+        for col in columns:
+            j = column_index.get(col)
+            if j is None:
+                continue
+            
+            null_count, col_min, col_max = 0, None, None
+            for rg in range(metadata.num_row_groups):
+                statistics = metadata.row_group(rg).column(j).statistics
+                if statistics is None or not statistics.has_null_count:
+                    null_count = None
+                elif null_count is not None:
+                    null_count += statistics.null_count
+                if statistics is not None and statistics.has_min_max:
+                    col_min = _merge_bound(col_min, statistics.min, min)
+                    col_max = _merge_bound(col_max, statistics.max, max)
+            
+            result["columns"][col] = {"null_count": null_count, "min": col_min, "max": col_max}
+        
+        return result
+
+
+class DeltaCommitQueue:
+    """Cola de commits con un único hilo writer por DeltaLakeManager"""
+    
+    def __init__(self, manager: "DeltaLakeManager"):
+        self.manager = manager
+        self.requests = queue.Queue(maxsize=COMMIT_CONFIG["queue_size"])
+        self.closed = False
+        # El hilo es daemon para que un proceso que no llama a close() no se
+        # quede colgado esperando la cola, pero los lotes encolados se
+        # confirman igualmente al salir: atexit corre antes de matar los
+        # hilos daemon
+        self.worker = threading.Thread(target=self._run, name="DeltaCommitQueue", daemon=True)
+        self.worker.start()
+        atexit.register(self.close)
+    
+    def submit(self, data, table_name: str, mode: str, partition_by: Optional[List[str]],
+               save: bool = False) -> Future:
+        """
+        Encola un lote (bloquea si la cola está llena); con save=True se
+        confirma con save_to_delta en lugar de write_table
+        """
+        future = Future()
+        self.requests.put((data, table_name, mode, partition_by, save, future))
+        return future
+    
+    def close(self):
+        """Procesa los lotes restantes y detiene el hilo writer (idempotente)"""
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        self.requests.put(None)
+        self.worker.join()
+    
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = [self.requests.get()]
+            
+            # Agrupar los appends encolados a la misma tabla en un solo commit
+            while batch[-1] is not None:
+                try:
+                    batch.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if batch[-1] is None:
+                batch.pop()
+                stop = True
+            
+            for group in _group_appends(batch):
+                self._commit(group)
+    
+    def _commit(self, group: List):
+        data, table_name, mode, partition_by, save, _ = group[0]
+        futures = [request[-1] for request in group]
+        
+        try:
+            if save:
+                result = self.manager.save_to_delta(data, table_name, mode=mode)
+                for future in futures:
+                    future.set_result(result)
+                return
+            
+            if len(group) > 1:
+                tables = [
+                    pa.Table.from_pandas(d, preserve_index=False) if isinstance(d, pd.DataFrame) else d
+                    for d, *_ in group
+                ]
+                data = pa.concat_tables(tables, promote_options="default")
+            
+            result = self.manager.write_table(data, table_name, mode=mode, partition_by=partition_by)
+            for future in futures:
+                future.set_result(result)
+                
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+
+
+def _group_appends(batch: List) -> List[List]:
+    """Agrupa solicitudes consecutivas de append a la misma tabla y particionado"""
+    groups = []
+    for request in batch:
+        _, table_name, mode, partition_by, save, _ = request
+        if groups and mode == "append" and not save:
+            _, last_table, last_mode, last_partition, last_save, _ = groups[-1][-1]
+            if (last_table, last_mode, last_partition, last_save) == (table_name, mode, partition_by, save):
+                groups[-1].append(request)
+                continue
+        groups.append([request])
+    return groups
+
+
+def commit_retry_delay(attempt: int) -> float:
+    """Delay con backoff exponencial y jitter antes del reintento attempt"""
+    delay = COMMIT_CONFIG["retry_delay"] * (COMMIT_CONFIG["backoff_factor"] ** attempt)
+    return min(delay, COMMIT_CONFIG["max_delay"]) * random.uniform(0.5, 1.0)
+
+
+def get_storage_profile(table_name: str) -> str:
+    """Nombre del perfil de almacenamiento de una tabla"""
+    return TABLE_STORAGE_PROFILES.get(table_name, DELTA_CONFIG["storage_profile"])
+
+
+def build_writer_properties(profile: Dict, columns: List[str]) -> WriterProperties:
+    """
+    Construye las propiedades de escritura Parquet de un perfil
+    
+    Args:
+        profile: Perfil de STORAGE_PROFILES
+        columns: Columnas de los datos a escribir (las columnas del perfil
+                 que no existan en los datos se ignoran)
+    
+    Returns:
+        WriterProperties para write_deltalake (motor rust)
+    """
+    dictionary_columns = set(profile["dictionary_columns"]) & set(columns)
+    bloom_columns = set(profile["bloom_filter_columns"]) & set(columns)
+    
+    column_properties = {}
+    for col in dictionary_columns | bloom_columns:
+        column_properties[col] = ColumnProperties(
+            dictionary_enabled=col in dictionary_columns,
+            max_statistics_size=profile["max_statistics_size"],
+            bloom_filter_properties=BloomFilterProperties(set_bloom_filter_enabled=True)
+            if col in bloom_columns else None
+        )
+    
+    return WriterProperties(
+        compression=profile["compression"],
+        compression_level=profile["compression_level"],
+        max_row_group_size=profile["max_row_group_size"],
+        data_page_size_limit=profile["data_page_size_limit"],
+        default_column_properties=ColumnProperties(
+            dictionary_enabled=False,
+            max_statistics_size=profile["max_statistics_size"]
+        ),
+        column_properties=column_properties or None
+    )
+
+
+def snapshot_path(table_path: str, version: int) -> str:
+    """Ruta del snapshot Arrow IPC de una versión de la tabla"""
+    return os.path.join(table_path, SNAPSHOT_CONFIG["snapshot_dir"], f"v{version}.arrow")
+
+
+def load_snapshot(table_path: str, dt: Optional[DeltaTable] = None) -> pa.Table:
+    """
+    Carga la última versión de una tabla Delta desde su snapshot Arrow IPC
+    
+    El snapshot se invalida por número de versión: si no existe el de la
+    versión actual se genera desde los Parquet y se eliminan los anteriores.
+    
+    Args:
+        table_path: Ruta de la tabla Delta
+        dt: DeltaTable ya abierta (opcional)
+    
+    Returns:
+        Tabla Arrow (respaldada por memory-map si el snapshot no está comprimido)
+    """
+    dt = dt or DeltaTable(table_path)
+    path = snapshot_path(table_path, dt.version())
+    
+    if os.path.exists(path):
+        with pa.memory_map(path, 'r') as source:
+            return pa.ipc.open_file(source).read_all()
+    
+    table = dt.to_pyarrow_table()
+    
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    options = pa.ipc.IpcWriteOptions(compression=SNAPSHOT_CONFIG["compression"])
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+    
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Otro proceso ya publicó (y puede tener mapeado) el mismo snapshot
+        os.remove(tmp_path)
+    
+    # Eliminar snapshots de versiones anteriores (en Windows pueden seguir
+    # mapeados por otro proceso: se reintentará en la próxima generación)
+    for name in os.listdir(os.path.dirname(path)):
+        old_path = os.path.join(os.path.dirname(path), name)
+        if old_path != path and name.endswith(".arrow"):
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+    
+    return table
+
+
+def content_hash(df: pd.DataFrame, exclude: Optional[List[str]] = None) -> pd.Series:
+    """
+    Calcula un hash de contenido por fila (uint64), estable entre lecturas
+    
+    Las columnas se ordenan por nombre y los valores anidados (listas,
+    diccionarios, arrays) se serializan a JSON antes de hashear.
+    
+    Args:
+        df: DataFrame a hashear
+        exclude: Columnas a ignorar (por defecto METADATA_COLUMNS)
+    
+    Returns:
+        Serie uint64 con el mismo índice que df
+    """
+    if exclude is None:
+        exclude = METADATA_COLUMNS
+    
+    columns = sorted(c for c in df.columns if c not in exclude)
+    normalized = df[columns].copy()
+    
+    for col in columns:
+        if normalized[col].dtype == object:
+            normalized[col] = normalized[col].map(_serialize_nested).astype(str)
+    
+    return pd.util.hash_pandas_object(normalized, index=False)
+
+
+def _serialize_nested(value):
+    """Serializa valores anidados a JSON para poder hashearlos"""
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+def nested_arrow_table(df: pd.DataFrame, list_column: str) -> pa.Table:
+    """
+    Tabla Arrow con 'id' y una columna anidada de un DataFrame
+    
+    Si Arrow no puede inferir un tipo común para las listas (objetos con
+    campos heterogéneos), se serializan a JSON y explode_list_column las
+    parsea.
+    """
+    subset = df[["id", list_column]]
+    try:
+        return pa.Table.from_pandas(subset, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        subset = subset.assign(**{list_column: subset[list_column].map(_serialize_nested)})
+        return pa.Table.from_pandas(subset, preserve_index=False)
+
+
+def in_predicate(column: str, values: List[str]) -> str:
+    """Predicado SQL 'column IN (...)' con literales de texto escapados"""
+    if not values:
+        return "false"
+    literals = ", ".join("'" + str(value).replace("'", "''") + "'" for value in values)
+    return f"{column} IN ({literals})"
+
+
+def explode_list_column(table: pa.Table, list_column: str, parent_key: str,
+                        fields: Dict[str, str]) -> pa.Table:
+    """
+    Aplana una columna lista-de-objetos en una tabla de relación padre → hijo
+    
+    Acepta la columna como list<struct> (escritura nativa) o como JSON
+    serializado en string (formato legacy, que se parsea una sola vez).
+    
+    Args:
+        table: Tabla con la columna 'id' del padre y la columna lista
+        list_column: Columna con la lista de objetos
+        parent_key: Nombre de la columna destino con el id del padre
+        fields: Campo del objeto → columna destino
+    
+    Returns:
+        Tabla Arrow con parent_key + columnas de fields, sin duplicados
+    """
+    lists = table.column(list_column).combine_chunks()
+    
+    if pa.types.is_string(lists.type) or pa.types.is_large_string(lists.type):
+        lists = _parse_json_lists(lists, list(fields))
+    
+    flat = pc.list_flatten(lists)
+    parent_index = pc.list_parent_indices(lists)
+    
+    columns = {parent_key: pc.take(table.column("id"), parent_index).cast(pa.string())}
+    struct_type = flat.type
+    for source, target in fields.items():
+        if struct_type.get_field_index(source) >= 0:
+            values = pc.struct_field(flat, source)
+        else:
+            values = pa.nulls(len(flat))
+        columns[target] = values.cast(pa.string())
+    
+    links = pa.table(columns)
+    
+    # El primer campo es el id del hijo: sin él no hay relación
+    child_key = next(iter(fields.values()))
+    links = links.filter(pc.is_valid(links.column(child_key)))
+    
+    return links.group_by(list(links.column_names)).aggregate([])
+
+
+def _parse_json_lists(values: pa.Array, fields: List[str]) -> pa.Array:
+    """Parsea listas serializadas como JSON (o repr Python) a list<struct>"""
+    parsed = []
+    for text in values.to_pylist():
+        items = None
+        if text:
+            try:
+                items = json.loads(text)
+            except ValueError:
+                try:
+                    items = ast.literal_eval(text)
+                except (ValueError, SyntaxError):
+                    items = None
+        if isinstance(items, list):
+            parsed.append([
+                {f: None if item.get(f) is None else str(item.get(f)) for f in fields}
+                for item in items if isinstance(item, dict)
+            ])
+        else:
+            parsed.append(None)
+    
+    struct_type = pa.struct([(f, pa.string()) for f in fields])
+    return pa.array(parsed, type=pa.list_(struct_type))
+
 
+def _merge_bound(current, value, func):
+    """Combina dos cotas (min/max) ignorando nulos y tipos no comparables"""
+    if value is None:
+        return current
+    if current is None:
+        return value
+    try:
+        return func(current, value)
+    except TypeError:
+        return current
 
 def main():
     """Función de prueba"""
@@ -228,7 +1360,7 @@ def main():
             if "error" not in stats:
                 print(f"Registros: {stats['records']}")
                 print(f"Columnas: {stats['columns']}")
-                print(f"Memoria: {stats['memory_usage_mb']:.2f} MB")
+                print(f"Tamaño: {stats['size_mb']:.2f} MB")
 
 
 if __name__ == "__main__":
@@ -1,82 +1,94 @@
 """Explorar relaciones market-event-tag"""
-import pandas as pd
-import json
+from delta_query import get_engine
+
+engine = get_engine()
 
 print("Explorando relaciones market-event-tag...\n")
 
-df_markets = pd.read_csv("data/exported/markets_20260216_193645.csv", low_memory=False)
-df_events = pd.read_csv("data/exported/events_20260216_193533.csv", low_memory=False)
+market_cols = [col for col in engine.columns('markets') if 'event' in col.lower() or 'tag' in col.lower()]
+event_cols = [col for col in engine.columns('events') if 'market' in col.lower() or 'tag' in col.lower()]
 
 print("="*70)
 print("COLUMNAS EN MARKETS:")
 print("="*70)
-print([col for col in df_markets.columns if 'event' in col.lower() or 'tag' in col.lower()])
+print(market_cols)
 
 print("\n" + "="*70)
 print("EJEMPLO DE MARKET:")
 print("="*70)
-market_sample = df_markets.iloc[0]
+market_sample = engine.query("SELECT * FROM markets LIMIT 1").to_pylist()[0]
 print(f"ID: {market_sample.get('id')}")
 print(f"Question: {market_sample.get('question')}")
 
 # Verificar todas las columnas que podrían tener relación
-for col in df_markets.columns:
-    val = market_sample.get(col)
-    if 'event' in col.lower() or 'tag' in col.lower():
-        print(f"{col}: {val}")
+for col in market_cols:
+    print(f"{col}: {market_sample.get(col)}")
 
 print("\n" + "="*70)
 print("COLUMNAS EN EVENTS:")
 print("="*70)
-print([col for col in df_events.columns if 'market' in col.lower() or 'tag' in col.lower()])
+print(event_cols)
 
 print("\n" + "="*70)
 print("EJEMPLO DE EVENT:")
 print("="*70)
-event_sample = df_events.iloc[0]
+event_sample = engine.query("SELECT * FROM events LIMIT 1").to_pylist()[0]
 print(f"ID: {event_sample.get('id')}")
 print(f"Title: {event_sample.get('title')}")
 
 # Verificar columnas relevantes
-for col in df_events.columns:
-    if 'market' in col.lower() or 'tag' in col.lower():
-        val = event_sample.get(col)
-        if pd.notna(val):
-            val_str = str(val)
-            if len(val_str) > 100:
-                val_str = val_str[:100] + "..."
-            print(f"{col}: {val_str}")
+for col in event_cols:
+    val = event_sample.get(col)
+    if val is not None:
+        val_str = str(val)
+        if len(val_str) > 100:
+            val_str = val_str[:100] + "..."
+        print(f"{col}: {val_str}")
 
-# Buscar event con tags y markets
+# Buscar event con tags y markets en las tablas de relación
 print("\n" + "="*70)
 print("BUSCANDO EVENT CON TAGS Y MARKETS:")
 print("="*70)
 
-for idx, row in df_events.head(50).iterrows():
-    tags = row.get('tags')
-    markets = row.get('markets')
+if 'event_tags' not in engine.views or 'event_markets' not in engine.views:
+    print("Tablas event_tags / event_markets no disponibles (reescribir events)")
+else:
+    rows = engine.query("""
+        WITH t AS (
+            SELECT event_id, COUNT(*) AS n_tags, FIRST(tag_slug) AS tag_ejemplo
+            FROM event_tags GROUP BY event_id
+        ),
+        m AS (
+            SELECT event_id, COUNT(*) AS n_markets, FIRST(market_id) AS market_ejemplo
+            FROM event_markets GROUP BY event_id
+        )
+        SELECT e.id, e.title, t.n_tags, t.tag_ejemplo, m.n_markets, m.market_ejemplo
+        FROM events e
+        JOIN t ON t.event_id = CAST(e.id AS VARCHAR)
+        JOIN m ON m.event_id = CAST(e.id AS VARCHAR)
+        LIMIT 1
+    """).to_pylist()
+    
+    for row in rows:
+        print(f"\nEvent ID: {row['id']}")
+        print(f"Title: {(row['title'] or '')[:60]}")
+        print(f"  -> {row['n_tags']} tags, {row['n_markets']} markets")
+        print(f"  Tag ejemplo: {row['tag_ejemplo']}")
+        print(f"  Market ejemplo: {row['market_ejemplo']}")
+
+# Cobertura global de las relaciones
+if 'event_tags' in engine.views and 'event_markets' in engine.views:
+    coverage = engine.query("""
+        SELECT
+            (SELECT COUNT(*) FROM events) AS events,
+            (SELECT COUNT(DISTINCT event_id) FROM event_tags) AS events_con_tags,
+            (SELECT COUNT(DISTINCT event_id) FROM event_markets) AS events_con_markets,
+            (SELECT COUNT(*) FROM event_markets) AS relaciones_event_market,
+            (SELECT COUNT(*) FROM event_tags) AS relaciones_event_tag
+    """).to_pylist()[0]
     
-    if pd.notna(tags) and pd.notna(markets):
-        tags_str = str(tags)
-        markets_str = str(markets)
-        
-        if tags_str not in ['[]', ''] and markets_str not in ['[]', '']:
-            print(f"\nEvent ID: {row.get('id')}")
-            print(f"Title: {row.get('title')[:60]}")
-            print(f"Tags: {tags_str[:150]}...")
-            print(f"Markets: {markets_str[:150]}...")
-            
-            # Parsear
-            try:
-                tags_list = json.loads(tags_str.replace("'", '"'))
-                markets_list = json.loads(markets_str.replace("'", '"'))
-                print(f"  -> {len(tags_list)} tags, {len(markets_list)} markets")
-                
-                if len(tags_list) > 0:
-                    print(f"  Tag ejemplo: {tags_list[0]}")
-                if len(markets_list) > 0:
-                    print(f"  Market ejemplo: {markets_list[0]}")
-            except Exception as e:
-                print(f"  Error parseando: {e}")
-            
-            break
+    print("\n" + "="*70)
+    print("COBERTURA DE RELACIONES:")
+    print("="*70)
+    for name, value in coverage.items():
+        print(f"{name:25s}: {value:,}")
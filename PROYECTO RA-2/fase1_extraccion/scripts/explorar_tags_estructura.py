@@ -1,50 +1,57 @@
 """Explorar estructura de tags en eventos"""
-import pandas as pd
-import json
+from delta_query import get_engine
 
-df_events = pd.read_csv("data/exported/events_20260216_193533.csv", low_memory=False)
+engine = get_engine()
 
 print("Explorando estructura de tags en events...\n")
 
-# Buscar un evento que tenga tags y markets
-for idx, row in df_events.head(100).iterrows():
-    tags_str = row.get('tags')
-    markets_str = row.get('markets')
+if 'event_tags' not in engine.views or 'event_markets' not in engine.views:
+    print("Tablas event_tags / event_markets no disponibles (reescribir events)")
+else:
+    # Eventos que tienen tags y markets, con hasta 3 ejemplos de cada uno
+    rows = engine.query("""
+        WITH t AS (
+            SELECT event_id, COUNT(*) AS n_tags,
+                   LIST({'id': tag_id, 'slug': tag_slug, 'label': tag_label})[1:3] AS tags
+            FROM event_tags GROUP BY event_id
+        ),
+        m AS (
+            SELECT event_id, COUNT(*) AS n_markets,
+                   LIST({'id': market_id, 'conditionId': condition_id})[1:3] AS markets
+            FROM event_markets GROUP BY event_id
+        )
+        SELECT e.id, e.title, t.n_tags, t.tags, m.n_markets, m.markets
+        FROM events e
+        JOIN t ON t.event_id = CAST(e.id AS VARCHAR)
+        JOIN m ON m.event_id = CAST(e.id AS VARCHAR)
+        LIMIT 12
+    """).to_pylist()
     
-    if pd.notna(tags_str) and pd.notna(markets_str):
-        try:
-            # Parsear tags
-            tags_list = json.loads(tags_str.replace("'", '"')) if isinstance(tags_str, str) else tags_str
-            markets_list = json.loads(markets_str.replace("'", '"')) if isinstance(markets_str, str) else markets_str
-            
-            if isinstance(tags_list, list) and len(tags_list) > 0:
-                if isinstance(markets_list, list) and len(markets_list) > 0:
-                    print(f"Evento {row.get('id')} - '{row.get('title', '')[:60]}'")
-                    print(f"  Tags ({len(tags_list)}):")
-                    for tag in tags_list[:3]:
-                        print(f"    {tag}")
-                    print(f"  Markets ({len(markets_list)}):")
-                    for market in markets_list[:3]:
-                        print(f"    {market}")
-                    print()
-                    
-                    if idx > 10:  # Ya tenemos suficiente info
-                        break
-        except Exception as e:
-            continue
+    for row in rows:
+        print(f"Evento {row['id']} - '{(row['title'] or '')[:60]}'")
+        print(f"  Tags ({row['n_tags']}):")
+        for tag in row['tags']:
+            print(f"    {tag}")
+        print(f"  Markets ({row['n_markets']}):")
+        for market in row['markets']:
+            print(f"    {market}")
+        print()
 
 print("\n" + "="*80)
 print("\nVerificando si markets tienen tags directamente...")
 
-df_markets = pd.read_csv("data/exported/markets_20260216_193645.csv", low_memory=False)
+tag_cols = [c for c in engine.columns('markets') if 'tag' in c.lower()]
 
 # Ver si markets tiene una columna tags
-print(f"\nColumnas en markets CSV que contienen 'tag': {[c for c in df_markets.columns if 'tag' in c.lower()]}")
+print(f"\nColumnas en markets que contienen 'tag': {tag_cols}")
 
 # Buscar market que tenga tags
-if 'tags' in df_markets.columns:
-    for idx, row in df_markets.head(100).iterrows():
-        tags_str = row.get('tags')
-        if pd.notna(tags_str) and tags_str != '[]':
-            print(f"\nMarket {row.get('id')}: {tags_str}")
-            break
+if 'tags' in tag_cols:
+    rows = engine.query("""
+        SELECT id, CAST(tags AS VARCHAR) AS tags
+        FROM markets
+        WHERE tags IS NOT NULL AND CAST(tags AS VARCHAR) NOT IN ('[]', '')
+        LIMIT 1
+    """).to_pylist()
+    for row in rows:
+        print(f"\nMarket {row['id']}: {row['tags']}")
@@ -10,6 +10,8 @@ from extract_tags import TagsExtractor
 from extract_events import EventsExtractor
 from extract_series import SeriesExtractor
 from extract_markets import MarketsExtractor
+from silver_layer import SilverLayerBuilder
+from delta_utils import DeltaLakeManager
 
 
 class PolymarketDataExtractor:
@@ -23,6 +25,10 @@ class PolymarketDataExtractor:
             "series": None,
             "markets": None
         }
+        # Los lotes se confirman en Delta Lake desde un único hilo writer
+        # mientras se extrae el siguiente endpoint
+        self.delta = DeltaLakeManager()
+        self.saves = {}
         
     def _setup_logger(self) -> logging.Logger:
         """Configurar el logger principal"""
@@ -57,8 +63,8 @@ class PolymarketDataExtractor:
             
             if tags:
                 self.results["tags"] = len(tags)
-                extractor.save_to_delta(tags, "tags")
-                self.logger.info(f"✓ Tags extraídos: {len(tags)} registros")
+                self.saves["tags"] = self.delta.submit_save(tags, "tags")
+                self.logger.info(f"✓ Tags extraídos: {len(tags)} registros (guardando en Delta Lake)")
                 return True
             else:
                 self.logger.error("✗ No se pudieron extraer los tags")
@@ -80,8 +86,8 @@ class PolymarketDataExtractor:
             
             if events:
                 self.results["events"] = len(events)
-                extractor.save_to_delta(events, "events")
-                self.logger.info(f"✓ Events extraídos: {len(events)} registros")
+                self.saves["events"] = self.delta.submit_save(events, "events")
+                self.logger.info(f"✓ Events extraídos: {len(events)} registros (guardando en Delta Lake)")
                 return True
             else:
                 self.logger.error("✗ No se pudieron extraer los events")
@@ -103,8 +109,8 @@ class PolymarketDataExtractor:
             
             if series:
                 self.results["series"] = len(series)
-                extractor.save_to_delta(series, "series")
-                self.logger.info(f"✓ Series extraídas: {len(series)} registros")
+                self.saves["series"] = self.delta.submit_save(series, "series")
+                self.logger.info(f"✓ Series extraídas: {len(series)} registros (guardando en Delta Lake)")
                 return True
             else:
                 self.logger.error("✗ No se pudieron extraer las series")
@@ -126,8 +132,8 @@ class PolymarketDataExtractor:
             
             if markets:
                 self.results["markets"] = len(markets)
-                extractor.save_to_delta(markets, "markets")
-                self.logger.info(f"✓ Markets extraídos: {len(markets)} registros")
+                self.saves["markets"] = self.delta.submit_save(markets, "markets")
+                self.logger.info(f"✓ Markets extraídos: {len(markets)} registros (guardando en Delta Lake)")
                 return True
             else:
                 self.logger.error("✗ No se pudieron extraer los markets")
@@ -137,6 +143,69 @@ class PolymarketDataExtractor:
             self.logger.error(f"✗ Error en extracción de markets: {str(e)}")
             return False
     
+    def wait_for_saves(self) -> Dict[str, bool]:
+        """Espera a que el hilo writer confirme los lotes encolados"""
+        self.delta.close()
+        
+        results = {}
+        for table, future in self.saves.items():
+            try:
+                results[table] = bool(future.result())
+            except Exception as e:
+                self.logger.error(f"✗ Error al guardar {table} en Delta Lake: {str(e)}")
+                results[table] = False
+            
+            if results[table]:
+                self.logger.info(f"✓ {table} guardado en Delta Lake")
+            else:
+                self.logger.error(f"✗ {table} no se pudo guardar en Delta Lake")
+        
+        return results
+    
+    def replay_pending_writes(self, refreshed: List[str]) -> Dict[str, int]:
+        """
+        Confirma los appends que quedaron pendientes en ejecuciones anteriores
+        
+        Se ejecuta después de las extracciones y omite las tablas que esta
+        ejecución reescribió completas (overwrite): sus lotes pendientes son
+        anteriores al snapshot nuevo y se quedan en _pending.
+        """
+        try:
+            results = {}
+            for table in self.delta.pending_tables():
+                if table in refreshed:
+                    self.logger.warning(f"⚠ Pendientes {table}: omitidos, la tabla se acaba de reescribir")
+                    continue
+                results.update(self.delta.replay_pending(table))
+            
+            for table, batches in results.items():
+                self.logger.info(f"✓ Pendientes {table}: {batches} lotes confirmados")
+            
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"✗ Error al confirmar lotes pendientes: {str(e)}")
+            return {}
+    
+    def build_silver_layer(self) -> Dict[str, bool]:
+        """Construye las tablas Silver tipadas a partir de las tablas Bronze"""
+        try:
+            self.logger.info("=" * 60)
+            self.logger.info("Construyendo capa SILVER")
+            self.logger.info("=" * 60)
+            
+            results = SilverLayerBuilder().build_all()
+            
+            for table, success in results.items():
+                status = "✓" if success else "✗"
+                self.logger.info(f"{status} Silver {table}")
+            
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"✗ Error al construir la capa Silver: {str(e)}")
+            return {}
+    
     def run_all_extractions(self) -> Dict[str, bool]:
         """Ejecuta todas las extracciones"""
         self.logger.info("╔" + "═" * 58 + "╗")
@@ -152,6 +221,17 @@ class PolymarketDataExtractor:
             "markets": self.extract_markets()
         }
         
+        # Una extracción solo cuenta como exitosa si su lote se confirmó
+        saved = self.wait_for_saves()
+        for endpoint, success in saved.items():
+            extraction_results[endpoint] = extraction_results[endpoint] and success
+        
+        self.replay_pending_writes(refreshed=[table for table, success in saved.items() if success])
+        
+        # Tipar una sola vez los datos Bronze para las etapas posteriores
+        if any(extraction_results.values()):
+            self.build_silver_layer()
+        
         end_time = datetime.now()
         duration = end_time - start_time
         
@@ -0,0 +1,200 @@
+"""
+Capa Silver: tablas Delta tipadas y normalizadas derivadas de la capa Bronze
+Lee cada tabla Bronze una sola vez y escribe su versión Silver con:
+- Timestamps parseados (UTC)
+- Decimales como float64 y enteros como Int64
+- Booleanos coercionados
+- outcomePrices desanidado en columnas numéricas
+- Strings vacíos normalizados a nulos y registros deduplicados por id
+"""
+import logging
+import sys
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import DELTA_DIR, SILVER_DIR, SILVER_SCHEMAS
+from delta_utils import DeltaLakeManager
+
+
+# Valores aceptados como booleanos en la capa Bronze
+BOOLEAN_VALUES = {
+    True: True, False: False,
+    "true": True, "false": False,
+    "True": True, "False": False,
+    "1": True, "0": False
+}
+
+# outcomePrices llega como '["0.45", "0.55"]' (o como repr de lista Python)
+OUTCOME_PRICES_PATTERN = (
+    r"^\s*\[\s*['\"]?(?P<yes>[^'\",\]\s]+)['\"]?"
+    r"\s*(?:,\s*['\"]?(?P<no>[^'\",\]\s]+)['\"]?)?"
+)
+
+
+def to_timestamp(values: pd.Series) -> pd.Series:
+    """Convierte una columna a timestamps UTC (valores inválidos → NaT)"""
+    return pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+
+
+def to_float(values: pd.Series) -> pd.Series:
+    """Convierte una columna a float64 (valores inválidos o infinitos → NaN)"""
+    numbers = pd.to_numeric(values, errors="coerce").astype("float64")
+    return numbers.replace([np.inf, -np.inf], np.nan)
+
+
+def to_integer(values: pd.Series) -> pd.Series:
+    """Convierte una columna a Int64 nullable (valores no enteros → NA)"""
+    numbers = to_float(values)
+    return numbers.where(numbers == numbers.round()).astype("Int64")
+
+
+def to_boolean(values: pd.Series) -> pd.Series:
+    """Convierte una columna a boolean nullable"""
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype("boolean")
+    return values.map(BOOLEAN_VALUES).astype("boolean")
+
+
+def split_outcome_prices(values: pd.Series) -> pd.DataFrame:
+    """
+    Desanida outcomePrices en dos columnas numéricas
+
+    Returns:
+        DataFrame con columnas outcomePriceYes y outcomePriceNo
+    """
+    prices = values.astype("string").str.extract(OUTCOME_PRICES_PATTERN)
+    return pd.DataFrame({
+        "outcomePriceYes": to_float(prices["yes"]),
+        "outcomePriceNo": to_float(prices["no"])
+    }, index=values.index)
+
+
+def normalize_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Convierte strings vacíos o con solo espacios en nulos"""
+    for col in df.columns:
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) == "string":
+            df[col] = df[col].where(df[col].str.strip() != "")
+    return df
+
+
+class SilverLayerBuilder:
+    """Construye las tablas Silver a partir de las tablas Bronze"""
+
+    def __init__(self, bronze_path: str = DELTA_DIR, silver_path: str = SILVER_DIR):
+        self.bronze = DeltaLakeManager(bronze_path)
+        self.silver = DeltaLakeManager(silver_path)
+        self.logger = self._setup_logger()
+
+    def _setup_logger(self) -> logging.Logger:
+        """Configurar el logger"""
+        logger = logging.getLogger("SilverLayerBuilder")
+        logger.setLevel(logging.INFO)
+
+        if not logger.handlers:
+            handler = logging.FileHandler(f"logs/silver_layer_{datetime.now().strftime('%Y%m%d')}.log")
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+
+        return logger
+
+    def transform(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+        """
+        Aplica el tipado Silver a un DataFrame Bronze
+
+        Args:
+            df: DataFrame leído de la tabla Bronze
+            table_name: Nombre de la tabla (clave de SILVER_SCHEMAS)
+
+        Returns:
+            DataFrame tipado y deduplicado
+        """
+        schema = SILVER_SCHEMAS[table_name]
+        df = normalize_strings(df.copy())
+
+        for col in schema["timestamps"]:
+            if col in df.columns:
+                df[col] = to_timestamp(df[col])
+
+        for col in schema["floats"]:
+            if col in df.columns:
+                df[col] = to_float(df[col])
+
+        for col in schema["integers"]:
+            if col in df.columns:
+                df[col] = to_integer(df[col])
+
+        for col in schema["booleans"]:
+            if col in df.columns:
+                df[col] = to_boolean(df[col])
+
+        prices_col = schema["outcome_prices"]
+        if prices_col and prices_col in df.columns:
+            prices = split_outcome_prices(df[prices_col])
+            df["outcomePriceYes"] = prices["outcomePriceYes"]
+            df["outcomePriceNo"] = prices["outcomePriceNo"]
+
+        # Deduplicar por id quedándonos con la extracción más reciente
+        if "id" in df.columns:
+            if "_extraction_timestamp" in df.columns:
+                df = df.sort_values("_extraction_timestamp", kind="stable")
+            df = df.drop_duplicates(subset=["id"], keep="last").reset_index(drop=True)
+
+        return df
+
+    def build_table(self, table_name: str) -> bool:
+        """
+        Construye la tabla Silver de una entidad
+
+        Args:
+            table_name: Nombre de la tabla Bronze
+
+        Returns:
+            True si se construyó exitosamente, False en caso contrario
+        """
+        try:
+            df = self.bronze.read_delta_table(table_name)
+            if df is None:
+                self.logger.error(f"No se pudo leer la tabla Bronze {table_name}")
+                return False
+
+            silver_df = self.transform(df, table_name)
+            self.logger.info(
+                f"Tabla {table_name}: {len(df)} registros Bronze → {len(silver_df)} registros Silver"
+            )
+
+            return self.silver.write_table(silver_df, table_name, mode="overwrite")
+
+        except Exception as e:
+            self.logger.error(f"Error al construir la tabla Silver {table_name}: {str(e)}")
+            return False
+
+    def build_all(self, tables: Optional[list] = None) -> Dict[str, bool]:
+        """Construye todas las tablas Silver disponibles en Bronze"""
+        if tables is None:
+            tables = [t for t in SILVER_SCHEMAS if t in self.bronze.list_tables()]
+
+        return {table: self.build_table(table) for table in tables}
+
+
+def main():
+    """Función principal"""
+    print("\n" + "=" * 60)
+    print(" CONSTRUCCIÓN DE LA CAPA SILVER ".center(60))
+    print("=" * 60 + "\n")
+
+    builder = SilverLayerBuilder()
+    results = builder.build_all(sys.argv[1:] or None)
+
+    for table, success in results.items():
+        status = "✓" if success else "✗"
+        print(f"{status} {table}")
+
+    return 0 if results and all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Benchmark de carga: execute_values + ON CONFLICT vs COPY a staging
+Genera filas sintéticas con el ancho de fact_market_metrics (claves,
+~35 métricas numéricas y timestamp) y las carga en una tabla temporal con
+cada método, repitiendo la carga para medir también el camino de UPDATE.
+
+Uso:
+    python fase2_warehouse/benchmark_bulk_load.py [development|production] [filas]
+"""
+import random
+import sys
+import os
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+# Agregar path para imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+from fase2_warehouse.bulk_loader import BulkLoader
+
+BENCHMARK_TABLE = "bench_fact_market_metrics"
+
+METRIC_COLUMNS = [f"metric_{i:02d}" for i in range(35)]
+COLUMNS = ['market_key', 'snapshot_date_key', 'event_key', 'series_key'] + METRIC_COLUMNS + ['extraction_timestamp']
+CONFLICT_COLUMNS = ['market_key', 'snapshot_date_key']
+UPDATE_COLUMNS = METRIC_COLUMNS + ['extraction_timestamp']
+
+
+def synthetic_records(num_rows: int, seed: int = 42) -> List[tuple]:
+    """Filas sintéticas; ~5% de métricas nulas como en los datos reales"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [
+        (i, 20260101, i // 10, i // 1000)
+        + tuple(None if rng.random() < 0.05 else rng.uniform(0, 1e6) for _ in METRIC_COLUMNS)
+        + (now,)
+        for i in range(num_rows)
+    ]
+
+
+def create_table(conn):
+    """Crea la tabla temporal de destino con la restricción de conflicto"""
+    metrics = ', '.join(f"{col} NUMERIC(20, 6)" for col in METRIC_COLUMNS)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TEMP TABLE {BENCHMARK_TABLE} (
+            market_key INTEGER NOT NULL,
+            snapshot_date_key INTEGER NOT NULL,
+            event_key INTEGER,
+            series_key INTEGER,
+            {metrics},
+            extraction_timestamp TIMESTAMP,
+            UNIQUE (market_key, snapshot_date_key)
+        )
+    """)
+    cursor.close()
+
+
+def load_execute_values(conn, records: List[tuple]) -> int:
+    """Carga con execute_values (método anterior del ETL)"""
+    query = f"""
+        INSERT INTO {BENCHMARK_TABLE} ({', '.join(COLUMNS)}) VALUES %s
+        ON CONFLICT ({', '.join(CONFLICT_COLUMNS)}) DO UPDATE SET
+            {', '.join(f'{col} = EXCLUDED.{col}' for col in UPDATE_COLUMNS)}
+    """
+    cursor = conn.cursor()
+    execute_values(cursor, query, records)
+    cursor.close()
+    return len(records)
+
+
+def load_copy(conn, records: List[tuple]) -> int:
+    """Carga con BulkLoader (COPY a staging + INSERT ... SELECT)"""
+    return BulkLoader(conn).upsert(
+        BENCHMARK_TABLE, COLUMNS, records,
+        conflict_columns=CONFLICT_COLUMNS, update_columns=UPDATE_COLUMNS
+    )
+
+
+def benchmark(conn, records: List[tuple]) -> List[Dict]:
+    """Mide cada método sobre una tabla vacía (insert) y llena (update)"""
+    results = []
+    for name, loader in [('execute_values', load_execute_values), ('copy_staging', load_copy)]:
+        create_table(conn)
+        for phase in ['insert', 'update']:
+            start = time.perf_counter()
+            loader(conn, records)
+            conn.commit()
+            seconds = time.perf_counter() - start
+            results.append({
+                'method': name,
+                'phase': phase,
+                'seconds': seconds,
+                'rows_per_s': len(records) / seconds if seconds else 0
+            })
+
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE {BENCHMARK_TABLE}")
+        cursor.close()
+        conn.commit()
+
+    return results
+
+
+def main():
+    """Función principal"""
+    args = sys.argv[1:]
+    environment = DEFAULT_ENVIRONMENT
+    if args and args[0] in ['development', 'production']:
+        environment = args.pop(0)
+    num_rows = int(args[0]) if args else 100000
+
+    print("="*60)
+    print("BENCHMARK DE CARGA: execute_values vs COPY")
+    print("="*60)
+
+    records = synthetic_records(num_rows)
+    print(f"\n📦 {num_rows:,} filas sintéticas de {len(COLUMNS)} columnas")
+
+    conn = psycopg2.connect(get_connection_string(environment))
+    try:
+        results = benchmark(conn, records)
+    finally:
+        conn.close()
+
+    print(f"\n{'Método':16s} {'Fase':8s} {'Tiempo (s)':>12s} {'Filas/s':>12s}")
+    print("-" * 52)
+    for r in results:
+        print(f"{r['method']:16s} {r['phase']:8s} {r['seconds']:12.2f} {r['rows_per_s']:12,.0f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
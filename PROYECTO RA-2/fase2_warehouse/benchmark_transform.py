@@ -0,0 +1,112 @@
+"""
+Benchmark de transformación: bucle df.iterrows() vs transform() columnar
+Construye los registros de dim_market y de la staging de hechos a partir de
+la tabla markets del lake (Silver si existe, si no Bronze) o de un CSV
+exportado, con el método anterior (fila a fila con clean_value) y con los
+mapeos vectorizados de transform.py. No necesita conexión a la base.
+
+Uso:
+    python fase2_warehouse/benchmark_transform.py [ruta.csv] [filas]
+"""
+import sys
+import os
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+# Agregar path para imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from delta_utils import DeltaLakeManager
+from config import SILVER_DIR
+from fase2_warehouse.etl_warehouse import MARKET_MAPPING, fact_mapping
+from fase2_warehouse.transform import transform, to_records, source_columns
+
+
+def clean_value(value):
+    """Limpieza por valor del ETL anterior"""
+    if pd.isna(value):
+        return None
+    if isinstance(value, str) and value.strip() == '':
+        return None
+    return value
+
+
+def load_markets(csv_path: str = None) -> pd.DataFrame:
+    """Tabla markets del CSV indicado o del lake (Silver si existe)"""
+    if csv_path:
+        return pd.read_csv(csv_path, low_memory=False)
+
+    silver = DeltaLakeManager(SILVER_DIR)
+    if silver.table_exists('markets'):
+        return silver.read_delta_table('markets')
+    return DeltaLakeManager().read_delta_table('markets')
+
+
+def iterrows_records(df: pd.DataFrame, columns: List[str]) -> List[tuple]:
+    """Método anterior: una tupla por fila con clean_value en cada campo"""
+    records = []
+    for _, row in df.iterrows():
+        records.append(tuple(clean_value(row.get(col)) for col in columns))
+    return records
+
+
+def columnar_records(df: pd.DataFrame, mapping) -> List[tuple]:
+    """Método nuevo: mapeo vectorizado y tuplas al final"""
+    return to_records(transform(df, mapping))
+
+
+def benchmark(df: pd.DataFrame) -> List[Dict]:
+    """Mide ambos métodos para dim_market y la tabla de hechos"""
+    results = []
+    for name, mapping in [('dim_market', MARKET_MAPPING), ('fact_market_metrics', fact_mapping(df))]:
+        columns = source_columns(mapping)
+        timings = {}
+        for method, build in [
+            ('iterrows', lambda: iterrows_records(df, columns)),
+            ('columnar', lambda: columnar_records(df, mapping)),
+        ]:
+            start = time.perf_counter()
+            build()
+            timings[method] = time.perf_counter() - start
+
+        for method, seconds in timings.items():
+            results.append({
+                'table': name,
+                'method': method,
+                'seconds': seconds,
+                'rows_per_s': len(df) / seconds if seconds else 0,
+                'speedup': timings['iterrows'] / seconds if seconds else 0
+            })
+
+    return results
+
+
+def main():
+    """Función principal"""
+    args = sys.argv[1:]
+    csv_path = args.pop(0) if args and args[0].endswith('.csv') else None
+    num_rows = int(args[0]) if args else None
+
+    print("="*60)
+    print("BENCHMARK DE TRANSFORMACIÓN: iterrows vs columnar")
+    print("="*60)
+
+    df = load_markets(csv_path)
+    if num_rows:
+        df = df.head(num_rows)
+    print(f"\n📦 {len(df):,} mercados de {csv_path or 'Delta Lake'}")
+
+    results = benchmark(df)
+
+    print(f"\n{'Tabla':22s} {'Método':10s} {'Tiempo (s)':>12s} {'Filas/s':>12s} {'Speedup':>9s}")
+    print("-" * 69)
+    for r in results:
+        print(f"{r['table']:22s} {r['method']:10s} {r['seconds']:12.2f} {r['rows_per_s']:12,.0f} {r['speedup']:8.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Tabla puente market-tag construida por columnas
+Las relaciones evento → mercados y evento → tags se desanidan con explode
+de pandas a partir de las listas de cada evento (cada payload JSON distinto
+se parsea una sola vez) o se toman de las tablas de relación del lake
+(event_markets, event_tags). Ambas se copian (COPY) a tablas temporales y
+el join por event_id, la resolución de market_key/tag_key contra las
+versiones vigentes y la sincronización de bridge_market_tag se hacen en el
+servidor con sentencias por conjuntos.
+
+El llamador decide cuándo hacer commit.
+"""
+import logging
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from fase2_warehouse.bulk_loader import BulkLoader
+from fase2_warehouse.transform import as_text, parsed_json, to_records
+
+# Pares (market_key, tag_key) derivados de las relaciones evento-mercado y
+# evento-tag
+BRIDGE_LINKS_SQL = """
+    SELECT DISTINCT m.market_key, t.tag_key
+    FROM {event_markets} em
+    JOIN {event_tags} et ON et.event_id = em.event_id
+    JOIN dim_market m ON m.market_id = em.market_id AND m.is_current
+    JOIN dim_tag t ON t.tag_id = et.tag_id AND t.is_current
+"""
+
+
+def event_links(df_events: pd.DataFrame, list_column: str, id_column: str, key: str = 'id') -> pd.DataFrame:
+    """
+    Desanida una columna de listas de objetos de los eventos (p.ej. markets
+    o tags) en pares únicos (event_id, id_column)
+
+    Args:
+        df_events: Eventos con columna 'id' y la columna de listas
+        list_column: Columna con la lista (JSON serializado o nativa)
+        id_column: Nombre de la columna de ids resultante
+        key: Clave del id en cada objeto de la lista
+    """
+    items = pd.DataFrame({
+        'event_id': as_text('id')(df_events),
+        'item': parsed_json(list_column)(df_events)
+    }).explode('item', ignore_index=True)
+
+    # Listas de objetos ({'id': ...}) o directamente de ids
+    is_object = items['item'].map(lambda value: isinstance(value, dict))
+    ids = items['item'].mask(is_object, items['item'][is_object].str.get(key))
+    links = pd.DataFrame({'event_id': items['event_id'], id_column: ids}).dropna()
+
+    # Los ids numéricos del payload se cargan como texto sin '.0'
+    links[id_column] = as_text(id_column)(links)
+    return links.dropna().drop_duplicates().reset_index(drop=True)
+
+
+def sync_bridge(conn, event_markets: str, event_tags: str) -> Tuple[int, int]:
+    """
+    Sincroniza bridge_market_tag con las relaciones de dos tablas
+    (event_id, market_id) y (event_id, tag_id)
+
+    Se borran solo los pares de los mercados vigentes presentes que ya no
+    existen y se insertan los nuevos (las versiones cerradas conservan sus
+    tags).
+
+    Returns:
+        Relaciones insertadas y eliminadas
+    """
+    links = BRIDGE_LINKS_SQL.format(event_markets=event_markets, event_tags=event_tags)
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        DELETE FROM bridge_market_tag b
+        USING dim_market m
+        WHERE b.market_key = m.market_key
+          AND m.is_current
+          AND m.market_id IN (SELECT market_id FROM {event_markets})
+          AND (b.market_key, b.tag_key) NOT IN ({links})
+    """)
+    removed = cursor.rowcount
+    cursor.execute(f"""
+        INSERT INTO bridge_market_tag (market_key, tag_key)
+        {links}
+        ON CONFLICT (market_key, tag_key) DO NOTHING
+    """)
+    inserted = cursor.rowcount
+    cursor.close()
+    return inserted, removed
+
+
+class BridgeLoader:
+    """Carga bridge_market_tag desde relaciones evento-mercado y evento-tag"""
+
+    def __init__(self, conn, bulk: BulkLoader = None, logger: logging.Logger = None):
+        """
+        Args:
+            conn: Conexión psycopg2 (no se hace commit aquí)
+            bulk: BulkLoader sobre la misma conexión
+            logger: Logger del ETL
+        """
+        self.conn = conn
+        self.bulk = bulk or BulkLoader(conn)
+        self.logger = logger or logging.getLogger("BridgeLoader")
+
+    def _stage(self, name: str, frame: pd.DataFrame, columns) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        cursor.execute(f"CREATE TEMP TABLE {name} ({', '.join(f'{col} TEXT' for col in columns)})")
+        cursor.close()
+        count = self.bulk.copy_rows(name, columns, to_records(frame[columns]))
+        cursor = self.conn.cursor()
+        cursor.execute(f"ANALYZE {name}")
+        cursor.close()
+        return count
+
+    def load(self, event_markets: pd.DataFrame, event_tags: pd.DataFrame) -> Dict[str, int]:
+        """
+        Aplica las relaciones (event_id, market_id) y (event_id, tag_id)
+
+        Returns:
+            Relaciones copiadas de cada lado, insertadas y eliminadas
+        """
+        result = {
+            'event_markets': self._stage('_bridge_event_markets', event_markets, ['event_id', 'market_id']),
+            'event_tags': self._stage('_bridge_event_tags', event_tags, ['event_id', 'tag_id']),
+        }
+        result['inserted'], result['removed'] = sync_bridge(self.conn, '_bridge_event_markets', '_bridge_event_tags')
+
+        cursor = self.conn.cursor()
+        cursor.execute("DROP TABLE _bridge_event_markets, _bridge_event_tags")
+        cursor.close()
+
+        self.logger.info(
+            f"✅ bridge_market_tag: {result['inserted']} relaciones nuevas, {result['removed']} eliminadas "
+            f"({result['event_markets']} evento-mercado, {result['event_tags']} evento-tag)"
+        )
+        return result
+
+    def load_events(self, df_events: pd.DataFrame) -> Dict[str, int]:
+        """Desanida las listas markets y tags de los eventos y las aplica"""
+        return self.load(
+            event_links(df_events, 'markets', 'market_id'),
+            event_links(df_events, 'tags', 'tag_id')
+        )
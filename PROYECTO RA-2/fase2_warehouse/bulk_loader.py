@@ -0,0 +1,197 @@
+"""
+Carga masiva a PostgreSQL (NeonDB) con COPY ... FROM STDIN
+Los registros se envían en streaming (formato texto de COPY) a una tabla
+temporal de staging con los tipos de la tabla destino, y desde ahí se
+insertan en una sola sentencia INSERT ... SELECT ... ON CONFLICT.
+
+Evita construir y parsear un INSERT con VALUES por cada página de
+registros (execute_values): el servidor recibe un flujo de filas y el
+upsert se resuelve en una operación por conjuntos.
+"""
+import io
+import itertools
+import json
+import math
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Valor nulo del formato texto de COPY
+COPY_NULL = '\\N'
+
+
+def copy_text(value) -> str:
+    """Convierte un valor Python al formato texto de COPY"""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, (bool, np.bool_)):
+        return 't' if value else 'f'
+    if isinstance(value, (float, np.floating)):
+        return COPY_NULL if math.isnan(value) or math.isinf(value) else repr(float(value))
+    if isinstance(value, (datetime, date)):
+        # pd.NaT es instancia de datetime y no es igual a sí mismo
+        return COPY_NULL if value != value else value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+
+    text = str(value)
+    return (text.replace('\\', '\\\\')
+                .replace('\t', '\\t')
+                .replace('\n', '\\n')
+                .replace('\r', '\\r'))
+
+
+class CopyStream(io.TextIOBase):
+    """
+    Archivo de solo lectura que genera las líneas de COPY bajo demanda
+    a partir de un iterable de tuplas (no materializa todo el contenido)
+    """
+
+    def __init__(self, records: Iterable[Sequence]):
+        self._lines = ('\t'.join(copy_text(v) for v in record) + '\n' for record in records)
+        self._parts: List[str] = []
+        self._size = 0
+        self.rows = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or self._size < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._parts.append(line)
+            self._size += len(line)
+            self.rows += 1
+
+        data = ''.join(self._parts)
+        if 0 <= size < len(data):
+            data, rest = data[:size], data[size:]
+            self._parts, self._size = [rest], len(rest)
+        else:
+            self._parts, self._size = [], 0
+        return data
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+class BulkLoader:
+    """Carga masiva con COPY sobre una conexión psycopg2 existente"""
+
+    _staging_ids = itertools.count(1)
+
+    def __init__(self, conn, buffer_size: int = 1024 * 1024):
+        """
+        Args:
+            conn: Conexión psycopg2 (las operaciones no hacen commit)
+            buffer_size: Bytes leídos del stream en cada envío de COPY
+        """
+        self.conn = conn
+        self.buffer_size = buffer_size
+
+    def copy_rows(self, table: str, columns: List[str], records: Iterable[Sequence]) -> int:
+        """
+        Copia registros directamente a una tabla con COPY FROM STDIN
+
+        Args:
+            table: Tabla destino
+            columns: Columnas en el orden de cada tupla
+            records: Iterable (lista o generador) de tuplas
+
+        Returns:
+            Número de filas enviadas
+        """
+        stream = CopyStream(records)
+        cursor = self.conn.cursor()
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT text)",
+            stream,
+            size=self.buffer_size
+        )
+        cursor.close()
+        return stream.rows
+
+    def create_staging(self, table: str, columns: List[str]) -> str:
+        """
+        Crea una tabla temporal con las columnas (y tipos) de la tabla destino
+
+        Incluye la columna _ord con el orden de llegada de cada fila.
+
+        Returns:
+            Nombre de la tabla de staging
+        """
+        staging = f"_stg_{table}_{next(self._staging_ids)}"
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            CREATE TEMP TABLE {staging} AS
+            SELECT {', '.join(columns)} FROM {table} WITH NO DATA
+        """)
+        cursor.execute(f"ALTER TABLE {staging} ADD COLUMN _ord BIGSERIAL")
+        cursor.close()
+        return staging
+
+    def drop_staging(self, staging: str):
+        """Elimina una tabla de staging"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.close()
+
+    def upsert(self, table: str, columns: List[str], records: Iterable[Sequence],
+               conflict_columns: List[str], update_columns: Optional[List[str]] = None) -> int:
+        """
+        Upsert masivo: COPY a staging + INSERT ... SELECT ... ON CONFLICT
+
+        Si hay varias filas con la misma clave de conflicto se conserva la
+        última recibida (execute_values fallaría en ese caso).
+
+        Args:
+            table: Tabla destino
+            columns: Columnas en el orden de cada tupla
+            records: Iterable (lista o generador) de tuplas
+            conflict_columns: Columnas de la restricción UNIQUE
+            update_columns: Columnas a actualizar en conflicto
+                            (None o vacío = DO NOTHING)
+
+        Returns:
+            Número de filas insertadas o actualizadas
+        """
+        staging = self.create_staging(table, columns)
+        self.copy_rows(staging, columns, records)
+        count = self.insert_from_staging(table, staging, columns, conflict_columns, update_columns)
+
+        # Si algo falla antes, el rollback del llamador descarta el staging
+        self.drop_staging(staging)
+
+        return count
+
+    def insert_from_staging(self, table: str, staging: str, columns: List[str],
+                            conflict_columns: List[str], update_columns: Optional[List[str]] = None) -> int:
+        """
+        INSERT ... SELECT ... ON CONFLICT desde una tabla de staging de
+        create_staging (si una clave se repite gana la última fila)
+
+        Returns:
+            Número de filas insertadas o actualizadas
+        """
+        column_list = ', '.join(columns)
+        conflict_list = ', '.join(conflict_columns)
+
+        if update_columns:
+            action = "DO UPDATE SET " + ', '.join(f"{col} = EXCLUDED.{col}" for col in update_columns)
+        else:
+            action = "DO NOTHING"
+
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            INSERT INTO {table} ({column_list})
+            SELECT DISTINCT ON ({conflict_list}) {column_list}
+            FROM {staging}
+            ORDER BY {conflict_list}, _ord DESC
+            ON CONFLICT ({conflict_list}) {action}
+        """)
+        count = cursor.rowcount
+        cursor.close()
+        return count
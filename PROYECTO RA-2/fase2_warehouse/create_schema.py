@@ -7,6 +7,9 @@ from neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
 import os
 import sys
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fase2_warehouse.fact_partitions import FactPartitionManager
+
 def create_schema(environment=DEFAULT_ENVIRONMENT):
     """
     Crea el esquema del Data Warehouse en NeonDB
@@ -45,12 +48,17 @@ def create_schema(environment=DEFAULT_ENVIRONMENT):
         
         print("✅ Esquema creado exitosamente")
         
+        # Particiones de la tabla de hechos: mes actual y próximos meses
+        created = FactPartitionManager(conn).ensure_future()
+        print(f"✅ fact_market_metrics: {len(created)} particiones mensuales creadas")
+        
         # Verificar tablas creadas
         cursor.execute("""
             SELECT table_name 
             FROM information_schema.tables 
             WHERE table_schema = 'public' 
             AND table_type = 'BASE TABLE'
+            AND table_name NOT LIKE 'fact_market_metrics_p%'
             ORDER BY table_name;
         """)
         
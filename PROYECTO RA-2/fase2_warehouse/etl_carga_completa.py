@@ -4,8 +4,6 @@ Carga todos los datos sin límites
 """
 import pandas as pd
 import psycopg2
-from psycopg2.extras import execute_values
-import json
 from datetime import datetime
 import sys
 import os
@@ -13,15 +11,142 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+from fase2_warehouse.bulk_loader import BulkLoader
+from fase2_warehouse.scd2 import SCD2Loader
+from fase2_warehouse.fact_snapshot import SnapshotFactLoader
+from fase2_warehouse.pipeline import Pipeline
+from fase2_warehouse.bridge import BridgeLoader, event_links
+from fase2_warehouse.tag_hierarchy import TagHierarchyLoader
+from fase2_warehouse.etl_config import DIMENSION_TABLES, FACT_METRIC_COLUMNS
+from fase2_warehouse.time_dimension import ensure_dim_time
+from fase2_warehouse.transform import (
+    NUMERIC_MAX, complete_mapping, transform, to_records, python_values,
+    source, as_text, as_int, numeric, boolean, prefixed, json_text, list_item
+)
+
+# Columnas del CSV → columnas del warehouse; las columnas sin expresión se
+# cargan con el valor por defecto (False o nulo)
+SERIES_MAPPING = complete_mapping(
+    DIMENSION_TABLES['dim_series']['columns'],
+    {
+        'series_id': as_text('id'),
+        'slug': source('slug'),
+        'title': source('title'),
+        'active': boolean('active'),
+    },
+    defaults={col: False for col in ['closed', 'archived', 'restricted', 'featured']}
+)
+
+TAG_MAPPING = complete_mapping(
+    DIMENSION_TABLES['dim_tag']['columns'],
+    {
+        'tag_id': as_text('id'),
+        'label': source('label'),
+        'slug': source('slug'),
+        'path': prefixed('/', 'slug'),
+    },
+    defaults={
+        'level': 1,
+        **{col: False for col in ['force_show', 'force_hide', 'is_carousel', 'requires_translation']}
+    }
+)
+
+EVENT_MAPPING = complete_mapping(
+    DIMENSION_TABLES['dim_event']['columns'],
+    {
+        'event_id': as_int('id'),
+        'ticker': source('ticker'),
+        'slug': source('slug'),
+        'title': source('title'),
+        'category': source('category'),
+        'active': boolean('active'),
+        'closed': boolean('closed'),
+    },
+    defaults={
+        'competitive': 0,
+        **{col: False for col in [
+            'archived', 'new', 'featured', 'restricted', 'cyom',
+            'show_all_outcomes', 'show_market_images', 'enable_neg_risk',
+            'enable_order_book', 'neg_risk_augmented', 'pending_deployment',
+            'deploying', 'requires_translation', 'comments_enabled'
+        ]}
+    }
+)
+
+MARKET_MAPPING = complete_mapping(
+    DIMENSION_TABLES['dim_market']['columns'],
+    {
+        'market_id': as_text('id'),
+        'condition_id': source('conditionId'),
+        'slug': source('slug'),
+        'question': source('question'),
+        'category': source('category'),
+        'outcomes': json_text('outcomes'),
+        'active': boolean('active'),
+        'closed': boolean('closed'),
+    },
+    defaults={col: False for col in [
+        'archived', 'restricted', 'new', 'featured', 'enable_order_book',
+        'clear_book_on_start', 'fppm_live', 'rfq_enabled', 'neg_risk', 'wide_format'
+    ]}
+)
+
+FACT_COLUMNS = [
+    'market_key', 'event_key', 'series_key', 'snapshot_date_key',
+    'start_date_key', 'end_date_key', 'closed_date_key'
+] + FACT_METRIC_COLUMNS
+
+# Límites por columna: valores fuera de rango (sentinelas) se cargan como NULL
+FACT_MAPPING = complete_mapping(
+    FACT_METRIC_COLUMNS,
+    {
+        'liquidity': numeric('liquidity', NUMERIC_MAX),
+        'liquidity_amm': numeric('liquidityAmm', NUMERIC_MAX),
+        'liquidity_clob': numeric('liquidityClob', NUMERIC_MAX),
+        'volume': numeric('volume', NUMERIC_MAX),
+        'volume_24hr': numeric('volume24hr', NUMERIC_MAX),
+        'volume_1wk': numeric('volume1wk', NUMERIC_MAX),
+        'volume_1mo': numeric('volume1mo', NUMERIC_MAX),
+        'volume_1yr': numeric('volume1yr', NUMERIC_MAX),
+        'volume_amm': numeric('volumeAmm', NUMERIC_MAX),
+        'volume_clob': numeric('volumeClob', NUMERIC_MAX),
+        'volume_24hr_amm': numeric('volume24hrAmm', NUMERIC_MAX),
+        'volume_24hr_clob': numeric('volume24hrClob', NUMERIC_MAX),
+        'volume_1wk_amm': numeric('volume1wkAmm', NUMERIC_MAX),
+        'volume_1wk_clob': numeric('volume1wkClob', NUMERIC_MAX),
+        'volume_1mo_amm': numeric('volume1moAmm', NUMERIC_MAX),
+        'volume_1mo_clob': numeric('volume1moClob', NUMERIC_MAX),
+        'volume_1yr_amm': numeric('volume1yrAmm', NUMERIC_MAX),
+        'volume_1yr_clob': numeric('volume1yrClob', NUMERIC_MAX),
+        # Precios >= 10 no tienen sentido para precios 0-1 (sentinelas)
+        'outcome_price_yes': list_item('outcomePrices', 0, 10),
+        'outcome_price_no': list_item('outcomePrices', 1, 10),
+        'last_trade_price': numeric('lastTradePrice', 1),
+        'best_bid': numeric('bestBid', 1),
+        'best_ask': numeric('bestAsk', 1),
+        'spread': numeric('spread', 1),
+        'price_change_1h': numeric('oneHourPriceChange', 10),
+        'price_change_1d': numeric('oneDayPriceChange', 10),
+        'price_change_1wk': numeric('oneWeekPriceChange', 10),
+        'price_change_1mo': numeric('oneMonthPriceChange', 10),
+        'price_change_1yr': numeric('oneYearPriceChange', 10),
+        'fee': numeric('fee', 1000),  # Fee should be reasonable (<1000%)
+        'taker_base_fee': numeric('takerBaseFee', 1000),
+        'maker_base_fee': numeric('makerBaseFee', 1000),
+        'competitive': numeric('competitive', 1),
+    },
+    defaults={'open_interest': 0, 'comment_count': 0, 'tweet_count': 0}
+)
 
 class ETLCompleto:
     """ETL optimizado para carga completa"""
     
-    def __init__(self, environment=DEFAULT_ENVIRONMENT, batch_size=5000):
+    def __init__(self, environment=DEFAULT_ENVIRONMENT, batch_size=5000, skip_unchanged=False):
         self.environment = environment
         self.conn = None
         self.data_dir = "data/exported"
         self.batch_size = batch_size
+        self.skip_unchanged = skip_unchanged  # omitir mercados sin cambios en el snapshot
         
     def connect(self):
         """Conectar a NeonDB"""
@@ -41,60 +166,16 @@ class ETLCompleto:
             self.conn.close()
             print("\nOK: Conexion cerrada")
     
-    def clean_numeric(self, value, max_val=9999999999):
-        """Limpia valores numéricos y valida rangos"""
-        if pd.isna(value) or value is None:
-            return None
-        try:
-            num = float(value)
-            # Validar rango para NUMERIC(20,10): abs(value) < 10^10
-            if abs(num) >= max_val:
-                return None  # Valor fuera de rango, tratar como NULL
-            return num
-        except:
-            return None
-    
-    def clean_value(self, value):
-        """Limpia valores"""
-        if pd.isna(value):
-            return None
-        if isinstance(value, str) and value.strip() == '':
-            return None
-        return value
-    
-    def parse_json_field(self, value):
-        """Parsea JSON con manejo robusto"""
-        if pd.isna(value) or value is None:
-            return None
-        if isinstance(value, str):
-            try:
-                # Intentar parsear como JSON primero
-                return json.loads(value)
-            except:
-                try:
-                    # Intentar con comillas simples reemplazadas
-                    return json.loads(value.replace("'", '"'))
-                except:
-                    try:
-                        # Evaluar como expresión Python (seguro para listas/dicts)
-                        import ast
-                        return ast.literal_eval(value)
-                    except:
-                        return None
-        return value
-    
-    def extract_outcome_prices(self, outcome_prices_str):
-        """Desanida precios"""
-        prices = self.parse_json_field(outcome_prices_str)
-        if not prices or not isinstance(prices, list):
-            return None, None
-        
-        try:
-            price_yes = float(prices[0]) if len(prices) > 0 else None
-            price_no = float(prices[1]) if len(prices) > 1 else None
-            return price_yes, price_no
-        except:
-            return None, None
+    def fact_records(self, batch, market_map, snapshot_date_key):
+        """
+        Registros de hechos (FACT_COLUMNS) de un lote de mercados; claves y
+        métricas calculadas por columnas, solo mercados existentes
+        """
+        fact_frame = transform(batch, FACT_MAPPING)
+        fact_frame.insert(0, 'market_key', batch['id'].astype(str).map(market_map).astype('Int64'))
+        fact_frame['snapshot_date_key'] = snapshot_date_key
+        # event/series y fechas del mercado no vienen en el CSV (nulas)
+        return to_records(python_values(fact_frame[fact_frame['market_key'].notna()].reindex(columns=FACT_COLUMNS)))
     
     def load_all(self):
         """Carga completa"""
@@ -107,6 +188,8 @@ class ETLCompleto:
                 return False
             
             cursor = self.conn.cursor()
+            bulk = BulkLoader(self.conn)
+            scd2 = SCD2Loader(self.conn, bulk)  # dimensiones como SCD Tipo 2
             
             # Leer CSVs
             print("[1/9] Leyendo archivos CSV...")
@@ -129,13 +212,12 @@ class ETLCompleto:
             df_markets = pd.read_csv(csv_files['markets'], low_memory=False)
             print(f"  - Markets: {len(df_markets):,} registros")
             
-            # LIMPIAR tablas FAC y BRIDGE solamente para recarga limpia
-            # NO limpiar dimensiones para permitir ejecuciones incrementales
+            # LIMPIAR solo BRIDGE; los hechos se agregan como snapshot del dia
+            # (los snapshots anteriores se conservan)
             print("\n[2/9] Preparando carga...")
-            cursor.execute("TRUNCATE fact_market_metrics CASCADE")
             cursor.execute("TRUNCATE bridge_market_tag CASCADE")
             self.conn.commit()
-            print("  OK: Tablas fact/bridge limpiadas (dimensiones se actualizaran)")
+            print("  OK: Tabla bridge limpiada (dimensiones y hechos se actualizaran)")
             
             # DIM_SERIES
             print("\n[3/9] Cargando dim_series...")
@@ -143,32 +225,12 @@ class ETLCompleto:
             df_series_unique = df_series.drop_duplicates(subset=['id'], keep='first')
             print(f"  - Series unicas: {len(df_series_unique):,} (de {len(df_series):,} totales)")
             
-            series_records = []
-            for _, row in df_series_unique.iterrows():
-                record = (
-                    self.clean_value(row.get('id')),
-                    self.clean_value(row.get('slug')),
-                    self.clean_value(row.get('title')),
-                    None, None, None, None, None,
-                    self.clean_value(row.get('active')),
-                    False, False, False, False, None, None,
-                    None, None, None, None, None
-                )
-                series_records.append(record)
+            series_records = to_records(transform(df_series_unique, SERIES_MAPPING))
             
             if series_records:
-                query = """
-                    INSERT INTO dim_series (
-                        series_id, slug, title, description, image, icon,
-                        series_type, recurrence, active, closed, archived, restricted,
-                        featured, layout, start_date, published_at, created_at_source,
-                        updated_at_source, created_by, updated_by
-                    ) VALUES %s
-                    ON CONFLICT (series_id) DO NOTHING
-                """
-                execute_values(cursor, query, series_records)
+                result = scd2.load('dim_series', series_records)
                 self.conn.commit()
-                print(f"  OK: {cursor.rowcount:,} registros")
+                print(f"  OK: {result['new']:,} nuevos, {result['changed']:,} versionados, {result['unchanged']:,} sin cambios")
             
             # DIM_TAG
             print("\n[4/9] Cargando dim_tag...")
@@ -176,88 +238,34 @@ class ETLCompleto:
             df_tags_unique = df_tags.drop_duplicates(subset=['id'], keep='first')
             print(f"  - Tags unicos: {len(df_tags_unique):,} (de {len(df_tags):,} totales)")
             
-            tag_records = []
-            for _, row in df_tags_unique.iterrows():
-                tag_id = self.clean_value(row.get('id'))
-                slug = self.clean_value(row.get('slug'))
-                path = f"/{slug}" if slug else None
-                
-                record = (
-                    tag_id, self.clean_value(row.get('label')), slug,
-                    None, 1, path, False, False, False, False,
-                    None, None, None, None, None
-                )
-                tag_records.append(record)
+            tag_records = to_records(transform(df_tags_unique, TAG_MAPPING))
             
             if tag_records:
-                query = """
-                    INSERT INTO dim_tag (
-                        tag_id, label, slug, parent_tag_id, level, path,
-                        force_show, force_hide, is_carousel, requires_translation,
-                        published_at, created_at_source, updated_at_source,
-                        created_by, updated_by
-                    ) VALUES %s
-                    ON CONFLICT (tag_id) DO NOTHING
-                """
-                execute_values(cursor, query, tag_records)
+                result = scd2.load('dim_tag', tag_records)
                 self.conn.commit()
-                print(f"  OK: {cursor.rowcount:,} registros")
+                print(f"  OK: {result['new']:,} nuevos, {result['changed']:,} versionados, {result['unchanged']:,} sin cambios")
             
             # DIM_EVENT - TODOS LOS DATOS
             print(f"\n[5/9] Cargando dim_event (COMPLETO - {len(df_events):,} registros)...")
             print("  Procesando en batches...")
             
+            event_frame = transform(df_events, EVENT_MAPPING)
+            event_frame = event_frame[event_frame['event_id'].notna()]
+            
             total_events = 0
-            for i in range(0, len(df_events), self.batch_size):
-                batch = df_events.iloc[i:i+self.batch_size]
-                event_records = []
-                
-                for _, row in batch.iterrows():
-                    record = (
-                        int(self.clean_value(row.get('id')) or 0),
-                        self.clean_value(row.get('ticker')),
-                        self.clean_value(row.get('slug')),
-                        self.clean_value(row.get('title')),
-                        None,  # description
-                        self.clean_value(row.get('category')),
-                        None,  # subcategory
-                        None,  # image
-                        None,  # icon
-                        None,  # resolution_source
-                        self.clean_value(row.get('active')),
-                        self.clean_value(row.get('closed')),
-                        False, False, False, False, False, 0,
-                        None, None, None, None, None, None, None,
-                        False, False, False, False, False, False, False, False, False,
-                        None, None, None, None, None, None, None
-                    )
-                    event_records.append(record)
+            for i in range(0, len(event_frame), self.batch_size):
+                event_records = to_records(event_frame.iloc[i:i+self.batch_size])
                 
                 if event_records:
-                    query = """
-                        INSERT INTO dim_event (
-                            event_id, ticker, slug, title, description, category, subcategory,
-                            image, icon, resolution_source, active, closed, archived, new,
-                            featured, restricted, cyom, competitive,
-                            start_date, creation_date, end_date, closed_time, published_at,
-                            created_at_source, updated_at_source,
-                            show_all_outcomes, show_market_images, enable_neg_risk,
-                            enable_order_book, neg_risk_augmented, pending_deployment,
-                            deploying, requires_translation, comments_enabled,
-                            series_slug, parent_event_id, sport, event_date, event_week,
-                            game_id, game_status
-                        ) VALUES %s
-                        ON CONFLICT (event_id) DO NOTHING
-                    """
-                    execute_values(cursor, query, event_records)
+                    scd2.load('dim_event', event_records)
                     self.conn.commit()
-                    total_events += len(batch)
+                    total_events += len(event_records)
                     
                 if (i + self.batch_size) % 50000 == 0 or (i + self.batch_size) >= len(df_events):
                     print(f"    Procesados: {min(i + self.batch_size, len(df_events)):,} de {len(df_events):,} ({100*(i+self.batch_size)/len(df_events):.1f}%)")
             
             # Verificar cuántos se insertaron realmente
-            cursor.execute("SELECT COUNT(*) FROM dim_event WHERE event_key > 0")
+            cursor.execute("SELECT COUNT(*) FROM dim_event WHERE is_current")
             count_db = cursor.fetchone()[0]
             print(f"  OK: {count_db:,} registros en base de datos")
             
@@ -265,241 +273,98 @@ class ETLCompleto:
             print(f"\n[6/9] Cargando dim_market (COMPLETO - {len(df_markets):,} registros)...")
             print("  Procesando en batches...")
             
+            market_frame = transform(df_markets, MARKET_MAPPING)
+            
             total_markets = 0
-            for i in range(0, len(df_markets), self.batch_size):
-                batch = df_markets.iloc[i:i+self.batch_size]
-                market_records = []
-                
-                for _, row in batch.iterrows():
-                    outcomes = self.parse_json_field(row.get('outcomes'))
-                    outcomes_json = json.dumps(outcomes) if outcomes else None
-                    
-                    record = (
-                        str(self.clean_value(row.get('id'))),
-                        self.clean_value(row.get('conditionId')),
-                        self.clean_value(row.get('slug')),
-                        self.clean_value(row.get('question')),
-                        None,  # description
-                        None,  # market_type
-                        self.clean_value(row.get('category')),
-                        None,  # subcategory
-                        outcomes_json,
-                        self.clean_value(row.get('active')),
-                        self.clean_value(row.get('closed')),
-                        False, False, False, False, False, False, False, False,
-                        None, None, None, None, None, None, None, None,
-                        False, None, None, False, None, None, None, None
-                    )
-                    market_records.append(record)
+            for i in range(0, len(market_frame), self.batch_size):
+                market_records = to_records(market_frame.iloc[i:i+self.batch_size])
                 
                 if market_records:
-                    query = """
-                        INSERT INTO dim_market (
-                            market_id, condition_id, slug, question, description,
-                            market_type, category, subcategory, outcomes,
-                            active, closed, archived, restricted, new, featured,
-                            enable_order_book, clear_book_on_start, fppm_live, rfq_enabled,
-                            start_date, end_date, closed_time, created_at_source, updated_at_source,
-                            image, icon, resolution_source,
-                            neg_risk, neg_risk_market_id, format_type, wide_format,
-                            lower_bound, upper_bound, question_id, market_maker_address
-                        ) VALUES %s
-                        ON CONFLICT (market_id) DO NOTHING
-                    """
-                    execute_values(cursor, query, market_records, page_size=1000)
+                    scd2.load('dim_market', market_records)
                     self.conn.commit()
-                    total_markets += len(batch)
+                    total_markets += len(market_records)
                     
                 if (i + self.batch_size) % 25000 == 0 or (i + self.batch_size) >= len(df_markets):
-                    cursor.execute("SELECT COUNT(*) FROM dim_market WHERE market_key > 0")
+                    cursor.execute("SELECT COUNT(*) FROM dim_market WHERE is_current")
                     count_db = cursor.fetchone()[0]
                     pct = 100 * (i + self.batch_size) / len(df_markets)
                     print(f"    Procesados: {min(i + self.batch_size, len(df_markets)):,} de {len(df_markets):,} ({pct:.1f}%) | DB: {count_db:,}")
             
             # Count final
-            cursor.execute("SELECT COUNT(*) FROM dim_market WHERE market_key > 0")
+            cursor.execute("SELECT COUNT(*) FROM dim_market WHERE is_current")
             count_db = cursor.fetchone()[0]
             print(f"  OK: {count_db:,} registros en base de datos")
             
             # BRIDGE_MARKET_TAG
             print(f"\n[7/9] Cargando bridge_market_tag...")
+            print(f"  - Desanidando markets y tags de {len(df_events):,} events...")
             
-            # Obtener mapeos
-            cursor.execute("SELECT market_id, market_key FROM dim_market")
-            market_map = {str(row[0]): row[1] for row in cursor.fetchall()}
-            print(f"  - Mapeando {len(market_map):,} markets")
+            # Listas de los eventos desanidadas por columnas; el join por
+            # event_id y las claves se resuelven en el servidor
+            event_markets = event_links(df_events, 'markets', 'market_id')
+            event_tags = event_links(df_events, 'tags', 'tag_id')
+            print(f"  - Events con markets: {event_markets['event_id'].nunique():,} ({len(event_markets):,} relaciones)")
+            print(f"  - Events con tags: {event_tags['event_id'].nunique():,} ({len(event_tags):,} relaciones)")
             
-            cursor.execute("SELECT tag_id, tag_key FROM dim_tag")
-            tag_map = {str(row[0]): row[1] for row in cursor.fetchall()}
-            print(f"  - Mapeando {len(tag_map):,} tags")
-            
-            # Extraer relaciones de los events (tienen tags)
-            bridge_records = set()  # Usar set para evitar duplicados
-            events_with_tags = 0
-            events_with_markets = 0
-            events_with_both = 0
-            
-            print(f"  - Procesando {len(df_events):,} events...")
+            result = BridgeLoader(self.conn, bulk).load(event_markets, event_tags)
+            self.conn.commit()
             
-            for idx, row in df_events.iterrows():
-                # Parsear tags del evento
-                tags_str = self.clean_value(row.get('tags'))
-                tags_list = None
-                
-                if tags_str:
-                    tags_list = self.parse_json_field(tags_str)
-                    if isinstance(tags_list, list) and len(tags_list) > 0:
-                        events_with_tags += 1
-                
-                # Parsear markets del evento
-                markets_str = self.clean_value(row.get('markets'))
-                markets_list = None
-                
-                if markets_str:
-                    markets_list = self.parse_json_field(markets_str)
-                    if isinstance(markets_list, list) and len(markets_list) > 0:
-                        events_with_markets += 1
-                
-                # Solo si tiene ambos
-                if isinstance(tags_list, list) and isinstance(markets_list, list):
-                    if len(tags_list) > 0 and len(markets_list) > 0:
-                        events_with_both += 1
-                        
-                        for market_dict in markets_list:
-                            if isinstance(market_dict, dict):
-                                market_id = str(market_dict.get('id', ''))
-                                market_key = market_map.get(market_id)
-                                
-                                if market_key:
-                                    for tag_dict in tags_list:
-                                        if isinstance(tag_dict, dict):
-                                            tag_id = str(tag_dict.get('id', ''))
-                                            tag_key = tag_map.get(tag_id)
-                                            
-                                            if tag_key:
-                                                bridge_records.add((market_key, tag_key))
-                
-                # Progreso cada 50k
-                if (idx + 1) % 50000 == 0:
-                    print(f"    Procesados: {idx + 1:,} events | {len(bridge_records):,} relaciones encontradas")
-            
-            print(f"  - Events con tags: {events_with_tags:,}")
-            print(f"  - Events con markets: {events_with_markets:,}")
-            print(f"  - Events con ambos: {events_with_both:,}")
-            print(f"  - Total relaciones unicas: {len(bridge_records):,}")
-            
-            if bridge_records:
-                query = """
-                    INSERT INTO bridge_market_tag (market_key, tag_key)
-                    VALUES %s
-                    ON CONFLICT (market_key, tag_key) DO NOTHING
-                """
-                execute_values(cursor, query, list(bridge_records))
-                self.conn.commit()
-                print(f"  OK: {cursor.rowcount:,} relaciones insertadas")
+            if result['inserted']:
+                print(f"  OK: {result['inserted']:,} relaciones insertadas")
             else:
                 print("  WARN: No se encontraron relaciones market-tag")
             
+            # Jerarquía de tags deducida de las mismas relaciones evento-tag
+            hierarchy = TagHierarchyLoader(self.conn, bulk).load(event_tags)
+            self.conn.commit()
+            print(f"  OK: {hierarchy['with_parent']:,} tags con padre, {hierarchy['closure']:,} pares en tag_closure")
+            
+            # Mapeo de mercados para los hechos
+            cursor.execute("SELECT market_id, market_key FROM dim_market WHERE is_current")
+            market_map = {str(row[0]): row[1] for row in cursor.fetchall()}
+            
             # FACT_MARKET_METRICS
             print(f"\n[8/9] Cargando fact_market_metrics...")
             print("  Procesando en batches...")
             
-            # Obtener snapshot_date_key actual
-            cursor.execute("SELECT time_key FROM dim_time WHERE date_value = CURRENT_DATE")
+            # Obtener snapshot_date_key actual (dim_time se extiende si hace falta)
+            ensure_dim_time(self.conn, datetime.now().date(), datetime.now().date())
+            cursor.execute("SELECT time_key FROM dim_time WHERE date_value = %s", (datetime.now().date(),))
             result = cursor.fetchone()
             snapshot_date_key = result[0] if result else None
             
             if not snapshot_date_key:
                 print("  ERROR: No se encontro time_key para fecha actual")
             else:
-                total_facts = 0
-                for i in range(0, len(df_markets), self.batch_size):
-                    batch = df_markets.iloc[i:i+self.batch_size]
-                    fact_records = []
-                    
-                    for _, row in batch.iterrows():
-                        market_id = str(self.clean_value(row.get('id')))
-                        market_key = market_map.get(market_id)
-                        
-                        if not market_key:
-                            continue
-                        
-                        price_yes, price_no = self.extract_outcome_prices(row.get('outcomePrices'))
-                        
-                        # Limpiar precios que parecen valores sentinela (>100 no tiene sentido para precios 0-1)
-                        if price_yes and price_yes > 10:
-                            price_yes = None
-                        if price_no and price_no > 10:
-                            price_no = None
-                        
-                        record = (
-                            market_key, None, None, snapshot_date_key, None, None, None,
-                            self.clean_numeric(row.get('liquidity')),
-                            self.clean_numeric(row.get('liquidityAmm')),
-                            self.clean_numeric(row.get('liquidityClob')),
-                            self.clean_numeric(row.get('volume')),
-                            self.clean_numeric(row.get('volume24hr')),
-                            self.clean_numeric(row.get('volume1wk')),
-                            self.clean_numeric(row.get('volume1mo')),
-                            self.clean_numeric(row.get('volume1yr')),
-                            self.clean_numeric(row.get('volumeAmm')),
-                            self.clean_numeric(row.get('volumeClob')),
-                            self.clean_numeric(row.get('volume24hrAmm')),
-                            self.clean_numeric(row.get('volume24hrClob')),
-                            self.clean_numeric(row.get('volume1wkAmm')),
-                            self.clean_numeric(row.get('volume1wkClob')),
-                            self.clean_numeric(row.get('volume1moAmm')),
-                            self.clean_numeric(row.get('volume1moClob')),
-                            self.clean_numeric(row.get('volume1yrAmm')),
-                            self.clean_numeric(row.get('volume1yrClob')),
-                            0,  # open_interest
-                            price_yes, price_no,
-                            self.clean_numeric(row.get('lastTradePrice'), 1),  # Prices should be 0-1
-                            self.clean_numeric(row.get('bestBid'), 1),
-                            self.clean_numeric(row.get('bestAsk'), 1),
-                            self.clean_numeric(row.get('spread'), 1),
-                            self.clean_numeric(row.get('oneHourPriceChange'), 10),
-                            self.clean_numeric(row.get('oneDayPriceChange'), 10),
-                            self.clean_numeric(row.get('oneWeekPriceChange'), 10),
-                            self.clean_numeric(row.get('oneMonthPriceChange'), 10),
-                            self.clean_numeric(row.get('oneYearPriceChange'), 10),
-                            0, 0,  # comment_count, tweet_count
-                            self.clean_numeric(row.get('fee'), 1000),  # Fee should be reasonable (<1000%)
-                            self.clean_numeric(row.get('takerBaseFee'), 1000),
-                            self.clean_numeric(row.get('makerBaseFee'), 1000),
-                            self.clean_numeric(row.get('competitive'), 1),
-                            None  # extraction_timestamp
-                        )
-                        fact_records.append(record)
-                    
-                    if fact_records:
-                        query = """
-                            INSERT INTO fact_market_metrics (
-                                market_key, event_key, series_key, snapshot_date_key,
-                                start_date_key, end_date_key, closed_date_key,
-                                liquidity, liquidity_amm, liquidity_clob,
-                                volume, volume_24hr, volume_1wk, volume_1mo, volume_1yr,
-                                volume_amm, volume_clob, volume_24hr_amm, volume_24hr_clob,
-                                volume_1wk_amm, volume_1wk_clob, volume_1mo_amm, volume_1mo_clob,
-                                volume_1yr_amm, volume_1yr_clob, open_interest,
-                                outcome_price_yes, outcome_price_no,
-                                last_trade_price, best_bid, best_ask, spread,
-                                price_change_1h, price_change_1d, price_change_1wk,
-                                price_change_1mo, price_change_1yr,
-                                comment_count, tweet_count,
-                                fee, taker_base_fee, maker_base_fee, competitive,
-                                extraction_timestamp
-                            ) VALUES %s
-                            ON CONFLICT (market_key, snapshot_date_key) DO NOTHING
-                        """
-                        execute_values(cursor, query, fact_records)
-                        self.conn.commit()
-                        total_facts += cursor.rowcount
-                    
-                    if (i + self.batch_size) % 50000 == 0:
-                        print(f"    Procesados: {i + self.batch_size:,}...")
+                # Snapshot del dia: se agrega sin borrar los anteriores y una
+                # re-ejecucion el mismo dia lo reescribe (idempotente)
+                snapshots = SnapshotFactLoader(self.conn, bulk, skip_unchanged=self.skip_unchanged)
+                
+                def write_batch(fact_records):
+                    if not fact_records:
+                        return {'written': 0, 'skipped': 0}
+                    result = snapshots.load(FACT_COLUMNS, fact_records)
+                    self.conn.commit()
+                    return result
+                
+                # Lectura, transformacion y escritura solapadas: mientras un
+                # lote se escribe en NeonDB el siguiente ya se transforma
+                pipeline = Pipeline(
+                    source=(df_markets.iloc[i:i+self.batch_size] for i in range(0, len(df_markets), self.batch_size)),
+                    stages=[
+                        ('transform', lambda batch: self.fact_records(batch, market_map, snapshot_date_key)),
+                        ('write', write_batch)
+                    ]
+                )
+                results = pipeline.run()
+                total_facts = sum(result['written'] for result in results)
+                total_skipped = sum(result['skipped'] for result in results)
                 
-                print(f"  OK: {total_facts:,} registros")
+                print(f"  OK: {total_facts:,} registros en snapshot {snapshot_date_key}")
+                for line in pipeline.summary():
+                    print(f"  - {line}")
+                if self.skip_unchanged:
+                    print(f"  - {total_skipped:,} mercados sin cambios omitidos")
             
             cursor.close()
             
@@ -535,13 +400,15 @@ class ETLCompleto:
             self.disconnect()
 
 def main():
-    environment = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ENVIRONMENT
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    skip_unchanged = '--skip-unchanged' in sys.argv
+    environment = args[0] if args else DEFAULT_ENVIRONMENT
     
     if environment not in ['development', 'production']:
         print("Ambiente invalido. Use 'development' o 'production'")
         sys.exit(1)
     
-    etl = ETLCompleto(environment, batch_size=5000)
+    etl = ETLCompleto(environment, batch_size=5000, skip_unchanged=skip_unchanged)
     success = etl.load_all()
     
     sys.exit(0 if success else 1)
@@ -0,0 +1,173 @@
+"""
+Configuración de la carga del Data Warehouse
+Columnas de cada tabla destino, clave natural y columnas versionadas (un
+cambio en ellas crea una versión SCD Tipo 2 nueva). La comparten la carga
+directa y la carga por staging.
+"""
+
+# Dimensiones: tabla → clave natural, columnas cargadas y columnas versionadas
+DIMENSION_TABLES = {
+    'dim_series': {
+        'source': 'series',
+        'natural_key': 'series_id',
+        'surrogate_key': 'series_key',
+        'columns': [
+            'series_id', 'slug', 'title', 'description', 'image', 'icon',
+            'series_type', 'recurrence', 'active', 'closed', 'archived',
+            'restricted', 'featured', 'layout', 'start_date', 'published_at',
+            'created_at_source', 'updated_at_source', 'created_by', 'updated_by'
+        ],
+        'tracked_columns': [
+            'slug', 'title', 'description', 'image', 'icon', 'series_type',
+            'recurrence', 'active', 'closed', 'archived', 'restricted', 'featured',
+            'layout', 'start_date', 'published_at', 'updated_at_source',
+            'updated_by'
+        ]
+    },
+    'dim_tag': {
+        'source': 'tags',
+        'natural_key': 'tag_id',
+        'surrogate_key': 'tag_key',
+        'columns': [
+            'tag_id', 'label', 'slug', 'parent_tag_id', 'level', 'path',
+            'force_show', 'force_hide', 'is_carousel', 'requires_translation',
+            'published_at', 'created_at_source', 'updated_at_source', 'created_by',
+            'updated_by'
+        ],
+        'tracked_columns': [
+            'label', 'slug', 'force_show', 'force_hide', 'is_carousel',
+            'requires_translation', 'updated_at_source', 'updated_by'
+        ]
+    },
+    'dim_event': {
+        'source': 'events',
+        'natural_key': 'event_id',
+        'surrogate_key': 'event_key',
+        'columns': [
+            'event_id', 'ticker', 'slug', 'title', 'description', 'category',
+            'subcategory', 'image', 'icon', 'resolution_source', 'active', 'closed',
+            'archived', 'new', 'featured', 'restricted', 'cyom', 'competitive',
+            'start_date', 'creation_date', 'end_date', 'closed_time',
+            'published_at', 'created_at_source', 'updated_at_source',
+            'show_all_outcomes', 'show_market_images', 'enable_neg_risk',
+            'enable_order_book', 'neg_risk_augmented', 'pending_deployment',
+            'deploying', 'requires_translation', 'comments_enabled', 'series_slug',
+            'parent_event_id', 'sport', 'event_date', 'event_week', 'game_id',
+            'game_status'
+        ],
+        'tracked_columns': [
+            'ticker', 'slug', 'title', 'description', 'category', 'subcategory',
+            'image', 'icon', 'resolution_source', 'active', 'closed', 'archived',
+            'updated_at_source', 'show_all_outcomes', 'show_market_images'
+        ]
+    },
+    'dim_market': {
+        'source': 'markets',
+        'natural_key': 'market_id',
+        'surrogate_key': 'market_key',
+        'columns': [
+            'market_id', 'condition_id', 'slug', 'question', 'description',
+            'market_type', 'category', 'subcategory', 'outcomes', 'active',
+            'closed', 'archived', 'restricted', 'new', 'featured',
+            'enable_order_book', 'clear_book_on_start', 'fppm_live', 'rfq_enabled',
+            'start_date', 'end_date', 'closed_time', 'created_at_source',
+            'updated_at_source', 'image', 'icon', 'resolution_source', 'neg_risk',
+            'neg_risk_market_id', 'format_type', 'wide_format', 'lower_bound',
+            'upper_bound', 'question_id', 'market_maker_address'
+        ],
+        'tracked_columns': [
+            'slug', 'question', 'description', 'active', 'closed', 'archived',
+            'updated_at_source'
+        ]
+    }
+}
+
+# Métricas de la tabla de hechos (mismo nombre en staging y en destino)
+FACT_METRIC_COLUMNS = [
+    'liquidity', 'liquidity_amm', 'liquidity_clob', 'volume', 'volume_24hr',
+    'volume_1wk', 'volume_1mo', 'volume_1yr', 'volume_amm', 'volume_clob',
+    'volume_24hr_amm', 'volume_24hr_clob', 'volume_1wk_amm',
+    'volume_1wk_clob', 'volume_1mo_amm', 'volume_1mo_clob',
+    'volume_1yr_amm', 'volume_1yr_clob', 'open_interest',
+    'outcome_price_yes', 'outcome_price_no', 'last_trade_price', 'best_bid',
+    'best_ask', 'spread', 'price_change_1h', 'price_change_1d',
+    'price_change_1wk', 'price_change_1mo', 'price_change_1yr',
+    'comment_count', 'tweet_count', 'fee', 'taker_base_fee',
+    'maker_base_fee', 'competitive', 'extraction_timestamp'
+]
+
+FACT_UPDATE_COLUMNS = [
+    'liquidity', 'volume', 'volume_24hr', 'outcome_price_yes',
+    'outcome_price_no', 'last_trade_price', 'best_bid', 'best_ask'
+]
+
+# Dimensión de tiempo: rango inicial y límites de extensión automática
+# (fechas sentinela fuera de los límites quedan sin time_key)
+DIM_TIME_CONFIG = {
+    'start_date': '2021-01-01',
+    'years_ahead': 1,  # sin end_date se carga hasta el fin del año actual + years_ahead
+    'min_date': '2000-01-01',
+    'max_date': '2100-12-31'
+}
+
+# Particiones mensuales de fact_market_metrics (por snapshot_date_key)
+FACT_PARTITION_CONFIG = {
+    'months_ahead': 3,         # particiones creadas por adelantado
+    'retention_months': None,  # meses adjuntos al archivar; None = sin retención
+    'archive_schema': 'archive'
+}
+
+# Modo de carga masiva de hechos: si las filas a escribir caen en una sola
+# partición, son al menos min_rows y al menos min_partition_share de las que
+# ya tiene, a esa partición se le quitan índices no únicos y FKs y se
+# reconstruyen al final (min_rows None = nunca)
+FACT_BULK_MODE_CONFIG = {
+    'min_rows': 100000,
+    'min_partition_share': 0.5,
+    'maintenance_work_mem': '512MB',
+    'parallel_workers': 4      # max_parallel_maintenance_workers por índice
+}
+
+# Dependencias de carga entre tablas del warehouse (las dimensiones no se
+# referencian entre sí y pueden cargarse en paralelo)
+LOAD_DEPENDENCIES = {
+    'dim_series': [],
+    'dim_tag': [],
+    'dim_event': [],
+    'dim_market': [],
+    'bridge_market_tag': ['dim_market', 'dim_tag'],
+    'tag_hierarchy': ['dim_tag'],
+    'fact_market_metrics': ['dim_market'],
+}
+
+# Jerarquía de tags deducida de los eventos: un tag es hijo de otro con más
+# eventos que aparece en al menos min_coverage de los suyos
+TAG_HIERARCHY_CONFIG = {
+    'min_events': 5,       # eventos mínimos de un tag para buscarle padre
+    'min_coverage': 0.95,
+    'max_depth': 10
+}
+
+# Carga paralela: conexiones simultáneas y rangos de market_key de hechos
+PARALLEL_LOAD_CONFIG = {
+    'workers': 4,
+    'fact_chunks': 4
+}
+
+# ETL en pipeline: lotes máximos en cada cola entre etapas (backpressure)
+PIPELINE_CONFIG = {
+    'queue_size': 4
+}
+
+# Tablas de staging (UNLOGGED: no escriben WAL, se vacían en cada carga)
+STAGING_CONFIG = {
+    'prefix': 'stg_',
+    'unlogged': True
+}
+
+# Tablas de relación del lake (hijas de events) que se copian a staging
+STAGING_LINK_TABLES = {
+    'event_markets': ['event_id', 'market_id'],
+    'event_tags': ['event_id', 'tag_id'],
+    'event_series': ['event_id', 'series_id']
+}
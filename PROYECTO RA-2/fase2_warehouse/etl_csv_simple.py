@@ -5,7 +5,6 @@ Versión alternativa que lee desde los CSVs exportados
 import pandas as pd
 import psycopg2
 from psycopg2.extras import execute_values
-import json
 from datetime import datetime
 import sys
 import os
@@ -13,8 +12,103 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+from fase2_warehouse.etl_config import DIMENSION_TABLES, FACT_METRIC_COLUMNS
+from fase2_warehouse.time_dimension import ensure_dim_time
+from fase2_warehouse.fact_partitions import FactPartitionManager
+from fase2_warehouse.transform import (
+    complete_mapping, transform, to_records, python_values, date_key,
+    source, as_text, as_int, numeric, boolean, prefixed, json_text, list_item
+)
 import logging
 
+# Columnas del CSV → columnas del warehouse (resto: False o nulo)
+SERIES_MAPPING = complete_mapping(
+    DIMENSION_TABLES['dim_series']['columns'],
+    {
+        'series_id': as_text('id'),
+        'slug': source('slug'),
+        'title': source('title'),
+        'image': source('image'),
+        'icon': source('icon'),
+        'active': boolean('active'),
+    },
+    defaults={col: False for col in ['closed', 'archived', 'restricted', 'featured']}
+)
+
+TAG_MAPPING = complete_mapping(
+    DIMENSION_TABLES['dim_tag']['columns'],
+    {
+        'tag_id': as_text('id'),
+        'label': source('label'),
+        'slug': source('slug'),
+        'path': prefixed('/', 'slug'),
+    },
+    defaults={
+        'level': 1,
+        **{col: False for col in ['force_show', 'force_hide', 'is_carousel', 'requires_translation']}
+    }
+)
+
+EVENT_MAPPING = complete_mapping(
+    DIMENSION_TABLES['dim_event']['columns'],
+    {
+        'event_id': as_int('id'),
+        'ticker': source('ticker'),
+        'slug': source('slug'),
+        'title': source('title'),
+        'description': source('description'),
+        'category': source('category'),
+        'image': source('image'),
+        'icon': source('icon'),
+        'active': boolean('active'),
+        'closed': boolean('closed'),
+    },
+    defaults={
+        'competitive': 0,
+        **{col: False for col in [
+            'archived', 'new', 'featured', 'restricted', 'cyom',
+            'show_all_outcomes', 'show_market_images', 'enable_neg_risk',
+            'enable_order_book', 'neg_risk_augmented', 'pending_deployment',
+            'deploying', 'requires_translation', 'comments_enabled'
+        ]}
+    }
+)
+
+MARKET_MAPPING = complete_mapping(
+    DIMENSION_TABLES['dim_market']['columns'],
+    {
+        'market_id': as_text('id'),
+        'condition_id': source('conditionId'),
+        'slug': source('slug'),
+        'question': source('question'),
+        'category': source('category'),
+        'outcomes': json_text('outcomes'),
+        'active': boolean('active'),
+        'closed': boolean('closed'),
+        'image': source('image'),
+    },
+    defaults={col: False for col in [
+        'archived', 'restricted', 'new', 'featured', 'enable_order_book',
+        'clear_book_on_start', 'fppm_live', 'rfq_enabled', 'neg_risk', 'wide_format'
+    ]}
+)
+
+FACT_COLUMNS = [
+    'market_key', 'event_key', 'series_key', 'snapshot_date_key',
+    'start_date_key', 'end_date_key', 'closed_date_key'
+] + FACT_METRIC_COLUMNS
+
+FACT_MAPPING = complete_mapping(
+    FACT_METRIC_COLUMNS,
+    {
+        'liquidity': numeric('liquidity'),
+        'volume': numeric('volume'),
+        'outcome_price_yes': list_item('outcomePrices', 0),
+        'outcome_price_no': list_item('outcomePrices', 1),
+    },
+    defaults={'open_interest': 0, 'comment_count': 0, 'tweet_count': 0, 'competitive': 0}
+)
+
 class CSVtoWarehouseETL:
     """
     ETL simplificado que lee desde CSV
@@ -43,92 +137,17 @@ class CSVtoWarehouseETL:
             self.conn.close()
             print("Conexion cerrada")
     
-    def clean_value(self, value):
-        """Limpia valores"""
-        if pd.isna(value):
-            return None
-        if isinstance(value, str) and value.strip() == '':
-            return None
-        return value
-    
-    def parse_json_field(self, value):
-        """Parsea JSON"""
-        if pd.isna(value) or value is None:
-            return None
-        if isinstance(value, str):
-            try:
-                return json.loads(value.replace("'", '"'))
-            except:
-                return None
-        return value
-    
-    def extract_outcome_prices(self, outcome_prices_str):
-        """Desanida precios"""
-        prices = self.parse_json_field(outcome_prices_str)
-        if not prices or not isinstance(prices, list):
-            return None, None
-        
-        try:
-            price_yes = float(prices[0]) if len(prices) > 0 else None
-            price_no = float(prices[1]) if len(prices) > 1 else None
-            return price_yes, price_no
-        except:
-            return None, None
-    
     def load_dim_time(self):
-        """Carga dimension de tiempo"""
+        """Carga dimension de tiempo (generada en el servidor)"""
         print("Cargando dimension de tiempo...")
         
-        cursor = self.conn.cursor()
-        dates = pd.date_range(start='2021-01-01', end='2026-12-31', freq='D')
-        
-        records = []
-        for dt in dates:
-            record = (
-                dt.date(), dt.year, (dt.month - 1) // 3 + 1, dt.month,
-                dt.strftime('%B'), dt.isocalendar()[1], dt.day, dt.dayofweek,
-                dt.strftime('%A'), dt.dayofweek >= 5,
-                dt.day == 1, dt.day == pd.Period(dt, 'M').days_in_month,
-                dt.day == 1 and dt.month in [1, 4, 7, 10],
-                dt.day == pd.Period(dt, 'M').days_in_month and dt.month in [3, 6, 9, 12],
-                dt.day == 1 and dt.month == 1, dt.day == 31 and dt.month == 12,
-                dt.year, (dt.month - 1) // 3 + 1
-            )
-            records.append(record)
-        
-        query = """
-            INSERT INTO dim_time (
-                date_value, year, quarter, month, month_name, week_of_year,
-                day_of_month, day_of_week, day_name, is_weekend,
-                is_month_start, is_month_end, is_quarter_start, is_quarter_end,
-                is_year_start, is_year_end, fiscal_year,fiscal_quarter
-            ) VALUES %s ON CONFLICT (date_value) DO NOTHING
-        """
-        
-        execute_values(cursor, query, records)
+        count = ensure_dim_time(self.conn)
         self.conn.commit()
-        print(f"Dimension tiempo cargada: {cursor.rowcount} registros")
-        cursor.close()
+        print(f"Dimension tiempo cargada: {count} registros")
     
     def get_time_key(self, date_value):
-        """Obtiene time_key"""
-        if pd.isna(date_value) or date_value is None:
-            return None
-        
-        if isinstance(date_value, str):
-            try:
-                date_value = pd.to_datetime(date_value).date()
-            except:
-                return None
-        elif isinstance(date_value, pd.Timestamp) or isinstance(date_value, datetime):
-            date_value = date_value.date()
-        
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT time_key FROM dim_time WHERE date_value = %s", (date_value,))
-        result = cursor.fetchone()
-        cursor.close()
-        
-        return result[0] if result else None
+        """Obtiene time_key (yyyymmdd; load_dim_time cubre hasta el fin del año siguiente)"""
+        return date_key(date_value)
     
     def load_all(self):
         """Carga completa"""
@@ -182,31 +201,7 @@ class CSVtoWarehouseETL:
             # Series
             print("Cargando dim_series...")
             cursor = self.conn.cursor()
-            series_records = []
-            for _, row in df_series.iterrows():
-                record = (
-                    self.clean_value(row.get('id')),
-                    self.clean_value(row.get('slug')),
-                    self.clean_value(row.get('title')),
-                    None,  # description
-                    self.clean_value(row.get('image')),
-                    self.clean_value(row.get('icon')),
-                    None,  # series_type
-                    None,  # recurrence
-                    self.clean_value(row.get('active')),
-                    False,  # closed
-                    False,  # archived
-                    False,  # restricted
-                    False,  # featured
-                    None,  # layout
-                    None,  # start_date
-                    None,  # published_at
-                    None,  # created_at
-                    None,  # updated_at
-                    None,  # created_by
-                    None   # updated_by
-                )
-                series_records.append(record)
+            series_records = to_records(transform(df_series, SERIES_MAPPING))
             
             query = """
                 INSERT INTO dim_series (
@@ -215,7 +210,7 @@ class CSVtoWarehouseETL:
                     featured, layout, start_date, published_at, created_at_source,
                     updated_at_source, created_by, updated_by
                 ) VALUES %s
-                ON CONFLICT (series_id) DO NOTHING
+                ON CONFLICT (series_id) WHERE is_current DO NOTHING
             """
             execute_values(cursor, query, series_records)
             self.conn.commit()
@@ -223,30 +218,7 @@ class CSVtoWarehouseETL:
             
             # Tags
             print("Cargando dim_tag...")
-            tag_records = []
-            for _, row in df_tags.iterrows():
-                tag_id = self.clean_value(row.get('id'))
-                slug = self.clean_value(row.get('slug'))
-                path = f"/{slug}" if slug else None
-                
-                record = (
-                    tag_id,
-                    self.clean_value(row.get('label')),
-                    slug,
-                    None,  # parent_tag_id
-                    1,     # level
-                    path,
-                    False,  # force_show
-                    False,  # force_hide
-                    False,  # is_carousel
-                    False,  # requires_translation
-                    None,  # published_at
-                    None,  # created_at
-                    None,  # updated_at
-                    None,  # created_by
-                    None   # updated_by
-                )
-                tag_records.append(record)
+            tag_records = to_records(transform(df_tags, TAG_MAPPING))
             
             query = """
                 INSERT INTO dim_tag (
@@ -255,7 +227,7 @@ class CSVtoWarehouseETL:
                     published_at, created_at_source, updated_at_source,
                     created_by, updated_by
                 ) VALUES %s
-                ON CONFLICT (tag_id) DO NOTHING
+                ON CONFLICT (tag_id) WHERE is_current DO NOTHING
             """
             execute_values(cursor, query, tag_records)
             self.conn.commit()
@@ -263,52 +235,8 @@ class CSVtoWarehouseETL:
             
             # Events - tomar una muestra si son muchos
             print("Cargando dim_event...")
-            event_records = []
-            for idx, row in df_events.head(1000).iterrows():  # Limitar a 1000 para prueba
-                record = (
-                    int(self.clean_value(row.get('id')) or 0),
-                    self.clean_value(row.get('ticker')),
-                    self.clean_value(row.get('slug')),
-                    self.clean_value(row.get('title')),
-                    self.clean_value(row.get('description')),
-                    self.clean_value(row.get('category')),
-                    None,  # subcategory
-                    self.clean_value(row.get('image')),
-                    self.clean_value(row.get('icon')),
-                    None,  # resolution_source
-                    self.clean_value(row.get('active')),
-                    self.clean_value(row.get('closed')),
-                    False,  # archived
-                    False,  # new
-                    False,  # featured
-                    False,  # restricted
-                    False,  # cyom
-                    0,  # competitive
-                    None,  # start_date
-                    None,  # creation_date
-                    None,  # end_date
-                    None,  # closed_time
-                    None,  # published_at
-                    None,  # created_at
-                    None,  # updated_at
-                    False,  # show_all_outcomes
-                    False,  # show_market_images
-                    False,  # enable_neg_risk
-                    False,  # enable_order_book
-                    False,  # neg_risk_augmented
-                    False,  # pending_deployment
-                    False,  # deploying
-                    False,  # requires_translation
-                    False,  # comments_enabled
-                    None,  # series_slug
-                    None,  # parent_event_id
-                    None,  # sport
-                    None,  # event_date
-                    None,  # event_week
-                    None,  # game_id
-                    None   # game_status
-                )
-                event_records.append(record)
+            event_frame = transform(df_events.head(1000), EVENT_MAPPING)  # Limitar a 1000 para prueba
+            event_records = to_records(event_frame[event_frame['event_id'].notna()])
             
             if event_records:
                 query = """
@@ -324,7 +252,7 @@ class CSVtoWarehouseETL:
                         series_slug, parent_event_id, sport, event_date, event_week,
                         game_id, game_status
                     ) VALUES %s
-                    ON CONFLICT (event_id) DO NOTHING
+                    ON CONFLICT (event_id) WHERE is_current DO NOTHING
                 """
                 execute_values(cursor, query, event_records)
                 self.conn.commit()
@@ -332,49 +260,7 @@ class CSVtoWarehouseETL:
             
             # Markets - muestra
             print("Cargando dim_market...")
-            market_records = []
-            for idx, row in df_markets.head(1000).iterrows():
-                outcomes = self.parse_json_field(row.get('outcomes'))
-                outcomes_json = json.dumps(outcomes) if outcomes else None
-                
-                record = (
-                    str(self.clean_value(row.get('id'))),
-                    self.clean_value(row.get('conditionId')),
-                    self.clean_value(row.get('slug')),
-                    self.clean_value(row.get('question')),
-                    None,  # description
-                    None,  # market_type
-                    self.clean_value(row.get('category')),
-                    None,  # subcategory
-                    outcomes_json,
-                    self.clean_value(row.get('active')),
-                    self.clean_value(row.get('closed')),
-                    False,  # archived
-                    False,  # restricted
-                    False,  # new
-                    False,  # featured
-                    False,  # enable_order_book
-                    False,  # clear_book_on_start
-                    False,  # fppm_live
-                    False,  # rfq_enabled
-                    None,  # start_date
-                    None,  # end_date
-                    None,  # closed_time
-                    None,  # created_at
-                    None,  # updated_at
-                    self.clean_value(row.get('image')),
-                    None,  # icon
-                    None,  # resolution_source
-                    False,  # neg_risk
-                    None,  # neg_risk_market_id
-                    None,  # format_type
-                    False,  # wide_format
-                    None,  # lower_bound
-                    None,  # upper_bound
-                    None,  # question_id
-                    None   # market_maker_address
-                )
-                market_records.append(record)
+            market_records = to_records(transform(df_markets.head(1000), MARKET_MAPPING))
             
             if market_records:
                 query = """
@@ -388,7 +274,7 @@ class CSVtoWarehouseETL:
                         neg_risk, neg_risk_market_id, format_type, wide_format,
                         lower_bound, upper_bound, question_id, market_maker_address
                     ) VALUES %s
-                    ON CONFLICT (market_id) DO NOTHING
+                    ON CONFLICT (market_id) WHERE is_current DO NOTHING
                 """
                 execute_values(cursor, query, market_records)
                 self.conn.commit()
@@ -398,39 +284,22 @@ class CSVtoWarehouseETL:
             print("Cargando fact_market_metrics...")
             
             # Obtener mapeos
-            cursor.execute("SELECT market_id, market_key FROM dim_market")
+            cursor.execute("SELECT market_id, market_key FROM dim_market WHERE is_current")
             market_map = {str(row[0]): row[1] for row in cursor.fetchall()}
             
+            snapshot_date_key = self.get_time_key(datetime.now().date())
+            
             fact_records = []
-            for idx, row in df_markets.head(1000).iterrows():
-                market_id = str(self.clean_value(row.get('id')))
-                market_key = market_map.get(market_id)
-                
-                if not market_key:
-                    continue
-                
-                snapshot_date = datetime.now().date()
-                snapshot_date_key = self.get_time_key(snapshot_date)
-                
-                if not snapshot_date_key:
-                    continue
-                
-                price_yes, price_no = self.extract_outcome_prices(row.get('outcomePrices'))
-                
-                record = (
-                    market_key, None, None, snapshot_date_key, None, None, None,
-                    self.clean_value(row.get('liquidity')), None, None,
-                    self.clean_value(row.get('volume')), None, None, None, None,
-                    None, None, None, None, None, None, None, None, None, None,
-                    0,  # open_interest
-                    price_yes, price_no,
-                    None, None, None, None, None, None, None, None, None,
-                    0, 0,  # comment_count, tweet_count
-                    None, None, None, 0, None
-                )
-                fact_records.append(record)
+            if snapshot_date_key:
+                df_sample = df_markets.head(1000)
+                fact_frame = transform(df_sample, FACT_MAPPING)
+                fact_frame.insert(0, 'market_key', df_sample['id'].astype(str).map(market_map).astype('Int64'))
+                fact_frame['snapshot_date_key'] = snapshot_date_key
+                # event/series y fechas del mercado no vienen en el CSV (nulas)
+                fact_records = to_records(python_values(fact_frame[fact_frame['market_key'].notna()].reindex(columns=FACT_COLUMNS)))
             
             if fact_records:
+                FactPartitionManager(self.conn).ensure_range(snapshot_date_key, snapshot_date_key)
                 query = """
                     INSERT INTO fact_market_metrics (
                         market_key, event_key, series_key, snapshot_date_key,
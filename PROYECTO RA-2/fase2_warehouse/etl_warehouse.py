@@ -1,11 +1,9 @@
 """
-ETL: Delta Lake (Capa Bronze) → NeonDB Data Warehouse (Capa Gold)
+ETL: Delta Lake (Capa Silver/Bronze) → NeonDB Data Warehouse (Capa Gold)
 Carga completa de datos con limpieza, normalización y desanidado
 """
 import pandas as pd
 import psycopg2
-from psycopg2.extras import execute_values
-import json
 from datetime import datetime, date
 import sys
 import os
@@ -14,18 +12,245 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from delta_utils import DeltaLakeManager
+from config import SILVER_DIR
 from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+from fase2_warehouse.bulk_loader import BulkLoader
+from fase2_warehouse.etl_config import FACT_METRIC_COLUMNS, FACT_UPDATE_COLUMNS
+from fase2_warehouse.staged_load import StagedLoader
+from fase2_warehouse.scd2 import SCD2Loader, CLOSED_EXPIRATION_SQL
+from fase2_warehouse.fact_snapshot import SnapshotFactLoader
+from fase2_warehouse.fact_partitions import FactPartitionManager
+from fase2_warehouse.bridge import BridgeLoader, event_links
+from fase2_warehouse.tag_hierarchy import TagHierarchyLoader
+from fase2_warehouse.parallel_load import DependencyScheduler, ParallelFactWriter
+from fase2_warehouse.time_dimension import ensure_dim_time
+from fase2_warehouse.transform import (
+    NUMERIC_MAX, transform, to_records, python_values, date_key, date_keys,
+    source, const, as_text, as_int, numeric, boolean, as_date, prefixed, json_text, list_item
+)
 import logging
 
+# Tablas de origen → (dimensión, columna de clave natural, tipo SQL de la
+# clave) del warehouse
+INCREMENTAL_CONSUMER = 'warehouse'
+
+INCREMENTAL_TABLES = {
+    'series': ('dim_series', 'series_id', 'varchar'),
+    'tags': ('dim_tag', 'tag_id', 'varchar'),
+    'events': ('dim_event', 'event_id', 'integer'),
+    'markets': ('dim_market', 'market_id', 'varchar'),
+}
+
+# Columnas de origen → columnas de cada dimensión (orden de DIMENSION_TABLES)
+SERIES_MAPPING = [
+    ('series_id', as_text('id')),
+    ('slug', source('slug')),
+    ('title', source('title')),
+    ('description', source('description')),
+    ('image', source('image')),
+    ('icon', source('icon')),
+    ('series_type', source('seriesType')),
+    ('recurrence', source('recurrence')),
+    ('active', boolean('active')),
+    ('closed', boolean('closed')),
+    ('archived', boolean('archived')),
+    ('restricted', boolean('restricted')),
+    ('featured', boolean('featured')),
+    ('layout', source('layout')),
+    ('start_date', source('startDate')),
+    ('published_at', source('publishedAt')),
+    ('created_at_source', source('createdAt')),
+    ('updated_at_source', source('updatedAt')),
+    ('created_by', source('createdBy')),
+    ('updated_by', source('updatedBy')),
+]
+
+# parent_tag_id, level y path se cargan como raíz; la jerarquía deducida de
+# los eventos la aplica después TagHierarchyLoader
+TAG_MAPPING = [
+    ('tag_id', as_text('id')),
+    ('label', source('label')),
+    ('slug', source('slug')),
+    ('parent_tag_id', const(None)),
+    ('level', const(1)),
+    ('path', prefixed('/', 'slug')),
+    ('force_show', boolean('forceShow')),
+    ('force_hide', boolean('forceHide')),
+    ('is_carousel', boolean('isCarousel')),
+    ('requires_translation', boolean('requiresTranslation')),
+    ('published_at', source('publishedAt')),
+    ('created_at_source', source('createdAt')),
+    ('updated_at_source', source('updatedAt')),
+    ('created_by', source('createdBy')),
+    ('updated_by', source('updatedBy')),
+]
+
+EVENT_MAPPING = [
+    ('event_id', as_int('id')),
+    ('ticker', source('ticker')),
+    ('slug', source('slug')),
+    ('title', source('title')),
+    ('description', source('description')),
+    ('category', source('category')),
+    ('subcategory', source('subcategory')),
+    ('image', source('image')),
+    ('icon', source('icon')),
+    ('resolution_source', source('resolutionSource')),
+    ('active', boolean('active')),
+    ('closed', boolean('closed')),
+    ('archived', boolean('archived')),
+    ('new', boolean('new')),
+    ('featured', boolean('featured')),
+    ('restricted', boolean('restricted')),
+    ('cyom', boolean('cyom')),
+    ('competitive', numeric('competitive', NUMERIC_MAX)),
+    ('start_date', source('startDate')),
+    ('creation_date', source('creationDate')),
+    ('end_date', source('endDate')),
+    ('closed_time', source('closedTime')),
+    ('published_at', source('published_at')),
+    ('created_at_source', source('createdAt')),
+    ('updated_at_source', source('updatedAt')),
+    ('show_all_outcomes', boolean('showAllOutcomes')),
+    ('show_market_images', boolean('showMarketImages')),
+    ('enable_neg_risk', boolean('enableNegRisk')),
+    ('enable_order_book', boolean('enableOrderBook')),
+    ('neg_risk_augmented', boolean('negRiskAugmented')),
+    ('pending_deployment', boolean('pendingDeployment')),
+    ('deploying', boolean('deploying')),
+    ('requires_translation', boolean('requiresTranslation')),
+    ('comments_enabled', boolean('commentsEnabled')),
+    ('series_slug', source('seriesSlug')),
+    ('parent_event_id', as_int('parentEventId')),
+    ('sport', source('sport')),
+    ('event_date', source('eventDate')),
+    ('event_week', as_int('eventWeek')),
+    ('game_id', as_text('gameId')),
+    ('game_status', source('gameStatus')),
+]
+
+MARKET_MAPPING = [
+    ('market_id', as_text('id')),
+    ('condition_id', source('conditionId')),
+    ('slug', source('slug')),
+    ('question', source('question')),
+    ('description', source('description')),
+    ('market_type', source('marketType')),
+    ('category', source('category')),
+    ('subcategory', source('subcategory')),
+    ('outcomes', json_text('outcomes')),
+    ('active', boolean('active')),
+    ('closed', boolean('closed')),
+    ('archived', boolean('archived')),
+    ('restricted', boolean('restricted')),
+    ('new', boolean('new')),
+    ('featured', boolean('featured')),
+    ('enable_order_book', boolean('enableOrderBook')),
+    ('clear_book_on_start', boolean('clearBookOnStart')),
+    ('fppm_live', boolean('fppmLive')),
+    ('rfq_enabled', boolean('rfqEnabled')),
+    ('start_date', source('startDate')),
+    ('end_date', source('endDate')),
+    ('closed_time', source('closedTime')),
+    ('created_at_source', source('createdAt')),
+    ('updated_at_source', source('updatedAt')),
+    ('image', source('image')),
+    ('icon', source('icon')),
+    ('resolution_source', source('resolutionSource')),
+    ('neg_risk', boolean('negRisk')),
+    ('neg_risk_market_id', source('negRiskMarketID')),
+    ('format_type', source('formatType')),
+    ('wide_format', boolean('wideFormat')),
+    ('lower_bound', numeric('lowerBound', NUMERIC_MAX)),
+    ('upper_bound', numeric('upperBound', NUMERIC_MAX)),
+    ('question_id', source('questionID')),
+    ('market_maker_address', source('marketMakerAddress')),
+]
+
+# Métricas de mercado (orden de FACT_METRIC_COLUMNS); los precios se
+# agregan según la capa de origen en fact_mapping()
+FACT_METRIC_SOURCES = {
+    'liquidity': 'liquidity',
+    'liquidity_amm': 'liquidityAmm',
+    'liquidity_clob': 'liquidityClob',
+    'volume': 'volume',
+    'volume_24hr': 'volume24hr',
+    'volume_1wk': 'volume1wk',
+    'volume_1mo': 'volume1mo',
+    'volume_1yr': 'volume1yr',
+    'volume_amm': 'volumeAmm',
+    'volume_clob': 'volumeClob',
+    'volume_24hr_amm': 'volume24hrAmm',
+    'volume_24hr_clob': 'volume24hrClob',
+    'volume_1wk_amm': 'volume1wkAmm',
+    'volume_1wk_clob': 'volume1wkClob',
+    'volume_1mo_amm': 'volume1moAmm',
+    'volume_1mo_clob': 'volume1moClob',
+    'volume_1yr_amm': 'volume1yrAmm',
+    'volume_1yr_clob': 'volume1yrClob',
+    'open_interest': 'openInterest',  # Nota: no está en markets, podría estar en events
+    'last_trade_price': 'lastTradePrice',
+    'best_bid': 'bestBid',
+    'best_ask': 'bestAsk',
+    'spread': 'spread',
+    'price_change_1h': 'oneHourPriceChange',
+    'price_change_1d': 'oneDayPriceChange',
+    'price_change_1wk': 'oneWeekPriceChange',
+    'price_change_1mo': 'oneMonthPriceChange',
+    'price_change_1yr': 'oneYearPriceChange',
+    'fee': 'fee',
+    'taker_base_fee': 'takerBaseFee',
+    'maker_base_fee': 'makerBaseFee',
+    'competitive': 'competitive',
+}
+
+
+def fact_mapping(df_markets):
+    """
+    Mapeo de la tabla de hechos con ids y fechas naturales
+    (columnas de FACT_STAGING_COLUMNS)
+    """
+    # La capa Silver ya trae outcomePrices desanidado
+    if 'outcomePriceYes' in df_markets.columns:
+        prices = {
+            'outcome_price_yes': numeric('outcomePriceYes', NUMERIC_MAX),
+            'outcome_price_no': numeric('outcomePriceNo', NUMERIC_MAX),
+        }
+    else:
+        prices = {
+            'outcome_price_yes': list_item('outcomePrices', 0, NUMERIC_MAX),
+            'outcome_price_no': list_item('outcomePrices', 1, NUMERIC_MAX),
+        }
+    
+    metrics = {
+        **{target: numeric(name, NUMERIC_MAX) for target, name in FACT_METRIC_SOURCES.items()},
+        **prices,
+        'comment_count': const(None),  # buscar en events
+        'tweet_count': const(None),  # buscar en events
+        'extraction_timestamp': source('_extraction_timestamp'),
+    }
+    
+    return [
+        ('market_id', as_text('id')),
+        ('snapshot_date', as_date('_extraction_date')),
+        ('start_date', source('startDate')),
+        ('end_date', source('endDate')),
+        ('closed_time', source('closedTime')),
+    ] + [(col, metrics[col]) for col in FACT_METRIC_COLUMNS]
+
 class DataWarehouseETL:
     """
     ETL para cargar datos desde Delta Lake hacia el Data Warehouse en NeonDB
     """
     
-    def __init__(self, environment=DEFAULT_ENVIRONMENT):
+    def __init__(self, environment=DEFAULT_ENVIRONMENT, skip_unchanged=False):
         self.environment = environment
+        self.skip_unchanged = skip_unchanged  # omitir mercados sin cambios en el snapshot
         self.delta_manager = DeltaLakeManager()
+        self.silver_manager = DeltaLakeManager(SILVER_DIR)
         self.conn = None
+        self.bulk = None
+        self.loaded_time_keys = None  # time_key presentes en dim_time (se lee una vez)
         self.logger = self._setup_logger()
         
     def _setup_logger(self):
@@ -61,6 +286,7 @@ class DataWarehouseETL:
             self.logger.info(f"Conectando a NeonDB ({self.environment})...")
             self.conn = psycopg2.connect(get_connection_string(self.environment))
             self.conn.autocommit = False  # Usar transacciones
+            self.bulk = BulkLoader(self.conn)
             self.logger.info("✅ Conexión establecida")
             return True
         except Exception as e:
@@ -73,120 +299,106 @@ class DataWarehouseETL:
             self.conn.close()
             self.logger.info("🔌 Conexión cerrada")
     
-    def clean_value(self, value):
-        """
-        Limpia y normaliza un valor
-        - Convierte nan a None
-        - Limpia strings vacíos
-        """
-        if pd.isna(value):
-            return None
-        if isinstance(value, str) and value.strip() == '':
-            return None
-        return value
-    
-    def parse_json_field(self, value):
-        """
-        Parsea un campo JSON string a objeto Python
-        """
-        if pd.isna(value) or value is None:
-            return None
-        if isinstance(value, str):
-            try:
-                return json.loads(value)
-            except:
-                return None
-        return value
+    def source_manager(self, table_name):
+        """Retorna el DeltaLakeManager de la capa de origen (Silver si existe)"""
+        if self.silver_manager.table_exists(table_name):
+            return self.silver_manager
+        return self.delta_manager
     
-    def extract_outcome_prices(self, outcome_prices_str):
+    def read_source_table(self, table_name):
         """
-        Desanida los precios del array outcomePrices
-        Retorna: (price_yes, price_no)
-        """
-        prices = self.parse_json_field(outcome_prices_str)
-        if not prices or not isinstance(prices, list):
-            return None, None
+        Lee una tabla de origen, priorizando la capa Silver
         
-        price_yes = float(prices[0]) if len(prices) > 0 else None
-        price_no = float(prices[1]) if len(prices) > 1 else None
+        Las tablas Silver ya vienen tipadas (timestamps, numéricos, booleanos
+        y precios desanidados); si no existen se usa la tabla Bronze.
+        """
+        if self.silver_manager.table_exists(table_name):
+            self.logger.info(f"   {table_name}: leyendo capa Silver")
+            return self.silver_manager.read_delta_table(table_name)
         
-        return price_yes, price_no
+        self.logger.info(f"   {table_name}: capa Silver no disponible, leyendo Bronze")
+        return self.delta_manager.read_delta_table(table_name)
     
-    def load_dim_time(self, start_date='2021-01-01', end_date='2026-12-31'):
+    def load_dim_time(self, start_date=None, end_date=None):
         """
         Carga la dimensión de tiempo con todas las fechas en el rango
+        
+        Las fechas se generan en el servidor (generate_series); sin rango se
+        usa el de DIM_TIME_CONFIG hasta el fin del año siguiente.
         """
         self.logger.info("📅 Cargando dimensión de tiempo...")
         
-        cursor = self.conn.cursor()
-        
-        # Generar rango de fechas
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        
-        records = []
-        for dt in dates:
-            record = (
-                dt.date(),
-                dt.year,
-                (dt.month - 1) // 3 + 1,  # Quarter
-                dt.month,
-                dt.strftime('%B'),
-                dt.isocalendar()[1],  # Week of year
-                dt.day,
-                dt.dayofweek,
-                dt.strftime('%A'),
-                dt.dayofweek >= 5,  # is_weekend
-                dt.day == 1,  # is_month_start
-                dt.day == pd.Period(dt, 'M').days_in_month,  # is_month_end
-                dt.day == 1 and dt.month in [1, 4, 7, 10],  # is_quarter_start
-                dt.day == pd.Period(dt, 'M').days_in_month and dt.month in [3, 6, 9, 12],  # is_quarter_end
-                dt.day == 1 and dt.month == 1,  # is_year_start
-                dt.day == 31 and dt.month == 12,  # is_year_end
-                dt.year,  # fiscal_year (same as calendar year)
-                (dt.month - 1) // 3 + 1  # fiscal_quarter
-            )
-            records.append(record)
-        
-        # Insertar en batch
-        query = """
-            INSERT INTO dim_time (
-                date_value, year, quarter, month, month_name, week_of_year,
-                day_of_month, day_of_week, day_name, is_weekend,
-                is_month_start, is_month_end, is_quarter_start, is_quarter_end,
-                is_year_start, is_year_end, fiscal_year, fiscal_quarter
-            ) VALUES %s
-            ON CONFLICT (date_value) DO NOTHING
-        """
-        
-        execute_values(cursor, query, records)
+        count = ensure_dim_time(self.conn, start_date, end_date)
         self.conn.commit()
+        self.loaded_time_keys = None
         
-        count = cursor.rowcount
-        self.logger.info(f"✅ Dimensión tiempo cargada: {count} registros")
-        cursor.close()
+        self.logger.info(f"✅ Dimensión tiempo cargada: {count} fechas nuevas")
     
-    def get_time_key(self, date_value):
+    def maintain_partitions(self):
         """
-        Obtiene el time_key para una fecha
+        Crea las particiones futuras de fact_market_metrics
+        (FACT_PARTITION_CONFIG); el archivo de particiones antiguas solo se
+        hace a pedido con fact_partitions.py --archive
         """
-        if pd.isna(date_value) or date_value is None:
-            return None
-        
-        # Convertir a date si es datetime
-        if isinstance(date_value, str):
-            try:
-                date_value = pd.to_datetime(date_value).date()
-            except:
-                return None
-        elif isinstance(date_value, pd.Timestamp) or isinstance(date_value, datetime):
-            date_value = date_value.date()
+        result = FactPartitionManager(self.conn, self.logger).maintain()
+        self.conn.commit()
+        return result
+    
+    def extend_dim_time(self, *date_series):
+        """
+        Extiende dim_time hasta cubrir las fechas mínima y máxima de las series
+        """
+        dates = pd.concat([
+            pd.to_datetime(values, errors='coerce', utc=True, format='mixed') for values in date_series
+        ]).dropna()
+        if dates.empty:
+            return 0
+        
+        count = ensure_dim_time(self.conn, dates.min().date(), dates.max().date())
+        if count:
+            self.conn.commit()
+            self.loaded_time_keys = None
+            self.logger.info(f"📅 dim_time extendida: {count} fechas nuevas")
+        return count
+    
+    def get_loaded_time_keys(self):
+        """
+        Conjunto de time_key cargados en dim_time (una consulta por ejecución)
+        """
+        if self.loaded_time_keys is None:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT time_key FROM dim_time")
+            self.loaded_time_keys = {row[0] for row in cursor.fetchall()}
+            cursor.close()
+        return self.loaded_time_keys
+    
+    def get_time_key(self, date_value):
+        """
+        Obtiene el time_key (yyyymmdd) para una fecha
         
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT time_key FROM dim_time WHERE date_value = %s", (date_value,))
-        result = cursor.fetchone()
-        cursor.close()
+        La clave se calcula a partir de la fecha; retorna None si la fecha
+        no está cargada en dim_time.
+        """
+        key = date_key(date_value)
+        return key if key in self.get_loaded_time_keys() else None
+    
+    def upsert_dimension(self, dim_table, records):
+        """
+        Carga registros en una dimensión según DIMENSION_TABLES como SCD
+        Tipo 2 (solo se escriben los ids nuevos y los cambios)
         
-        return result[0] if result else None
+        Returns:
+            Versiones insertadas
+        """
+        result = SCD2Loader(self.conn, self.bulk, self.logger).load(dim_table, records)
+        self.conn.commit()
+        return result['new'] + result['changed']
+    
+    def series_records(self, df_series):
+        """
+        Construye los registros de dim_series (columnas de DIMENSION_TABLES)
+        """
+        return to_records(transform(df_series, SERIES_MAPPING))
     
     def load_dim_series(self, df_series):
         """
@@ -194,67 +406,15 @@ class DataWarehouseETL:
         """
         self.logger.info("📁 Cargando dimensión de series...")
         
-        cursor = self.conn.cursor()
-        records = []
-        
-        for _, row in df_series.iterrows():
-            record = (
-                self.clean_value(row.get('id')),
-                self.clean_value(row.get('slug')),
-                self.clean_value(row.get('title')),
-                self.clean_value(row.get('description')),
-                self.clean_value(row.get('image')),
-                self.clean_value(row.get('icon')),
-                self.clean_value(row.get('seriesType')),
-                self.clean_value(row.get('recurrence')),
-                self.clean_value(row.get('active')),
-                self.clean_value(row.get('closed')),
-                self.clean_value(row.get('archived')),
-                self.clean_value(row.get('restricted')),
-                self.clean_value(row.get('featured')),
-                self.clean_value(row.get('layout')),
-                self.clean_value(row.get('startDate')),
-                self.clean_value(row.get('publishedAt')),
-                self.clean_value(row.get('createdAt')),
-                self.clean_value(row.get('updatedAt')),
-                self.clean_value(row.get('createdBy')),
-                self.clean_value(row.get('updatedBy'))
-            )
-            records.append(record)
-        
-        query = """
-            INSERT INTO dim_series (
-                series_id, slug, title, description, image, icon,
-                series_type, recurrence, active, closed, archived, restricted,
-                featured, layout, start_date, published_at, created_at_source,
-                updated_at_source, created_by, updated_by
-            ) VALUES %s
-            ON CONFLICT (series_id) DO UPDATE SET
-                slug = EXCLUDED.slug,
-                title = EXCLUDED.title,
-                description = EXCLUDED.description,
-                image = EXCLUDED.image,
-                icon = EXCLUDED.icon,
-                series_type = EXCLUDED.series_type,
-                recurrence = EXCLUDED.recurrence,
-                active = EXCLUDED.active,
-                closed = EXCLUDED.closed,
-                archived = EXCLUDED.archived,
-                restricted = EXCLUDED.restricted,
-                featured = EXCLUDED.featured,
-                layout = EXCLUDED.layout,
-                start_date = EXCLUDED.start_date,
-                published_at = EXCLUDED.published_at,
-                updated_at_source = EXCLUDED.updated_at_source,
-                updated_by = EXCLUDED.updated_by
-        """
-        
-        execute_values(cursor, query, records)
-        self.conn.commit()
+        count = self.upsert_dimension('dim_series', self.series_records(df_series))
         
-        count = cursor.rowcount
-        self.logger.info(f"✅ Dimensión series cargada: {count} registros")
-        cursor.close()
+        self.logger.info(f"✅ Dimensión series cargada: {count} versiones nuevas")
+    
+    def tags_records(self, df_tags):
+        """
+        Construye los registros de dim_tag (columnas de DIMENSION_TABLES)
+        """
+        return to_records(transform(df_tags, TAG_MAPPING))
     
     def load_dim_tag(self, df_tags):
         """
@@ -262,60 +422,15 @@ class DataWarehouseETL:
         """
         self.logger.info("🏷️  Cargando dimensión de tags...")
         
-        cursor = self.conn.cursor()
-        records = []
-        
-        for _, row in df_tags.iterrows():
-            tag_id = self.clean_value(row.get('id'))
-            slug = self.clean_value(row.get('slug'))
-            
-            # Por ahora, todos los tags son nivel 1 (sin jerarquía)
-            # Se puede expandir después si hay datos de parent_tag
-            path = f"/{slug}" if slug else None
-            
-            record = (
-                tag_id,
-                self.clean_value(row.get('label')),
-                slug,
-                None,  # parent_tag_id
-                1,     # level
-                path,  # path
-                self.clean_value(row.get('forceShow')),
-                self.clean_value(row.get('forceHide')),
-                self.clean_value(row.get('isCarousel')),
-                self.clean_value(row.get('requiresTranslation')),
-                self.clean_value(row.get('publishedAt')),
-                self.clean_value(row.get('createdAt')),
-                self.clean_value(row.get('updatedAt')),
-                self.clean_value(row.get('createdBy')),
-                self.clean_value(row.get('updatedBy'))
-            )
-            records.append(record)
-        
-        query = """
-            INSERT INTO dim_tag (
-                tag_id, label, slug, parent_tag_id, level, path,
-                force_show, force_hide, is_carousel, requires_translation,
-                published_at, created_at_source, updated_at_source,
-                created_by, updated_by
-            ) VALUES %s
-            ON CONFLICT (tag_id) DO UPDATE SET
-                label = EXCLUDED.label,
-                slug = EXCLUDED.slug,
-                force_show = EXCLUDED.force_show,
-                force_hide = EXCLUDED.force_hide,
-                is_carousel = EXCLUDED.is_carousel,
-                requires_translation = EXCLUDED.requires_translation,
-                updated_at_source = EXCLUDED.updated_at_source,
-                updated_by = EXCLUDED.updated_by
-        """
-        
-        execute_values(cursor, query, records)
-        self.conn.commit()
+        count = self.upsert_dimension('dim_tag', self.tags_records(df_tags))
         
-        count = cursor.rowcount
-        self.logger.info(f"✅ Dimensión tags cargada: {count} registros")
-        cursor.close()
+        self.logger.info(f"✅ Dimensión tags cargada: {count} versiones nuevas")
+    
+    def events_records(self, df_events):
+        """
+        Construye los registros de dim_event (columnas de DIMENSION_TABLES)
+        """
+        return to_records(transform(df_events, EVENT_MAPPING))
     
     def load_dim_event(self, df_events):
         """
@@ -323,92 +438,15 @@ class DataWarehouseETL:
         """
         self.logger.info("📰 Cargando dimensión de eventos...")
         
-        cursor = self.conn.cursor()
-        records = []
-        
-        for _, row in df_events.iterrows():
-            record = (
-                self.clean_value(row.get('id')),
-                self.clean_value(row.get('ticker')),
-                self.clean_value(row.get('slug')),
-                self.clean_value(row.get('title')),
-                self.clean_value(row.get('description')),
-                self.clean_value(row.get('category')),
-                self.clean_value(row.get('subcategory')),
-                self.clean_value(row.get('image')),
-                self.clean_value(row.get('icon')),
-                self.clean_value(row.get('resolutionSource')),
-                self.clean_value(row.get('active')),
-                self.clean_value(row.get('closed')),
-                self.clean_value(row.get('archived')),
-                self.clean_value(row.get('new')),
-                self.clean_value(row.get('featured')),
-                self.clean_value(row.get('restricted')),
-                self.clean_value(row.get('cyom')),
-                self.clean_value(row.get('competitive')),
-                self.clean_value(row.get('startDate')),
-                self.clean_value(row.get('creationDate')),
-                self.clean_value(row.get('endDate')),
-                self.clean_value(row.get('closedTime')),
-                self.clean_value(row.get('published_at')),
-                self.clean_value(row.get('createdAt')),
-                self.clean_value(row.get('updatedAt')),
-                self.clean_value(row.get('showAllOutcomes')),
-                self.clean_value(row.get('showMarketImages')),
-                self.clean_value(row.get('enableNegRisk')),
-                self.clean_value(row.get('enableOrderBook')),
-                self.clean_value(row.get('negRiskAugmented')),
-                self.clean_value(row.get('pendingDeployment')),
-                self.clean_value(row.get('deploying')),
-                self.clean_value(row.get('requiresTranslation')),
-                self.clean_value(row.get('commentsEnabled')),
-                self.clean_value(row.get('seriesSlug')),
-                self.clean_value(row.get('parentEventId')),
-                self.clean_value(row.get('sport')),
-                self.clean_value(row.get('eventDate')),
-                self.clean_value(row.get('eventWeek')),
-                self.clean_value(row.get('gameId')),
-                self.clean_value(row.get('gameStatus'))
-            )
-            records.append(record)
-        
-        query = """
-            INSERT INTO dim_event (
-                event_id, ticker, slug, title, description, category, subcategory,
-                image, icon, resolution_source, active, closed, archived, new,
-                featured, restricted, cyom, competitive,
-                start_date, creation_date, end_date, closed_time, published_at,
-                created_at_source, updated_at_source,
-                show_all_outcomes, show_market_images, enable_neg_risk,
-                enable_order_book, neg_risk_augmented, pending_deployment,
-                deploying, requires_translation, comments_enabled,
-                series_slug, parent_event_id, sport, event_date, event_week,
-                game_id, game_status
-            ) VALUES %s
-            ON CONFLICT (event_id) DO UPDATE SET
-                ticker = EXCLUDED.ticker,
-                slug = EXCLUDED.slug,
-                title = EXCLUDED.title,
-                description = EXCLUDED.description,
-                category = EXCLUDED.category,
-                subcategory = EXCLUDED.subcategory,
-                image = EXCLUDED.image,
-                icon = EXCLUDED.icon,
-                resolution_source = EXCLUDED.resolution_source,
-                active = EXCLUDED.active,
-                closed = EXCLUDED.closed,
-                archived = EXCLUDED.archived,
-                updated_at_source = EXCLUDED.updated_at_source,
-                show_all_outcomes = EXCLUDED.show_all_outcomes,
-                show_market_images = EXCLUDED.show_market_images
-        """
-        
-        execute_values(cursor, query, records)
-        self.conn.commit()
+        count = self.upsert_dimension('dim_event', self.events_records(df_events))
         
-        count = cursor.rowcount
-        self.logger.info(f"✅ Dimensión eventos cargada: {count} registros")
-        cursor.close()
+        self.logger.info(f"✅ Dimensión eventos cargada: {count} versiones nuevas")
+    
+    def markets_records(self, df_markets):
+        """
+        Construye los registros de dim_market (columnas de DIMENSION_TABLES)
+        """
+        return to_records(transform(df_markets, MARKET_MAPPING))
     
     def load_dim_market(self, df_markets):
         """
@@ -416,124 +454,140 @@ class DataWarehouseETL:
         """
         self.logger.info("💹 Cargando dimensión de mercados...")
         
-        cursor = self.conn.cursor()
-        records = []
-        
-        for _, row in df_markets.iterrows():
-            # Parsear outcomes como JSONB
-            outcomes = self.parse_json_field(row.get('outcomes'))
-            outcomes_json = json.dumps(outcomes) if outcomes else None
-            
-            record = (
-                str(self.clean_value(row.get('id'))),
-                self.clean_value(row.get('conditionId')),
-                self.clean_value(row.get('slug')),
-                self.clean_value(row.get('question')),
-                self.clean_value(row.get('description')),
-                self.clean_value(row.get('marketType')),
-                self.clean_value(row.get('category')),
-                self.clean_value(row.get('subcategory')),
-                outcomes_json,
-                self.clean_value(row.get('active')),
-                self.clean_value(row.get('closed')),
-                self.clean_value(row.get('archived')),
-                self.clean_value(row.get('restricted')),
-                self.clean_value(row.get('new')),
-                self.clean_value(row.get('featured')),
-                self.clean_value(row.get('enableOrderBook')),
-                self.clean_value(row.get('clearBookOnStart')),
-                self.clean_value(row.get('fppmLive')),
-                self.clean_value(row.get('rfqEnabled')),
-                self.clean_value(row.get('startDate')),
-                self.clean_value(row.get('endDate')),
-                self.clean_value(row.get('closedTime')),
-                self.clean_value(row.get('createdAt')),
-                self.clean_value(row.get('updatedAt')),
-                self.clean_value(row.get('image')),
-                self.clean_value(row.get('icon')),
-                self.clean_value(row.get('resolutionSource')),
-                self.clean_value(row.get('negRisk')),
-                self.clean_value(row.get('negRiskMarketID')),
-                self.clean_value(row.get('formatType')),
-                self.clean_value(row.get('wideFormat')),
-                self.clean_value(row.get('lowerBound')),
-                self.clean_value(row.get('upperBound')),
-                self.clean_value(row.get('questionID')),
-                self.clean_value(row.get('marketMakerAddress'))
-            )
-            records.append(record)
-        
-        query = """
-            INSERT INTO dim_market (
-                market_id, condition_id, slug, question, description,
-                market_type, category, subcategory, outcomes,
-                active, closed, archived, restricted, new, featured,
-                enable_order_book, clear_book_on_start, fppm_live, rfq_enabled,
-                start_date, end_date, closed_time, created_at_source, updated_at_source,
-                image, icon, resolution_source,
-                neg_risk, neg_risk_market_id, format_type, wide_format,
-                lower_bound, upper_bound, question_id, market_maker_address
-            ) VALUES %s
-            ON CONFLICT (market_id) DO UPDATE SET
-                slug = EXCLUDED.slug,
-                question = EXCLUDED.question,
-                description = EXCLUDED.description,
-                active = EXCLUDED.active,
-                closed = EXCLUDED.closed,
-                archived = EXCLUDED.archived,
-                updated_at_source = EXCLUDED.updated_at_source
-        """
-        
-        execute_values(cursor, query, records)
-        self.conn.commit()
+        count = self.upsert_dimension('dim_market', self.markets_records(df_markets))
         
-        count = cursor.rowcount
-        self.logger.info(f"✅ Dimensión mercados cargada: {count} registros")
-        cursor.close()
+        self.logger.info(f"✅ Dimensión mercados cargada: {count} versiones nuevas")
     
-    def load_bridge_market_tag(self, df_markets):
+    def lake_links(self, link_table, id_column, event_ids=None):
         """
-        Carga la tabla puente market-tag (relación many-to-many)
+        Pares (event_id, id_column) de una tabla de relación del lake
+        
+        Args:
+            event_ids: Limitar a estos eventos (por defecto todos)
         """
-        self.logger.info("🔗 Cargando tabla puente market-tag...")
+        links = self.source_manager(link_table).read_delta_table(link_table)
+        if links is None:
+            links = pd.DataFrame(columns=['event_id', id_column])
+        links = pd.DataFrame({
+            'event_id': as_text('event_id')(links),
+            id_column: as_text(id_column)(links)
+        }).dropna()
+        if event_ids is not None:
+            links = links[links['event_id'].isin(event_ids)]
+        return links.drop_duplicates()
+    
+    def market_tag_links(self, df_events):
+        """
+        Relaciones evento-mercado y evento-tag de los eventos
         
-        cursor = self.conn.cursor()
+        Se desanidan las listas markets/tags de los eventos; si la capa de
+        origen no las trae, se leen las tablas de relación del lake.
+        """
+        if 'markets' in df_events.columns and 'tags' in df_events.columns:
+            return event_links(df_events, 'markets', 'market_id'), event_links(df_events, 'tags', 'tag_id')
         
-        # Primero, obtener mapeo de IDs a keys
-        cursor.execute("SELECT market_id, market_key FROM dim_market")
-        market_map = {str(row[0]): row[1] for row in cursor.fetchall()}
+        self.logger.info("   events sin listas markets/tags: leyendo event_markets y event_tags")
+        event_ids = set(as_text('id')(df_events).dropna())
+        return self.lake_links('event_markets', 'market_id', event_ids), self.lake_links('event_tags', 'tag_id', event_ids)
+    
+    def event_tag_links(self, df_events=None):
+        """
+        Relaciones evento-tag de los eventos (o de todo el lake si no se
+        pasan eventos)
+        """
+        if df_events is not None and 'tags' in df_events.columns:
+            return event_links(df_events, 'tags', 'tag_id')
+        if df_events is not None:
+            return self.lake_links('event_tags', 'tag_id', set(as_text('id')(df_events).dropna()))
+        return self.lake_links('event_tags', 'tag_id')
+    
+    def load_tag_hierarchy(self, df_events=None, conn=None):
+        """
+        Deduce la jerarquía de tags de las relaciones evento-tag, actualiza
+        parent_tag_id/level/path de dim_tag y reconstruye tag_closure
         
-        cursor.execute("SELECT tag_id, tag_key FROM dim_tag")
-        tag_map = {str(row[0]): row[1] for row in cursor.fetchall()}
+        Args:
+            df_events: DataFrame de eventos (por defecto event_tags del lake)
+            conn: Conexión a usar (por defecto la del ETL)
+        """
+        self.logger.info("🌳 Resolviendo jerarquía de tags...")
         
-        # Limpiar tabla puente existente
-        cursor.execute("TRUNCATE bridge_market_tag")
+        conn = conn or self.conn
+        result = TagHierarchyLoader(conn, BulkLoader(conn), self.logger).load(self.event_tag_links(df_events))
+        conn.commit()
+        return result
+    
+    def load_bridge_market_tag(self, df_events, conn=None):
+        """
+        Carga la tabla puente market-tag (relación many-to-many)
         
-        records = []
-        for _, row in df_markets.iterrows():
-            market_id = str(self.clean_value(row.get('id')))
-            market_key = market_map.get(market_id)
-            
-            if not market_key:
-                continue
-            
-            # Parsear tags (puede estar en la columna events si hay relación)
-            # Por ahora, asumimos que los markets no tienen tags directos
-            # Esta lógica se puede expandir según la estructura real
+        Las relaciones evento-mercado y evento-tag se desanidan por columnas
+        y se unen por event_id en el servidor, resolviendo market_key y
+        tag_key contra las versiones vigentes.
         
-        if records:
-            query = """
-                INSERT INTO bridge_market_tag (market_key, tag_key)
-                VALUES %s
-                ON CONFLICT (market_key, tag_key) DO NOTHING
-            """
-            execute_values(cursor, query, records)
+        Args:
+            df_events: DataFrame de eventos
+            conn: Conexión a usar (por defecto la del ETL)
+        """
+        self.logger.info("🔗 Cargando tabla puente market-tag...")
         
-        self.conn.commit()
+        conn = conn or self.conn
+        event_markets, event_tags = self.market_tag_links(df_events)
+        result = BridgeLoader(conn, BulkLoader(conn), self.logger).load(event_markets, event_tags)
+        conn.commit()
         
-        count = cursor.rowcount if records else 0
-        self.logger.info(f"✅ Tabla puente market-tag cargada: {count} registros")
+        self.logger.info(f"✅ Tabla puente market-tag cargada: {result['inserted']} relaciones nuevas")
+    
+    def time_keys(self, values):
+        """
+        time_key (yyyymmdd) de cada fecha de una serie, calculado por columnas;
+        las fechas fuera de dim_time quedan nulas
+        """
+        keys = date_keys(values)
+        return keys.where(keys.isin(self.get_loaded_time_keys()))
+    
+    def fact_source_frame(self, df_markets):
+        """
+        Transforma los mercados a ids y fechas naturales de la tabla de
+        hechos y extiende dim_time hasta cubrir sus fechas
+        """
+        frame = transform(df_markets, fact_mapping(df_markets))
+        date_columns = ['snapshot_date', 'start_date', 'end_date', 'closed_time']
+        self.extend_dim_time(*[frame[col] for col in date_columns])
+        # Claves en caché: time_keys() no vuelve a consultar la conexión
+        self.get_loaded_time_keys()
+        return frame
+    
+    def market_keys(self, conn=None):
+        """Mapeo market_id → market_key de las versiones vigentes"""
+        cursor = (conn or self.conn).cursor()
+        cursor.execute("SELECT market_id, market_key FROM dim_market WHERE is_current")
+        market_map = {str(row[0]): row[1] for row in cursor.fetchall()}
         cursor.close()
+        return market_map
+    
+    def fact_frame(self, frame, market_map):
+        """
+        Resuelve las claves subrogadas de la tabla de hechos por columnas
+        
+        Returns:
+            DataFrame con claves y métricas de los mercados existentes con
+            snapshot_date
+        """
+        # event_key y series_key se pueden obtener de las relaciones events/series
+        keys = pd.DataFrame({
+            'market_key': frame['market_id'].map(market_map).astype('Int64'),
+            'event_key': None,
+            'series_key': None,
+            'snapshot_date_key': self.time_keys(frame['snapshot_date']),
+            'start_date_key': self.time_keys(frame['start_date']),
+            'end_date_key': self.time_keys(frame['end_date']),
+            'closed_date_key': self.time_keys(frame['closed_time']),
+        }, index=frame.index)
+        
+        # Solo mercados existentes con snapshot_date
+        valid = keys['market_key'].notna() & keys['snapshot_date_key'].notna()
+        return python_values(pd.concat([keys, frame[FACT_METRIC_COLUMNS]], axis=1)[valid])
     
     def load_fact_market_metrics(self, df_markets):
         """
@@ -541,128 +595,24 @@ class DataWarehouseETL:
         """
         self.logger.info("📊 Cargando tabla de hechos (market metrics)...")
         
-        cursor = self.conn.cursor()
+        frame = self.fact_source_frame(df_markets)
+        facts = self.fact_frame(frame, self.market_keys())
         
-        # Obtener mapeos de dimensiones
-        cursor.execute("SELECT market_id, market_key FROM dim_market")
-        market_map = {str(row[0]): row[1] for row in cursor.fetchall()}
-        
-        cursor.execute("SELECT event_id, event_key FROM dim_event")
-        event_map = {int(row[0]): row[1] for row in cursor.fetchall()}
-        
-        cursor.execute("SELECT series_id, series_key FROM dim_series")
-        series_map = {str(row[0]): row[1] for row in cursor.fetchall()}
-        
-        records = []
-        for _, row in df_markets.iterrows():
-            market_id = str(self.clean_value(row.get('id')))
-            market_key = market_map.get(market_id)
-            
-            if not market_key:
-                continue
-            
-            # Obtener event_key y series_key (si están relacionados)
-            event_key = None  # Se puede obtener de la relación events
-            series_key = None  # Se puede obtener de la relación series
-            
-            # Fechas
-            snapshot_date = self.clean_value(row.get('_extraction_date'))
-            if snapshot_date and isinstance(snapshot_date, str):
-                snapshot_date = pd.to_datetime(snapshot_date).date()
-            snapshot_date_key = self.get_time_key(snapshot_date) if snapshot_date else None
-            
-            start_date_key = self.get_time_key(self.clean_value(row.get('startDate')))
-            end_date_key = self.get_time_key(self.clean_value(row.get('endDate')))
-            closed_date_key = self.get_time_key(self.clean_value(row.get('closedTime')))
-            
-            if not snapshot_date_key:
-                continue  # Skip si no tenemos snapshot_date
-            
-            # Desanidar precios
-            price_yes, price_no = self.extract_outcome_prices(row.get('outcomePrices'))
-            
-            record = (
-                market_key,
-                event_key,
-                series_key,
-                snapshot_date_key,
-                start_date_key,
-                end_date_key,
-                closed_date_key,
-                self.clean_value(row.get('liquidity')),
-                self.clean_value(row.get('liquidityAmm')),
-                self.clean_value(row.get('liquidityClob')),
-                self.clean_value(row.get('volume')),
-                self.clean_value(row.get('volume24hr')),
-                self.clean_value(row.get('volume1wk')),
-                self.clean_value(row.get('volume1mo')),
-                self.clean_value(row.get('volume1yr')),
-                self.clean_value(row.get('volumeAmm')),
-                self.clean_value(row.get('volumeClob')),
-                self.clean_value(row.get('volume24hrAmm')),
-                self.clean_value(row.get('volume24hrClob')),
-                self.clean_value(row.get('volume1wkAmm')),
-                self.clean_value(row.get('volume1wkClob')),
-                self.clean_value(row.get('volume1moAmm')),
-                self.clean_value(row.get('volume1moClob')),
-                self.clean_value(row.get('volume1yrAmm')),
-                self.clean_value(row.get('volume1yrClob')),
-                self.clean_value(row.get('openInterest')),  # Nota: no está en markets, podría estar en events
-                price_yes,
-                price_no,
-                self.clean_value(row.get('lastTradePrice')),
-                self.clean_value(row.get('bestBid')),
-                self.clean_value(row.get('bestAsk')),
-                self.clean_value(row.get('spread')),
-                self.clean_value(row.get('oneHourPriceChange')),
-                self.clean_value(row.get('oneDayPriceChange')),
-                self.clean_value(row.get('oneWeekPriceChange')),
-                self.clean_value(row.get('oneMonthPriceChange')),
-                self.clean_value(row.get('oneYearPriceChange')),
-                None,  # comment_count - buscar en events
-                None,  # tweet_count - buscar en events
-                self.clean_value(row.get('fee')),
-                self.clean_value(row.get('takerBaseFee')),
-                self.clean_value(row.get('makerBaseFee')),
-                self.clean_value(row.get('competitive')),
-                self.clean_value(row.get('_extraction_timestamp'))
-            )
-            records.append(record)
-        
-        query = """
-            INSERT INTO fact_market_metrics (
-                market_key, event_key, series_key, snapshot_date_key,
-                start_date_key, end_date_key, closed_date_key,
-                liquidity, liquidity_amm, liquidity_clob,
-                volume, volume_24hr, volume_1wk, volume_1mo, volume_1yr,
-                volume_amm, volume_clob, volume_24hr_amm, volume_24hr_clob,
-                volume_1wk_amm, volume_1wk_clob, volume_1mo_amm, volume_1mo_clob,
-                volume_1yr_amm, volume_1yr_clob, open_interest,
-                outcome_price_yes, outcome_price_no,
-                last_trade_price, best_bid, best_ask, spread,
-                price_change_1h, price_change_1d, price_change_1wk,
-                price_change_1mo, price_change_1yr,
-                comment_count, tweet_count,
-                fee, taker_base_fee, maker_base_fee, competitive,
-                extraction_timestamp
-            ) VALUES %s
-            ON CONFLICT (market_key, snapshot_date_key) DO UPDATE SET
-                liquidity = EXCLUDED.liquidity,
-                volume = EXCLUDED.volume,
-                volume_24hr = EXCLUDED.volume_24hr,
-                outcome_price_yes = EXCLUDED.outcome_price_yes,
-                outcome_price_no = EXCLUDED.outcome_price_no,
-                last_trade_price = EXCLUDED.last_trade_price,
-                best_bid = EXCLUDED.best_bid,
-                best_ask = EXCLUDED.best_ask
-        """
-        
-        execute_values(cursor, query, records)
+        # Se agrega el snapshot sin tocar los anteriores
+        snapshots = SnapshotFactLoader(self.conn, self.bulk, self.skip_unchanged, self.logger)
+        result = snapshots.load(list(facts.columns), to_records(facts), update_columns=FACT_UPDATE_COLUMNS)
         self.conn.commit()
         
-        count = cursor.rowcount
-        self.logger.info(f"✅ Tabla de hechos cargada: {count} registros")
-        cursor.close()
+        self.logger.info(f"✅ Tabla de hechos cargada: {result['written']} registros ({result['skipped']} sin cambios omitidos)")
+    
+    def fact_staging_records(self, df_markets):
+        """
+        Registros de hechos con ids y fechas naturales (FACT_STAGING_COLUMNS)
+        
+        Las claves subrogadas se resuelven después en el servidor.
+        """
+        frame = transform(df_markets, fact_mapping(df_markets))
+        return to_records(frame[frame['snapshot_date'].notna()])
     
     def run_full_load(self):
         """
@@ -677,16 +627,17 @@ class DataWarehouseETL:
             if not self.connect():
                 return False
             
-            # 1. Cargar dimensión de tiempo
+            # 1. Cargar dimensión de tiempo y particiones de hechos
             self.load_dim_time()
+            self.maintain_partitions()
             
-            # 2. Leer datos de Delta Lake
+            # 2. Leer datos de Delta Lake (Silver si existe, Bronze si no)
             self.logger.info("\n📖 Leyendo datos de Delta Lake...")
             
-            df_series = self.delta_manager.read_delta_table('series')
-            df_tags = self.delta_manager.read_delta_table('tags')
-            df_events = self.delta_manager.read_delta_table('events')
-            df_markets = self.delta_manager.read_delta_table('markets')
+            df_series = self.read_source_table('series')
+            df_tags = self.read_source_table('tags')
+            df_events = self.read_source_table('events')
+            df_markets = self.read_source_table('markets')
             
             if df_series is None or df_tags is None or df_events is None or df_markets is None:
                 self.logger.error("❌ Error al leer datos de Delta Lake")
@@ -703,8 +654,9 @@ class DataWarehouseETL:
             self.load_dim_event(df_events)
             self.load_dim_market(df_markets)
             
-            # 4. Cargar tabla puente
-            self.load_bridge_market_tag(df_markets)
+            # 4. Cargar tabla puente y jerarquía de tags
+            self.load_bridge_market_tag(df_events)
+            self.load_tag_hierarchy(df_events)
             
             # 5. Cargar tabla de hechos
             self.load_fact_market_metrics(df_markets)
@@ -724,18 +676,275 @@ class DataWarehouseETL:
         finally:
             self.disconnect()
 
+    def run_staged_load(self):
+        """
+        Ejecuta la carga completa por staging
+        
+        Copia los registros con ids naturales a tablas UNLOGGED stg_*,
+        resuelve las claves subrogadas con joins en el servidor y aplica
+        dimensiones, puente y hechos en una sola transacción. Los hechos se
+        escriben como en la carga completa (SnapshotFactLoader, con
+        --skip-unchanged).
+        """
+        self.logger.info("\n" + "="*60)
+        self.logger.info("INICIANDO CARGA POR STAGING DEL DATA WAREHOUSE")
+        self.logger.info("="*60 + "\n")
+        
+        try:
+            if not self.connect():
+                return False
+            
+            # 1. Dimensión de tiempo (referencia para las claves de fecha)
+            #    y particiones de hechos
+            self.load_dim_time()
+            self.maintain_partitions()
+            
+            # 2. Leer datos de Delta Lake (Silver si existe, Bronze si no)
+            self.logger.info("\n📖 Leyendo datos de Delta Lake...")
+            
+            sources = {name: self.read_source_table(name) for name in ['series', 'tags', 'events', 'markets']}
+            if any(df is None for df in sources.values()):
+                self.logger.error("❌ Error al leer datos de Delta Lake")
+                return False
+            
+            # 3. Copiar a staging (sin resolver claves en Python)
+            self.logger.info("\n📥 Copiando a tablas de staging...")
+            staged = StagedLoader(self.conn, self.bulk, self.logger, skip_unchanged=self.skip_unchanged)
+            staged.create_staging_tables()
+            
+            staged.stage_dimension('dim_series', self.series_records(sources['series']))
+            staged.stage_dimension('dim_tag', self.tags_records(sources['tags']))
+            staged.stage_dimension('dim_event', self.events_records(sources['events']))
+            staged.stage_dimension('dim_market', self.markets_records(sources['markets']))
+            staged.stage_links(self.source_manager)
+            staged.stage_facts(self.fact_staging_records(sources['markets']))
+            
+            # 4. Aplicar dimensiones, puente y hechos en una transacción
+            self.logger.info("\n🔀 Aplicando staging al warehouse...")
+            staged.merge_all()
+            TagHierarchyLoader(self.conn, self.bulk, self.logger).load(self.event_tag_links(sources['events']))
+            self.conn.commit()
+            
+            self.logger.info("\n" + "="*60)
+            self.logger.info("✅ CARGA POR STAGING FINALIZADA EXITOSAMENTE")
+            self.logger.info("="*60 + "\n")
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"\n❌ ERROR durante la carga por staging: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return False
+            
+        finally:
+            self.disconnect()
+
+    def run_parallel_load(self, workers=None):
+        """
+        Ejecuta la carga completa en paralelo con varias conexiones
+        
+        Las tareas siguen LOAD_DEPENDENCIES: las dimensiones (independientes
+        entre sí) se cargan a la vez, cada una con su conexión y su commit;
+        la tabla de hechos se copia por rangos de market_key con varios
+        workers y se publica con un único commit final.
+
+        Si una tarea falla, las ya confirmadas (p.ej. las dimensiones) no se
+        deshacen: las pendientes no se lanzan y el log lista qué quedó
+        aplicado. Repetir la carga es seguro.
+        """
+        self.logger.info("\n" + "="*60)
+        self.logger.info("INICIANDO CARGA PARALELA DEL DATA WAREHOUSE")
+        self.logger.info("="*60 + "\n")
+        
+        try:
+            if not self.connect():
+                return False
+            
+            # 1. Dimensión de tiempo y particiones de hechos
+            self.load_dim_time()
+            self.maintain_partitions()
+            
+            # 2. Leer datos de Delta Lake (Silver si existe, Bronze si no)
+            self.logger.info("\n📖 Leyendo datos de Delta Lake...")
+            
+            sources = {name: self.read_source_table(name) for name in ['series', 'tags', 'events', 'markets']}
+            if any(df is None for df in sources.values()):
+                self.logger.error("❌ Error al leer datos de Delta Lake")
+                return False
+            
+            # Fechas de los hechos en dim_time antes de lanzar las tareas
+            fact_source = self.fact_source_frame(sources['markets'])
+            
+            def dimension_task(dim_table, records):
+                def task(conn):
+                    result = SCD2Loader(conn, BulkLoader(conn), self.logger).load(dim_table, records())
+                    return result['new'] + result['changed']
+                return task
+            
+            def fact_task(conn):
+                facts = self.fact_frame(fact_source, self.market_keys(conn))
+                writer = ParallelFactWriter(self.environment, skip_unchanged=self.skip_unchanged, logger=self.logger)
+                return writer.load(conn, facts, update_columns=FACT_UPDATE_COLUMNS)
+            
+            tasks = {
+                'dim_series': dimension_task('dim_series', lambda: self.series_records(sources['series'])),
+                'dim_tag': dimension_task('dim_tag', lambda: self.tags_records(sources['tags'])),
+                'dim_event': dimension_task('dim_event', lambda: self.events_records(sources['events'])),
+                'dim_market': dimension_task('dim_market', lambda: self.markets_records(sources['markets'])),
+                'bridge_market_tag': lambda conn: self.load_bridge_market_tag(sources['events'], conn),
+                'tag_hierarchy': lambda conn: self.load_tag_hierarchy(sources['events'], conn),
+                'fact_market_metrics': fact_task,
+            }
+            
+            # 3. Cargar según el grafo de dependencias
+            self.logger.info("\n⚡ Cargando tablas en paralelo...")
+            results = DependencyScheduler(self.environment, workers, logger=self.logger).run(tasks)
+            
+            facts = results['fact_market_metrics']
+            self.logger.info(f"✅ Tabla de hechos cargada: {facts['written']} registros ({facts['skipped']} sin cambios omitidos)")
+            
+            self.logger.info("\n" + "="*60)
+            self.logger.info("✅ CARGA PARALELA FINALIZADA EXITOSAMENTE")
+            self.logger.info("="*60 + "\n")
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"\n❌ ERROR durante la carga paralela: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return False
+            
+        finally:
+            self.disconnect()
+
+    def expire_deleted(self, table_name, deleted_ids):
+        """
+        Marca como no vigentes las filas de una dimensión cuyo id
+        desapareció del origen (se conserva el histórico)
+        """
+        if not deleted_ids:
+            return
+        
+        dim_table, id_column, id_type = INCREMENTAL_TABLES[table_name]
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            UPDATE {dim_table}
+            SET is_current = FALSE, expiration_date = {CLOSED_EXPIRATION_SQL}
+            WHERE {id_column} = ANY(%s::{id_type}[]) AND is_current
+        """, (list(deleted_ids),))
+        self.conn.commit()
+        self.logger.info(f"   🗑️ {dim_table}: {cursor.rowcount} registros marcados como no vigentes")
+        cursor.close()
+    
+    def run_incremental_load(self, consumer=INCREMENTAL_CONSUMER):
+        """
+        Ejecuta una carga incremental: solo procesa las filas insertadas,
+        actualizadas o borradas en Delta Lake desde la última carga
+        
+        Cada tabla de origen guarda un watermark (versión Delta consumida)
+        que solo se avanza cuando toda la carga termina correctamente; si
+        falla, la siguiente ejecución reprocesa los mismos cambios.
+        """
+        self.logger.info("\n" + "="*60)
+        self.logger.info("INICIANDO CARGA INCREMENTAL DEL DATA WAREHOUSE")
+        self.logger.info("="*60 + "\n")
+        
+        try:
+            if not self.connect():
+                return False
+            
+            self.logger.info("\n📖 Leyendo cambios de Delta Lake...")
+            
+            changes = {}
+            watermarks = {}
+            for table_name in INCREMENTAL_TABLES:
+                manager = self.source_manager(table_name)
+                df_changes, version = manager.read_changes_since(consumer, table_name)
+                
+                if df_changes is None:
+                    self.logger.error(f"❌ Error al leer cambios de {table_name}")
+                    return False
+                
+                changes[table_name] = df_changes
+                watermarks[table_name] = (manager, version)
+                self.logger.info(f"   {table_name}: {len(df_changes)} cambios (hasta versión {version})")
+            
+            upserts = {
+                name: df[df['_change_type'] != 'delete'].drop(columns=['_change_type', '_commit_version'])
+                for name, df in changes.items()
+            }
+            
+            # Dimensiones (el orden respeta las claves foráneas)
+            loaders = {
+                'series': self.load_dim_series,
+                'tags': self.load_dim_tag,
+                'events': self.load_dim_event,
+                'markets': self.load_dim_market,
+            }
+            for table_name, loader in loaders.items():
+                if len(upserts[table_name]):
+                    loader(upserts[table_name])
+            
+            for table_name, df in changes.items():
+                # Texto sin '.0' para que los ids enteros se conviertan al tipo de la clave
+                deleted = as_text('id')(df[df['_change_type'] == 'delete']).dropna()
+                self.expire_deleted(table_name, deleted.tolist())
+            
+            # Puente para los eventos que cambiaron; hechos para los mercados
+            if len(upserts['events']):
+                self.load_bridge_market_tag(upserts['events'])
+            # La jerarquía depende de todos los eventos: se recalcula sobre el lake
+            if len(upserts['tags']) or len(upserts['events']):
+                self.load_tag_hierarchy()
+            if len(upserts['markets']):
+                self.load_fact_market_metrics(upserts['markets'])
+            
+            for table_name, (manager, version) in watermarks.items():
+                if version is not None:
+                    manager.set_watermark(consumer, table_name, version)
+            
+            self.logger.info("\n" + "="*60)
+            self.logger.info("✅ CARGA INCREMENTAL FINALIZADA EXITOSAMENTE")
+            self.logger.info("="*60 + "\n")
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"\n❌ ERROR durante la carga incremental: {str(e)}")
+            if self.conn:
+                self.conn.rollback()
+            return False
+            
+        finally:
+            self.disconnect()
+
 def main():
     """Función principal"""
     import sys
     
-    environment = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ENVIRONMENT
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    incremental = '--incremental' in sys.argv
+    staged = '--staged' in sys.argv
+    parallel = '--parallel' in sys.argv
+    skip_unchanged = '--skip-unchanged' in sys.argv
+    
+    environment = args[0] if args else DEFAULT_ENVIRONMENT
     
     if environment not in ['development', 'production']:
         print("❌ Ambiente inválido. Use 'development' o 'production'")
         sys.exit(1)
     
-    etl = DataWarehouseETL(environment)
-    success = etl.run_full_load()
+    etl = DataWarehouseETL(environment, skip_unchanged=skip_unchanged)
+    if incremental:
+        success = etl.run_incremental_load()
+    elif staged:
+        success = etl.run_staged_load()
+    elif parallel:
+        success = etl.run_parallel_load()
+    else:
+        success = etl.run_full_load()
     
     sys.exit(0 if success else 1)
 
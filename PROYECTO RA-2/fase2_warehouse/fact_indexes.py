@@ -0,0 +1,212 @@
+"""
+Modo de carga masiva de fact_market_metrics
+Cada fila insertada mantiene todos los índices secundarios y comprueba las
+claves foráneas fila a fila. Cuando una carga escribe muchas filas en una
+partición mensual (recargas completas, partición nueva) es más barato
+quitarle a esa partición los índices no únicos y las FKs, cargar y
+reconstruirlos al final:
+
+1. La partición se separa (DETACH) de fact_market_metrics; sus índices y
+   FKs quedan como objetos propios y se eliminan. Se le agrega un CHECK con
+   los límites de la partición, validado sobre las filas previas a la carga.
+2. La carga escribe directamente en la partición (la clave primaria y
+   UNIQUE(market_key, snapshot_date_key) se conservan para ON CONFLICT; el
+   CHECK se comprueba por fila al insertar).
+3. Los índices se recrean uno tras otro con más maintenance_work_mem y
+   max_parallel_maintenance_workers (cada índice lo construye el servidor
+   con workers paralelos; no se reparten entre conexiones porque la
+   partición separada solo existe en la transacción de la carga), las FKs
+   se validan con una consulta por conjuntos cada una y la partición se
+   vuelve a adjuntar (ATTACH): sus índices y FKs se asocian a los de la
+   tabla padre sin reconstruirse y, gracias al CHECK, Postgres no recorre
+   la partición para validar los límites. Después se elimina el CHECK.
+4. ANALYZE de la partición.
+
+Solo se toca la partición cargada; el resto del histórico no se reindexa.
+Todo ocurre en la transacción de la carga: si falla, el rollback devuelve
+la partición, sus índices y sus FKs.
+
+Bloqueos: DETACH PARTITION toma ACCESS EXCLUSIVE sobre fact_market_metrics
+(y ATTACH, SHARE UPDATE EXCLUSIVE) y se mantiene hasta el commit, así que
+mientras dura la carga ni siquiera las lecturas de la API sobre la tabla de
+hechos avanzan. Por eso el modo solo se activa en cargas masivas.
+
+El modo se activa cuando las filas a escribir caen en una sola partición,
+son al menos FACT_BULK_MODE_CONFIG['min_rows'] y al menos
+'min_partition_share' de las filas que ya tiene la partición.
+
+Ejemplo:
+    indexes = DeferredFactIndexes(conn)
+    with indexes.deferred(staging, 'snapshot_date_key', rows) as target:
+        bulk.insert_from_staging(target, ...)
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from fase2_warehouse.etl_config import FACT_BULK_MODE_CONFIG
+from fase2_warehouse.fact_partitions import FACT_TABLE, FactPartitionManager, month_start, partition_name
+
+
+class DeferredFactIndexes:
+    """Difiere el mantenimiento de índices secundarios y FKs de una partición de hechos"""
+
+    def __init__(self, conn, logger: logging.Logger = None, config: Optional[dict] = None):
+        """
+        Args:
+            conn: Conexión psycopg2 (no se hace commit aquí)
+            logger: Logger del ETL
+            config: Umbrales y parámetros de reconstrucción (por defecto
+                    FACT_BULK_MODE_CONFIG)
+        """
+        self.conn = conn
+        self.logger = logger or logging.getLogger("DeferredFactIndexes")
+        self.config = config or FACT_BULK_MODE_CONFIG
+        self.partitions = FactPartitionManager(conn, self.logger)
+
+    def _fetch(self, sql: str, params=None):
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def _execute(self, sql: str, params=None):
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        cursor.close()
+
+    def target_partition(self, staging: str, column: str) -> Optional[str]:
+        """
+        Partición que recibe todas las filas de la staging (None si las
+        fechas abarcan más de un mes o la staging está vacía)
+        """
+        minimum, maximum = self._fetch(f"SELECT MIN({column}), MAX({column}) FROM {staging}")[0]
+        if minimum is None or month_start(minimum) != month_start(maximum):
+            return None
+        partition = partition_name(month_start(minimum))
+        return partition if partition in self.partitions.partitions() else None
+
+    def partition_rows(self, partition: str) -> int:
+        """Filas estimadas de la partición (estadísticas del catálogo)"""
+        return max(0, int(self._fetch(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", (partition,)
+        )[0][0]))
+
+    def enabled_for(self, rows: int, partition_rows: int) -> bool:
+        """True si cargar rows filas en una partición de partition_rows justifica el modo masivo"""
+        min_rows = self.config.get('min_rows')
+        if min_rows is None or rows < min_rows:
+            return False
+        return rows >= self.config['min_partition_share'] * partition_rows
+
+    def secondary_indexes(self, table: str) -> Dict[str, str]:
+        """Índices no únicos de una tabla (nombre → CREATE INDEX)"""
+        return dict(self._fetch("""
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass
+              AND NOT i.indisunique
+              AND NOT i.indisprimary
+            ORDER BY c.relname
+        """, (table,)))
+
+    def foreign_keys(self, table: str) -> Dict[str, str]:
+        """Claves foráneas de una tabla (nombre → definición)"""
+        return dict(self._fetch("""
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+            ORDER BY conname
+        """, (table,)))
+
+    def detach(self, partition: str):
+        """
+        Separa la partición, le quita índices no únicos y FKs (las
+        definiciones se guardan para attach) y le agrega el CHECK de sus
+        límites
+        """
+        self.bounds = self.partitions.partitions()[partition]
+        self._execute(f"ALTER TABLE {FACT_TABLE} DETACH PARTITION {partition}")
+
+        # Con un CHECK equivalente a los límites, ATTACH no recorre la partición
+        self._execute(f"""
+            ALTER TABLE {partition} ADD CONSTRAINT {partition}_bounds
+            CHECK (snapshot_date_key >= {self.bounds[0]} AND snapshot_date_key < {self.bounds[1]})
+        """)
+
+        # Separada, sus índices y FKs dejan de depender de los de la tabla padre
+        self.indexes = self.secondary_indexes(partition)
+        self.constraints = self.foreign_keys(partition)
+        for name in self.constraints:
+            self._execute(f"ALTER TABLE {partition} DROP CONSTRAINT {name}")
+        for name in self.indexes:
+            self._execute(f"DROP INDEX {name}")
+
+        self.logger.info(
+            f"⏸️  {partition}: separada, {len(self.indexes)} índices y {len(self.constraints)} FKs "
+            f"quitados durante la carga masiva"
+        )
+
+    def attach(self, partition: str):
+        """Recrea índices y FKs de la partición, la vuelve a adjuntar y actualiza estadísticas"""
+        start = time.perf_counter()
+        self._execute("SET LOCAL maintenance_work_mem = %s", (self.config['maintenance_work_mem'],))
+        self._execute("SET LOCAL max_parallel_maintenance_workers = %s", (self.config['parallel_workers'],))
+
+        for definition in self.indexes.values():
+            self._execute(definition)
+        # Cada FK se valida con un solo join en lugar de una comprobación por fila
+        for name, definition in self.constraints.items():
+            self._execute(f"ALTER TABLE {partition} ADD CONSTRAINT {name} {definition}")
+
+        # ATTACH asocia los índices y FKs equivalentes a los de la tabla padre
+        self._execute(f"""
+            ALTER TABLE {FACT_TABLE} ATTACH PARTITION {partition}
+            FOR VALUES FROM ({self.bounds[0]}) TO ({self.bounds[1]})
+        """)
+        self._execute(f"ALTER TABLE {partition} DROP CONSTRAINT {partition}_bounds")
+        self._execute(f"ANALYZE {partition}")
+        self._execute("RESET maintenance_work_mem")
+        self._execute("RESET max_parallel_maintenance_workers")
+
+        self.logger.info(
+            f"▶️  {partition}: {len(self.indexes)} índices y {len(self.constraints)} FKs "
+            f"reconstruidos y partición adjuntada en {time.perf_counter() - start:.1f}s"
+        )
+
+    @contextmanager
+    def deferred(self, staging: str, column: str, rows: int, force: Optional[bool] = None):
+        """
+        Ejecuta el bloque en modo masivo si la carga lo justifica
+
+        Args:
+            staging: Tabla con las filas a cargar (ya con sus particiones creadas)
+            column: Columna de fecha o clave yyyymmdd del snapshot en la staging
+            rows: Filas que va a escribir la carga
+            force: True/False para activar o desactivar el modo sin mirar
+                   los umbrales (True no aplica si hay varias particiones)
+
+        Yields:
+            Tabla en la que debe escribir la carga: la partición separada en
+            modo masivo, fact_market_metrics si no
+
+        Si el bloque falla no se reconstruye nada: el rollback del llamador
+        restaura la partición, sus índices y sus FKs.
+        """
+        partition = self.target_partition(staging, column) if force is not False else None
+        if partition is not None and force is None:
+            partition_rows = self.partition_rows(partition)
+            if not self.enabled_for(rows, partition_rows):
+                partition = None
+
+        if partition is None:
+            yield FACT_TABLE
+            return
+
+        self.logger.info(f"🚚 {partition}: modo de carga masiva para {rows} filas")
+        self.detach(partition)
+        yield partition
+        self.attach(partition)
@@ -0,0 +1,213 @@
+"""
+Particiones mensuales de fact_market_metrics
+La tabla de hechos está particionada por rango sobre snapshot_date_key
+(clave yyyymmdd), una partición por mes: [yyyymm01, mes siguiente).
+
+- Antes de cargar hechos se crean las particiones que cubren las fechas de
+  snapshot de la carga (ensure_range / ensure_for_column).
+- maintain() crea además las particiones de los próximos meses y, solo si
+  se pide explícitamente (--archive), separa (DETACH) las que quedaron
+  fuera de la retención, moviéndolas al esquema de archivo: siguen
+  consultables pero ya no entran en las consultas sobre
+  fact_market_metrics. Los ETL nunca archivan.
+
+Las consultas que filtran por snapshot_date_key leen solo las particiones
+del rango (partition pruning). El llamador decide cuándo hacer commit.
+
+Uso:
+    python fase2_warehouse/fact_partitions.py [development|production] [--archive [--retention-months=N]]
+"""
+import logging
+import os
+import re
+import sys
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from fase2_warehouse.etl_config import FACT_PARTITION_CONFIG
+
+FACT_TABLE = 'fact_market_metrics'
+
+BOUND_PATTERN = re.compile(r"FROM \('?(\d+)'?\) TO \('?(\d+)'?\)")
+
+
+def month_start(value) -> date:
+    """Primer día del mes de una fecha, datetime o clave yyyymmdd"""
+    if isinstance(value, int):
+        value = datetime.strptime(str(value), '%Y%m%d').date()
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Primer día del mes desplazado months meses"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_key(value: date) -> int:
+    """Clave yyyymmdd del primer día del mes"""
+    return value.year * 10000 + value.month * 100 + 1
+
+
+def partition_name(value: date) -> str:
+    """Nombre de la partición del mes (ej: fact_market_metrics_p202501)"""
+    return f"{FACT_TABLE}_p{value.year:04d}{value.month:02d}"
+
+
+class FactPartitionManager:
+    """Crea y archiva las particiones mensuales de fact_market_metrics"""
+
+    def __init__(self, conn, logger: logging.Logger = None, config: Optional[dict] = None):
+        """
+        Args:
+            conn: Conexión psycopg2 (no se hace commit aquí)
+            logger: Logger del ETL
+            config: Configuración (por defecto FACT_PARTITION_CONFIG)
+        """
+        self.conn = conn
+        self.logger = logger or logging.getLogger("FactPartitionManager")
+        self.config = config or FACT_PARTITION_CONFIG
+
+    def partitions(self) -> Dict[str, Tuple[int, int]]:
+        """Particiones adjuntas: nombre → (clave inicial, clave final exclusiva)"""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+        """, (FACT_TABLE,))
+        rows = cursor.fetchall()
+        cursor.close()
+
+        result = {}
+        for name, bound in rows:
+            match = BOUND_PATTERN.search(bound or '')
+            if match:
+                result[name] = (int(match.group(1)), int(match.group(2)))
+        return result
+
+    def ensure_range(self, start_date, end_date) -> List[str]:
+        """
+        Crea las particiones mensuales que faltan entre dos fechas (o claves
+        yyyymmdd), ambas inclusive
+
+        Returns:
+            Particiones creadas
+        """
+        existing = self.partitions()
+        covered = set(existing.values())
+        current = month_start(start_date)
+        last = month_start(end_date)
+
+        created = []
+        cursor = self.conn.cursor()
+        while current <= last:
+            bounds = (month_key(current), month_key(add_months(current, 1)))
+            name = partition_name(current)
+            if bounds not in covered and name not in existing:
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {name}
+                    PARTITION OF {FACT_TABLE}
+                    FOR VALUES FROM ({bounds[0]}) TO ({bounds[1]})
+                """)
+                created.append(name)
+            current = add_months(current, 1)
+        cursor.close()
+
+        if created:
+            self.logger.info(f"🗂️ {FACT_TABLE}: {len(created)} particiones creadas ({created[0]} - {created[-1]})")
+        return created
+
+    def ensure_for_column(self, table: str, column: str = 'snapshot_date_key') -> List[str]:
+        """
+        Crea las particiones que cubren el rango de una columna de fecha o
+        de clave yyyymmdd de otra tabla (p.ej. la staging de hechos)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM {table}")
+        minimum, maximum = cursor.fetchone()
+        cursor.close()
+        if minimum is None:
+            return []
+        return self.ensure_range(minimum, maximum)
+
+    def ensure_future(self, months_ahead: Optional[int] = None) -> List[str]:
+        """Crea las particiones del mes actual y de los próximos months_ahead meses"""
+        if months_ahead is None:
+            months_ahead = self.config['months_ahead']
+        today = month_start(date.today())
+        return self.ensure_range(today, add_months(today, months_ahead))
+
+    def archive_old(self, retention_months: Optional[int] = None) -> List[str]:
+        """
+        Separa las particiones cuyo mes terminó hace más de retention_months
+        meses y las mueve al esquema de archivo
+
+        Returns:
+            Particiones archivadas
+        """
+        if retention_months is None:
+            retention_months = self.config['retention_months']
+        if retention_months is None:
+            return []
+
+        cutoff = month_key(add_months(month_start(date.today()), -retention_months))
+        expired = sorted(name for name, (_, upper) in self.partitions().items() if upper <= cutoff)
+        if not expired:
+            return []
+
+        schema = self.config['archive_schema']
+        cursor = self.conn.cursor()
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        for name in expired:
+            cursor.execute(f"ALTER TABLE {FACT_TABLE} DETACH PARTITION {name}")
+            cursor.execute(f"ALTER TABLE {name} SET SCHEMA {schema}")
+        cursor.close()
+
+        self.logger.info(f"📦 {FACT_TABLE}: {len(expired)} particiones archivadas en {schema}")
+        return expired
+
+    def maintain(self, archive: bool = False, retention_months: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Crea las particiones futuras y, con archive, archiva las que
+        salieron de la retención (retention_months o la de la configuración)
+        """
+        return {
+            'created': self.ensure_future(),
+            'archived': self.archive_old(retention_months) if archive else []
+        }
+
+
+def main():
+    import psycopg2
+    from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    environment = args[0] if args else DEFAULT_ENVIRONMENT
+    archive = '--archive' in sys.argv
+    retention = [arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--retention-months=')]
+    retention_months = int(retention[0]) if retention else None
+
+    if archive and retention_months is None and FACT_PARTITION_CONFIG['retention_months'] is None:
+        print("ERROR: --archive requiere --retention-months=N o retention_months en FACT_PARTITION_CONFIG")
+        return False
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    conn = psycopg2.connect(get_connection_string(environment))
+    try:
+        result = FactPartitionManager(conn).maintain(archive=archive, retention_months=retention_months)
+        conn.commit()
+        print(f"OK: {len(result['created'])} particiones creadas, {len(result['archived'])} archivadas")
+        return True
+    except Exception as e:
+        print(f"ERROR: {e}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,141 @@
+"""
+Carga de hechos por snapshot diario
+Cada ejecución agrega (o reescribe, si se repite el mismo día) el snapshot
+de su snapshot_date_key; los snapshots anteriores no se tocan, así que
+fact_market_metrics conserva la serie temporal de cada mercado.
+
+La idempotencia la da UNIQUE(market_key, snapshot_date_key): repetir la
+carga del mismo día actualiza las métricas en lugar de duplicar filas.
+
+Antes de escribir se crean las particiones mensuales que faltan para las
+fechas de snapshot de la carga.
+
+Si la carga escribe muchas filas en una sola partición (recargas
+completas) se activa el modo de carga masiva de fact_indexes.py: los
+índices no únicos y las FKs de esa partición se reconstruyen una sola vez
+al final en lugar de mantenerse fila a fila.
+
+Opcionalmente se omiten los mercados cuyas métricas no cambiaron respecto
+a su último snapshot guardado; en ese caso, para una fecha sin fila, el
+valor vigente es el del último snapshot anterior del mercado.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from fase2_warehouse.bulk_loader import BulkLoader
+from fase2_warehouse.etl_config import FACT_METRIC_COLUMNS
+from fase2_warehouse.fact_indexes import DeferredFactIndexes
+from fase2_warehouse.fact_partitions import FACT_TABLE, FactPartitionManager
+
+FACT_KEY_COLUMNS = ['market_key', 'snapshot_date_key']
+
+# Métricas que se comparan para detectar mercados sin cambios
+FACT_CHANGE_COLUMNS = [col for col in FACT_METRIC_COLUMNS if col != 'extraction_timestamp']
+
+
+class SnapshotFactLoader:
+    """Agrega snapshots a fact_market_metrics sin reescribir la historia"""
+
+    def __init__(self, conn, bulk: BulkLoader = None, skip_unchanged: bool = False,
+                 logger: logging.Logger = None, bulk_mode: Optional[bool] = None):
+        """
+        Args:
+            conn: Conexión psycopg2 (no se hace commit aquí)
+            bulk: BulkLoader sobre la misma conexión
+            skip_unchanged: Omitir mercados con las mismas métricas que su
+                            último snapshot
+            logger: Logger del ETL
+            bulk_mode: Forzar (True) o desactivar (False) el modo de carga
+                       masiva; None lo decide por el número de filas
+        """
+        self.conn = conn
+        self.bulk = bulk or BulkLoader(conn)
+        self.skip_unchanged = skip_unchanged
+        self.logger = logger or logging.getLogger("SnapshotFactLoader")
+        self.bulk_mode = bulk_mode
+        self.partitions = FactPartitionManager(conn, self.logger)
+        self.indexes = DeferredFactIndexes(conn, self.logger)
+
+    def discard_unchanged(self, staging: str, columns: List[str]) -> int:
+        """
+        Elimina de la staging las filas iguales al último snapshot guardado
+        del mercado (hasta su snapshot_date_key inclusive)
+
+        Returns:
+            Filas omitidas
+        """
+        compared = [col for col in FACT_CHANGE_COLUMNS if col in columns]
+        target = ', '.join(f"f.{col}" for col in compared)
+        source = ', '.join(f"s.{col}" for col in compared)
+
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            DELETE FROM {staging} s
+            USING {FACT_TABLE} f
+            WHERE f.market_key = s.market_key
+              AND f.snapshot_date_key = (
+                  SELECT MAX(p.snapshot_date_key)
+                  FROM {FACT_TABLE} p
+                  WHERE p.market_key = s.market_key
+                    AND p.snapshot_date_key <= s.snapshot_date_key
+              )
+              AND ({target}) IS NOT DISTINCT FROM ({source})
+        """)
+        count = cursor.rowcount
+        cursor.close()
+        return count
+
+    def staged_rows(self, staging: str) -> int:
+        """Filas pendientes de escribir en la staging"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {staging}")
+        count = cursor.fetchone()[0]
+        cursor.close()
+        return count
+
+    def apply(self, staging: str, columns: List[str],
+              update_columns: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Escribe en fact_market_metrics las filas de una tabla de staging
+        con las columnas de la tabla de hechos (+ _ord)
+
+        Args:
+            staging: Tabla de staging
+            columns: Columnas a escribir (incluye FACT_KEY_COLUMNS)
+            update_columns: Columnas que se reescriben si el snapshot ya existe
+                            (None = todas salvo las claves)
+
+        Returns:
+            Filas omitidas sin cambios y escritas
+        """
+        self.partitions.ensure_for_column(staging, 'snapshot_date_key')
+        skipped = self.discard_unchanged(staging, columns) if self.skip_unchanged else 0
+
+        if update_columns is None:
+            update_columns = [col for col in columns if col not in FACT_KEY_COLUMNS]
+        rows = self.staged_rows(staging)
+        with self.indexes.deferred(staging, 'snapshot_date_key', rows, force=self.bulk_mode) as target:
+            written = self.bulk.insert_from_staging(target, staging, columns, FACT_KEY_COLUMNS, update_columns)
+
+        self.logger.info(f"   {FACT_TABLE}: {written} filas escritas, {skipped} sin cambios omitidas")
+        return {'skipped': skipped, 'written': written}
+
+    def load(self, columns: List[str], records: Iterable[Sequence],
+             update_columns: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Carga registros de hechos de un snapshot
+
+        Args:
+            columns: Columnas en el orden de cada tupla (incluye FACT_KEY_COLUMNS)
+            records: Iterable de tuplas
+            update_columns: Columnas que se reescriben si el snapshot ya existe
+                            (None = todas salvo las claves)
+
+        Returns:
+            Filas recibidas, omitidas sin cambios y escritas
+        """
+        staging = self.bulk.create_staging(FACT_TABLE, columns)
+        received = self.bulk.copy_rows(staging, columns, records)
+        result = self.apply(staging, columns, update_columns)
+        self.bulk.drop_staging(staging)
+        return {'received': received, **result}
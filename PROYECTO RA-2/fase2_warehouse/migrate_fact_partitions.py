@@ -0,0 +1,111 @@
+"""
+Migrar fact_market_metrics a tabla particionada por mes
+Renombra la tabla actual a fact_market_metrics_legacy, crea la tabla
+particionada con la definición de schema_ddl.sql, crea las particiones que
+cubren los snapshots existentes (y los próximos meses) y copia las filas
+conservando fact_key, en una sola transacción. Es idempotente: si la tabla
+ya está particionada no modifica nada.
+
+Uso:
+    python fase2_warehouse/migrate_fact_partitions.py [development|production] [--keep-legacy]
+"""
+import psycopg2
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+from fase2_warehouse.fact_partitions import FACT_TABLE, FactPartitionManager
+
+LEGACY_TABLE = f"{FACT_TABLE}_legacy"
+
+
+def fact_ddl():
+    """CREATE TABLE e índices de la tabla de hechos tomados de schema_ddl.sql"""
+    sql_file = os.path.join(os.path.dirname(__file__), 'schema_ddl.sql')
+    with open(sql_file, 'r', encoding='utf-8') as f:
+        script = f.read()
+    start = script.index(f"CREATE TABLE {FACT_TABLE}")
+    end = script.index("-- COMENTARIOS PARA DOCUMENTACIÓN")
+    return script[start:end]
+
+
+def migrate_fact_partitions(environment=DEFAULT_ENVIRONMENT, keep_legacy=False):
+    print(f"Particionando {FACT_TABLE} en {environment}...\n")
+
+    conn = psycopg2.connect(get_connection_string(environment))
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", (FACT_TABLE,))
+        if cursor.fetchone()[0] == 'p':
+            print(f"OK: {FACT_TABLE} ya está particionada, nada que migrar")
+            return True
+
+        print(f"[1/4] Renombrando tabla actual a {LEGACY_TABLE}...")
+        cursor.execute(f"ALTER TABLE {FACT_TABLE} RENAME TO {LEGACY_TABLE}")
+        # Los nombres de índices (y de PK/UNIQUE) son únicos por esquema
+        cursor.execute("""
+            SELECT c.relname
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass
+        """, (LEGACY_TABLE,))
+        for (index,) in cursor.fetchall():
+            cursor.execute(f"ALTER INDEX {index} RENAME TO {index}_legacy")
+
+        print("[2/4] Creando tabla particionada...")
+        cursor.execute(fact_ddl())
+
+        cursor.execute(f"SELECT MIN(snapshot_date_key), MAX(snapshot_date_key), COUNT(*) FROM {LEGACY_TABLE}")
+        min_key, max_key, legacy_count = cursor.fetchone()
+
+        print("[3/4] Creando particiones...")
+        partitions = FactPartitionManager(conn)
+        created = partitions.ensure_range(min_key, max_key) if min_key is not None else []
+        created += partitions.ensure_future()
+        print(f"  OK: {len(created)} particiones mensuales")
+
+        print(f"[4/4] Copiando {legacy_count:,} filas...")
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = %s
+            ORDER BY ordinal_position
+        """, (FACT_TABLE,))
+        columns = ', '.join(row[0] for row in cursor.fetchall())
+        cursor.execute(f"INSERT INTO {FACT_TABLE} ({columns}) SELECT {columns} FROM {LEGACY_TABLE}")
+        copied = cursor.rowcount
+        cursor.execute(f"""
+            SELECT setval(pg_get_serial_sequence('{FACT_TABLE}', 'fact_key'),
+                          COALESCE((SELECT MAX(fact_key) FROM {FACT_TABLE}), 0) + 1, false)
+        """)
+
+        if copied != legacy_count:
+            raise RuntimeError(f"se copiaron {copied:,} de {legacy_count:,} filas")
+
+        if not keep_legacy:
+            cursor.execute(f"DROP TABLE {LEGACY_TABLE}")
+
+        conn.commit()
+
+        # Verificar
+        cursor.execute(f"SELECT tableoid::regclass, COUNT(*) FROM {FACT_TABLE} GROUP BY 1 ORDER BY 1")
+        for partition, count in cursor.fetchall():
+            print(f"  {partition}: {count:,} filas")
+
+        print(f"\nOK: {FACT_TABLE} particionada ({copied:,} filas)")
+        return True
+
+    except Exception as e:
+        print(f"ERROR: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    environment = args[0] if args else DEFAULT_ENVIRONMENT
+    success = migrate_fact_partitions(environment, keep_legacy='--keep-legacy' in sys.argv)
+    sys.exit(0 if success else 1)
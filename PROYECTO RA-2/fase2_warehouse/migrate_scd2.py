@@ -0,0 +1,78 @@
+"""
+Migrar las dimensiones a SCD Tipo 2
+Para cada dimensión de DIMENSION_TABLES: agrega la columna row_hash y la
+calcula para las versiones vigentes, reemplaza la restricción UNIQUE del id
+natural (impide guardar versiones) por un índice único parcial sobre las
+filas vigentes. Es idempotente.
+
+Uso:
+    python fase2_warehouse/migrate_scd2.py [development|production]
+"""
+import psycopg2
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+from fase2_warehouse.etl_config import DIMENSION_TABLES
+from fase2_warehouse.scd2 import row_hash_sql
+
+
+def natural_key_constraints(cursor, dim_table, key):
+    """Restricciones UNIQUE de una sola columna sobre el id natural"""
+    cursor.execute("""
+        SELECT c.conname
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+        WHERE c.conrelid = %s::regclass AND c.contype = 'u'
+          AND array_length(c.conkey, 1) = 1 AND a.attname = %s
+    """, (dim_table, key))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def migrate_scd2(environment=DEFAULT_ENVIRONMENT):
+    print(f"Migrando dimensiones a SCD Tipo 2 en {environment}...\n")
+
+    conn = psycopg2.connect(get_connection_string(environment))
+    cursor = conn.cursor()
+
+    try:
+        for i, (dim_table, spec) in enumerate(DIMENSION_TABLES.items(), 1):
+            key = spec['natural_key']
+            print(f"[{i}/{len(DIMENSION_TABLES)}] {dim_table}...")
+
+            cursor.execute(f"ALTER TABLE {dim_table} ADD COLUMN IF NOT EXISTS row_hash CHAR(32)")
+
+            for constraint in natural_key_constraints(cursor, dim_table, key):
+                cursor.execute(f"ALTER TABLE {dim_table} DROP CONSTRAINT {constraint}")
+                print(f"  OK: eliminada restriccion {constraint}")
+
+            cursor.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_{dim_table}_current
+                ON {dim_table} ({key}) WHERE is_current
+            """)
+
+            cursor.execute(f"""
+                UPDATE {dim_table}
+                SET row_hash = {row_hash_sql(spec['tracked_columns'])}
+                WHERE is_current AND row_hash IS NULL
+            """)
+            print(f"  OK: row_hash calculado para {cursor.rowcount:,} filas vigentes")
+
+        conn.commit()
+
+        print("\nOK: Dimensiones migradas a SCD Tipo 2")
+        return True
+
+    except Exception as e:
+        print(f"ERROR: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    environment = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ENVIRONMENT
+    success = migrate_scd2(environment)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,128 @@
+"""
+Migrar dim_time a claves inteligentes yyyymmdd
+Los time_key SERIAL existentes se reemplazan por year*10000 + month*100 + day
+y se actualizan las claves de fecha de las tablas que referencian dim_time
+(fact_market_metrics), en una sola transacción. Es idempotente: si las
+claves ya están migradas no modifica nada.
+
+Debe ejecutarse antes de migrate_fact_partitions.py: las particiones de
+fact_market_metrics se definen sobre claves yyyymmdd.
+
+Uso:
+    python fase2_warehouse/migrate_time_keys.py [development|production]
+"""
+import psycopg2
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+
+SMART_KEY_SQL = "(EXTRACT(YEAR FROM date_value) * 10000 + EXTRACT(MONTH FROM date_value) * 100 + EXTRACT(DAY FROM date_value))::INTEGER"
+
+
+def dim_time_references(cursor):
+    """
+    Claves foráneas que apuntan a dim_time: (tabla, constraint, columna, definición)
+
+    Solo las declaradas en cada tabla: las que las particiones heredan de la
+    tabla padre (conparentid) se eliminan y recrean con ella.
+    """
+    cursor.execute("""
+        SELECT c.conrelid::regclass::text, c.conname, a.attname, pg_get_constraintdef(c.oid)
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+        WHERE c.contype = 'f' AND c.confrelid = 'dim_time'::regclass
+          AND c.conparentid = 0
+        ORDER BY 1, 3
+    """)
+    return cursor.fetchall()
+
+
+def migrate_time_keys(environment=DEFAULT_ENVIRONMENT):
+    print(f"Migrando time_key de dim_time en {environment}...\n")
+
+    conn = psycopg2.connect(get_connection_string(environment))
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(f"SELECT COUNT(*) FROM dim_time WHERE time_key <> {SMART_KEY_SQL}")
+        pending = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT column_default FROM information_schema.columns
+            WHERE table_name = 'dim_time' AND column_name = 'time_key'
+        """)
+        serial_default = cursor.fetchone()[0]
+        if pending == 0 and serial_default is None:
+            print("OK: dim_time ya usa claves yyyymmdd, nada que migrar")
+            return True
+        print(f"  {pending:,} fechas con clave secuencial")
+
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'fact_market_metrics'::regclass")
+        if cursor.fetchone()[0] == 'p':
+            print("ERROR: fact_market_metrics ya está particionada por claves yyyymmdd; "
+                  "migrate_time_keys.py debe ejecutarse antes de migrate_fact_partitions.py")
+            return False
+
+        # Claves anteriores → nuevas (los rangos no se solapan: SERIAL < 19000101)
+        cursor.execute(f"""
+            CREATE TEMP TABLE time_key_map AS
+            SELECT time_key AS old_key, {SMART_KEY_SQL} AS new_key FROM dim_time
+        """)
+        cursor.execute("CREATE UNIQUE INDEX ON time_key_map (old_key)")
+
+        references = dim_time_references(cursor)
+
+        print(f"[1/4] Eliminando {len(references)} claves foráneas hacia dim_time...")
+        for table, constraint, _, _ in references:
+            cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}")
+
+        print("[2/4] Actualizando claves de fecha en las tablas de hechos...")
+        columns_by_table = {}
+        for table, _, column, _ in references:
+            columns_by_table.setdefault(table, []).append(column)
+        for table, columns in columns_by_table.items():
+            # Una sola pasada por tabla para todas sus columnas de fecha
+            assignments = ', '.join(
+                f"{col} = (SELECT new_key FROM time_key_map WHERE old_key = {table}.{col})"
+                for col in columns
+            )
+            cursor.execute(f"UPDATE {table} SET {assignments}")
+            print(f"  OK: {table} ({', '.join(columns)}): {cursor.rowcount:,} filas")
+
+        print("[3/4] Reemplazando time_key en dim_time...")
+        cursor.execute(f"UPDATE dim_time SET time_key = {SMART_KEY_SQL}")
+        cursor.execute("ALTER TABLE dim_time ALTER COLUMN time_key DROP DEFAULT")
+        cursor.execute("DROP SEQUENCE IF EXISTS dim_time_time_key_seq")
+        cursor.execute("ALTER TABLE dim_time DROP CONSTRAINT IF EXISTS chk_dim_time_key")
+        cursor.execute("""
+            ALTER TABLE dim_time ADD CONSTRAINT chk_dim_time_key
+            CHECK (time_key = year * 10000 + month * 100 + day_of_month)
+        """)
+
+        print("[4/4] Restaurando claves foráneas...")
+        for table, constraint, _, definition in references:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} {definition}")
+
+        conn.commit()
+
+        # Verificar
+        cursor.execute("SELECT MIN(time_key), MAX(time_key), COUNT(*) FROM dim_time")
+        result = cursor.fetchone()
+        print(f"\nVerificacion: dim_time {result[2]:,} fechas, claves {result[0]} - {result[1]}")
+
+        print("\nOK: Claves de tiempo migradas correctamente")
+        return True
+
+    except Exception as e:
+        print(f"ERROR: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    environment = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ENVIRONMENT
+    success = migrate_time_keys(environment)
+    sys.exit(0 if success else 1)
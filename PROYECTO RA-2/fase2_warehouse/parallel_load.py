@@ -0,0 +1,207 @@
+"""
+Carga paralela del warehouse con varias conexiones
+Las tablas se cargan según el grafo de dependencias LOAD_DEPENDENCIES: cada
+tarea se ejecuta en un hilo con su propia conexión en cuanto terminan sus
+dependencias, así que las dimensiones independientes se cargan a la vez y
+NeonDB no espera mientras Python transforma filas (psycopg2 libera el GIL
+durante la E/S de red).
+
+La tabla de hechos se divide en rangos de market_key que varios workers
+copian en paralelo (COPY) a una staging UNLOGGED compartida (con el pid del
+backend en el nombre, así dos cargas simultáneas no chocan); después un
+único INSERT ... SELECT publica el snapshot completo en una sola
+transacción, así que las consultas nunca ven un snapshot a medias.
+
+Cada tarea hace commit al terminar: si una falla, las que ya terminaron
+quedan aplicadas (p.ej. dimensiones cargadas sin su tabla de hechos), las
+pendientes no se lanzan y el error informa qué tareas quedaron
+confirmadas. Las dimensiones son SCD2 e idempotentes, así que basta con
+repetir la carga.
+"""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+import psycopg2
+
+from fase2_warehouse.bulk_loader import BulkLoader
+from fase2_warehouse.etl_config import LOAD_DEPENDENCIES, PARALLEL_LOAD_CONFIG, STAGING_CONFIG
+from fase2_warehouse.fact_snapshot import FACT_TABLE, SnapshotFactLoader
+from fase2_warehouse.neondb_config import get_connection_string
+from fase2_warehouse.transform import to_records
+
+Task = Callable[[Any], Any]
+
+
+@contextmanager
+def worker_connection(environment: str):
+    """Conexión propia de un worker: commit si la tarea termina, rollback si falla"""
+    conn = psycopg2.connect(get_connection_string(environment))
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def key_ranges(frame: pd.DataFrame, key: str, chunks: int) -> List[pd.DataFrame]:
+    """Divide un DataFrame en hasta chunks rangos contiguos de una clave"""
+    ordered = frame.sort_values(key)
+    count = max(1, min(chunks, len(ordered)))
+    size, extra = divmod(len(ordered), count)
+    bounds = [i * size + min(i, extra) for i in range(count + 1)]
+    return [ordered.iloc[start:end] for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+class DependencyScheduler:
+    """Ejecuta tareas por conexión respetando el grafo de dependencias"""
+
+    def __init__(self, environment: str, workers: Optional[int] = None,
+                 dependencies: Optional[Dict[str, List[str]]] = None, logger: logging.Logger = None):
+        """
+        Args:
+            environment: 'development' o 'production'
+            workers: Tareas simultáneas (por defecto PARALLEL_LOAD_CONFIG)
+            dependencies: Tabla → tablas que deben cargarse antes
+            logger: Logger del ETL
+        """
+        self.environment = environment
+        self.workers = workers or PARALLEL_LOAD_CONFIG['workers']
+        self.dependencies = dependencies or LOAD_DEPENDENCIES
+        self.logger = logger or logging.getLogger("DependencyScheduler")
+
+    def _run_task(self, name: str, task: Task):
+        start = time.perf_counter()
+        self.logger.info(f"⚙️  {name}: iniciando")
+        with worker_connection(self.environment) as conn:
+            result = task(conn)
+        self.logger.info(f"✅ {name}: terminado en {time.perf_counter() - start:.1f}s")
+        return result
+
+    def run(self, tasks: Dict[str, Task]) -> Dict[str, Any]:
+        """
+        Ejecuta las tareas (nombre → función que recibe una conexión); cada
+        una se lanza cuando sus dependencias presentes en tasks terminaron
+
+        Returns:
+            Resultado de cada tarea
+
+        Raises:
+            La excepción de la primera tarea que falle: las que ya estaban
+            en curso terminan, las pendientes no se lanzan y se registra qué
+            tareas quedaron confirmadas
+        """
+        pending = dict(tasks)
+        results: Dict[str, Any] = {}
+        running = {}
+        failed: Dict[str, Exception] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while running or (pending and not failed):
+                if not failed:
+                    ready = [
+                        name for name in pending
+                        if all(dep in results or dep not in tasks for dep in self.dependencies.get(name, []))
+                    ]
+                    for name in ready:
+                        running[executor.submit(self._run_task, name, pending.pop(name))] = name
+
+                    if not running:
+                        raise ValueError(f"Dependencias cíclicas entre: {', '.join(sorted(pending))}")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        failed[name] = e
+
+        if failed:
+            self.logger.error(
+                f"❌ Carga paralela interrumpida. Fallaron: {', '.join(sorted(failed))} | "
+                f"confirmadas: {', '.join(sorted(results)) or 'ninguna'} | "
+                f"sin ejecutar: {', '.join(sorted(pending)) or 'ninguna'}"
+            )
+            raise next(iter(failed.values()))
+
+        return results
+
+
+class ParallelFactWriter:
+    """Escribe un snapshot de hechos con varios workers COPY y un commit final"""
+
+    def __init__(self, environment: str, chunks: Optional[int] = None,
+                 skip_unchanged: bool = False, logger: logging.Logger = None):
+        """
+        Args:
+            environment: 'development' o 'production'
+            chunks: Rangos de market_key (uno por worker)
+            skip_unchanged: Omitir mercados sin cambios (SnapshotFactLoader)
+            logger: Logger del ETL
+        """
+        self.environment = environment
+        self.chunks = chunks or PARALLEL_LOAD_CONFIG['fact_chunks']
+        self.skip_unchanged = skip_unchanged
+        self.logger = logger or logging.getLogger("ParallelFactWriter")
+
+    def _create_staging(self, conn, staging: str, columns: List[str]):
+        unlogged = "UNLOGGED " if STAGING_CONFIG['unlogged'] else ""
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.execute(f"""
+            CREATE {unlogged}TABLE {staging} AS
+            SELECT {', '.join(columns)} FROM {FACT_TABLE} WITH NO DATA
+        """)
+        cursor.execute(f"ALTER TABLE {staging} ADD COLUMN _ord BIGSERIAL")
+        cursor.close()
+        # Visible para las conexiones de los workers
+        conn.commit()
+
+    def _copy_chunk(self, staging: str, columns: List[str], chunk: pd.DataFrame) -> int:
+        with worker_connection(self.environment) as conn:
+            return BulkLoader(conn).copy_rows(staging, columns, to_records(chunk))
+
+    def load(self, conn, facts: pd.DataFrame, update_columns: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Carga un DataFrame de hechos (columnas de fact_market_metrics, con
+        market_key y snapshot_date_key) y hace commit en conn al final
+
+        Returns:
+            Filas recibidas, omitidas sin cambios y escritas
+        """
+        columns = list(facts.columns)
+        staging = f"{STAGING_CONFIG['prefix']}{FACT_TABLE}_chunks_{conn.get_backend_pid()}"
+        self._create_staging(conn, staging, columns)
+
+        try:
+            ranges = key_ranges(facts, 'market_key', self.chunks)
+            with ThreadPoolExecutor(max_workers=max(1, len(ranges))) as executor:
+                futures = [executor.submit(self._copy_chunk, staging, columns, chunk) for chunk in ranges]
+                received = 0
+                for chunk, future in zip(ranges, futures):
+                    rows = future.result()
+                    received += rows
+                    self.logger.info(
+                        f"   market_key {chunk['market_key'].iloc[0]}-{chunk['market_key'].iloc[-1]}: "
+                        f"{rows} filas copiadas"
+                    )
+
+            # Publicación del snapshot completo en una sola transacción
+            snapshots = SnapshotFactLoader(conn, BulkLoader(conn), self.skip_unchanged, self.logger)
+            result = snapshots.apply(staging, columns, update_columns)
+            BulkLoader(conn).drop_staging(staging)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            BulkLoader(conn).drop_staging(staging)
+            conn.commit()
+            raise
+
+        return {'received': received, **result}
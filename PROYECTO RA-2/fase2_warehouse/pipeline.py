@@ -0,0 +1,198 @@
+"""
+ETL en pipeline: lectura → transformación → escritura
+Cada etapa corre en su propio hilo y se comunica con la siguiente por una
+cola acotada: mientras la escritura espera a la base de datos (psycopg2
+libera el GIL), la transformación ya prepara el lote siguiente y la lectura
+el otro. Si una etapa se atrasa, las colas se llenan y las anteriores se
+bloquean (backpressure), así que nunca hay más de queue_size lotes en
+memoria por etapa.
+
+Cada etapa mide su utilización: tiempo ocupado, tiempo esperando entrada
+(la etapa anterior es el cuello de botella) y tiempo bloqueada por la cola
+de salida (la etapa siguiente es el cuello de botella).
+
+Ejemplo:
+    pipeline = Pipeline(
+        source=manager.iter_batches('markets'),
+        stages=[('transform', build_records), ('write', write_batch)]
+    )
+    results = pipeline.run()
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fase2_warehouse.etl_config import PIPELINE_CONFIG
+
+# Fin de datos en una cola
+_END = object()
+
+# Intervalo para revisar si otra etapa falló mientras se espera una cola
+_POLL_SECONDS = 0.1
+
+
+class _Aborted(Exception):
+    """Otra etapa falló; la etapa actual termina sin procesar más"""
+
+
+class StageStats:
+    """Tiempos y lotes procesados por una etapa"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.wait_input = 0.0
+        self.wait_output = 0.0
+
+    def utilisation(self, elapsed: float) -> float:
+        """Fracción del tiempo total que la etapa estuvo ocupada"""
+        return self.busy / elapsed if elapsed > 0 else 0.0
+
+    def summary(self, elapsed: float) -> str:
+        return (
+            f"{self.name}: {self.items} lotes | ocupada {self.busy:.1f}s "
+            f"({self.utilisation(elapsed):.0%}) | esperando entrada {self.wait_input:.1f}s | "
+            f"bloqueada por salida {self.wait_output:.1f}s"
+        )
+
+
+class Pipeline:
+    """Ejecuta una fuente y etapas encadenadas con colas acotadas"""
+
+    def __init__(self, source: Iterable, stages: List[Tuple[str, Callable[[Any], Any]]],
+                 queue_size: Optional[int] = None, source_name: str = 'read',
+                 logger: logging.Logger = None):
+        """
+        Args:
+            source: Iterable de lotes (se consume en su propio hilo)
+            stages: (nombre, función) en orden; cada función recibe la
+                    salida de la anterior y la última produce el resultado
+            queue_size: Lotes máximos en cada cola (por defecto PIPELINE_CONFIG)
+            source_name: Nombre de la etapa de lectura en las estadísticas
+            logger: Logger del ETL
+        """
+        self.source = source
+        self.stages = stages
+        self.queue_size = queue_size or PIPELINE_CONFIG['queue_size']
+        self.logger = logger or logging.getLogger("Pipeline")
+
+        self.stats: Dict[str, StageStats] = {
+            name: StageStats(name) for name in [source_name] + [name for name, _ in stages]
+        }
+        self.elapsed = 0.0
+        self._failed = threading.Event()
+        self._errors: List[Exception] = []
+
+    def _put(self, target: queue.Queue, item, stats: StageStats):
+        start = time.perf_counter()
+        while True:
+            if self._failed.is_set():
+                raise _Aborted()
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        stats.wait_output += time.perf_counter() - start
+
+    def _get(self, source: queue.Queue, stats: StageStats):
+        start = time.perf_counter()
+        while True:
+            if self._failed.is_set():
+                raise _Aborted()
+            try:
+                item = source.get(timeout=_POLL_SECONDS)
+                break
+            except queue.Empty:
+                continue
+        stats.wait_input += time.perf_counter() - start
+        return item
+
+    def _fail(self, error: Exception):
+        self._errors.append(error)
+        self._failed.set()
+
+    def _read(self, output: queue.Queue, stats: StageStats):
+        try:
+            batches = iter(self.source)
+            while True:
+                start = time.perf_counter()
+                item = next(batches, _END)
+                stats.busy += time.perf_counter() - start
+                if item is _END:
+                    break
+                stats.items += 1
+                self._put(output, item, stats)
+            self._put(output, _END, stats)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self._fail(e)
+
+    def _process(self, function: Callable, source: queue.Queue, output: Optional[queue.Queue],
+                 stats: StageStats, results: List):
+        try:
+            while True:
+                item = self._get(source, stats)
+                if item is _END:
+                    break
+                start = time.perf_counter()
+                result = function(item)
+                stats.busy += time.perf_counter() - start
+                stats.items += 1
+                if output is not None:
+                    self._put(output, result, stats)
+                else:
+                    results.append(result)
+            if output is not None:
+                self._put(output, _END, stats)
+        except _Aborted:
+            pass
+        except Exception as e:
+            self._fail(e)
+
+    def run(self) -> List:
+        """
+        Ejecuta el pipeline hasta agotar la fuente
+
+        Returns:
+            Resultados de la última etapa, en orden
+
+        Raises:
+            La primera excepción de cualquier etapa (las demás se detienen)
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        names = list(self.stats)
+        results: List = []
+
+        threads = [threading.Thread(
+            target=self._read, args=(queues[0], self.stats[names[0]]),
+            name=f"pipeline-{names[0]}", daemon=True
+        )]
+        for i, (name, function) in enumerate(self.stages):
+            output = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(threading.Thread(
+                target=self._process, args=(function, queues[i], output, self.stats[name], results),
+                name=f"pipeline-{name}", daemon=True
+            ))
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+
+        for line in self.summary():
+            self.logger.info(f"📈 {line}")
+
+        if self._errors:
+            raise self._errors[0]
+        return results
+
+    def summary(self) -> List[str]:
+        """Una línea de utilización por etapa"""
+        return [stats.summary(self.elapsed) for stats in self.stats.values()]
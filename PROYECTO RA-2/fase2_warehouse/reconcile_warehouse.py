@@ -0,0 +1,309 @@
+"""
+Reconciliación Delta Lake ↔ NeonDB mediante digests de hash por bucket
+En lugar de contar filas, cada registro se resume en un hash de contenido
+(md5 de sus columnas comparables) y los hashes se suman por bucket de id
+(prefijo del md5 del id). La suma no depende del orden, así que el lake
+(Arrow) y Postgres (SQL) calculan el mismo digest por separado.
+
+Solo se desciende a los buckets cuyo digest difiere, alargando el prefijo
+(16 → 256 → 4096 buckets...), hasta que quedan pocas filas y se comparan
+id por id.
+
+Uso:
+    python fase2_warehouse/reconcile_warehouse.py [development|production] [markets events ...]
+"""
+import hashlib
+import sys
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import psycopg2
+
+# Agregar path para imports
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from delta_utils import DeltaLakeManager
+from config import SILVER_DIR
+from fase2_warehouse.neondb_config import get_connection_string, DEFAULT_ENVIRONMENT
+
+# Entidad del lake → dimensión del warehouse y columnas comparables
+# (columna del lake → columna del warehouse). Solo se comparan columnas con
+# la misma representación textual en ambos lados (texto, ids y booleanos).
+RECONCILE_SPECS = {
+    'series': {
+        'dim_table': 'dim_series',
+        'dim_id': 'series_id',
+        'columns': {'slug': 'slug', 'title': 'title'}
+    },
+    'tags': {
+        'dim_table': 'dim_tag',
+        'dim_id': 'tag_id',
+        'columns': {'label': 'label', 'slug': 'slug'}
+    },
+    'events': {
+        'dim_table': 'dim_event',
+        'dim_id': 'event_id',
+        'columns': {'ticker': 'ticker', 'slug': 'slug', 'title': 'title'}
+    },
+    'markets': {
+        'dim_table': 'dim_market',
+        'dim_id': 'market_id',
+        'columns': {
+            'conditionId': 'condition_id', 'slug': 'slug', 'question': 'question',
+            'active': 'active', 'closed': 'closed'
+        }
+    }
+}
+
+# Dígitos hexadecimales del md5 que se usan como hash de fila (60 bits:
+# cabe en BIGINT de Postgres)
+ROW_HASH_HEX_DIGITS = 15
+
+
+def row_hash(text: str) -> int:
+    """Hash de fila: primeros 60 bits del md5 del texto canónico"""
+    return int(hashlib.md5(text.encode('utf-8')).hexdigest()[:ROW_HASH_HEX_DIGITS], 16)
+
+
+class WarehouseReconciler:
+    """
+    Reconciliador Delta Lake ↔ Data Warehouse
+    """
+
+    def __init__(self, environment=DEFAULT_ENVIRONMENT, max_depth=4, row_threshold=500):
+        """
+        Args:
+            environment: Ambiente de NeonDB
+            max_depth: Longitud máxima del prefijo de bucket
+            row_threshold: Filas en buckets distintos a partir de las cuales
+                           se compara id por id en lugar de descender
+        """
+        self.environment = environment
+        self.max_depth = max_depth
+        self.row_threshold = row_threshold
+        self.conn = None
+        self.bronze = DeltaLakeManager()
+        self.silver = DeltaLakeManager(SILVER_DIR)
+
+    def connect(self):
+        """Conectar a NeonDB"""
+        try:
+            self.conn = psycopg2.connect(get_connection_string(self.environment))
+            return True
+        except Exception as e:
+            print(f"❌ Error al conectar: {str(e)}")
+            return False
+
+    def disconnect(self):
+        """Desconectar"""
+        if self.conn:
+            self.conn.close()
+
+    def lake_hashes(self, entity: str) -> pd.DataFrame:
+        """
+        Calcula id, md5 del id y hash de fila de cada registro del lake
+
+        Lee por lotes solo las columnas comparables (Silver si existe).
+
+        Returns:
+            DataFrame con columnas id, id_md5 y row_hash
+        """
+        spec = RECONCILE_SPECS[entity]
+        manager = self.silver if self.silver.table_exists(entity) else self.bronze
+
+        frames = []
+        for batch in manager.iter_batches(entity, columns=['id'] + list(spec['columns'])):
+            ids = pc.cast(batch.column('id'), pa.string())
+            values = [ids] + [pc.cast(batch.column(col), pa.string()) for col in spec['columns']]
+
+            # Igual que concat_ws('|', coalesce(col::text, ''), ...) en Postgres
+            texts = pc.binary_join_element_wise(*values, '|', null_handling='replace', null_replacement='')
+
+            id_list = ids.to_pylist()
+            frames.append(pd.DataFrame({
+                'id': id_list,
+                'id_md5': [hashlib.md5(i.encode('utf-8')).hexdigest() for i in id_list],
+                'row_hash': [row_hash(t) for t in texts.to_pylist()]
+            }))
+
+        if not frames:
+            return pd.DataFrame({'id': [], 'id_md5': [], 'row_hash': []})
+
+        # Misma semántica que la dimensión: un registro por id
+        return pd.concat(frames, ignore_index=True).drop_duplicates(subset=['id'], keep='last')
+
+    def _row_sql(self, spec: Dict) -> str:
+        """Expresiones SQL del id y del texto canónico de la fila"""
+        columns = [f"{spec['dim_id']}::text"] + [
+            f"coalesce({col}::text, '')" for col in spec['columns'].values()
+        ]
+        return f"concat_ws('|', {', '.join(columns)})"
+
+    def warehouse_digests(self, entity: str, level: int, prefixes: Optional[List[str]]) -> pd.DataFrame:
+        """
+        Digest (filas y suma de hashes) por bucket en el warehouse
+        (solo versiones vigentes de la dimensión)
+
+        La suma se devuelve como texto para compararla exactamente (puede
+        exceder 64 bits).
+
+        Args:
+            entity: Entidad a reconciliar
+            level: Longitud del prefijo del md5 del id que define el bucket
+            prefixes: Buckets del nivel anterior a descender (None = todos)
+        """
+        spec = RECONCILE_SPECS[entity]
+        id_md5 = f"md5({spec['dim_id']}::text)"
+        where = f"AND substr({id_md5}, 1, {level - 1}) = ANY(%s)" if prefixes else ""
+
+        query = f"""
+            SELECT substr({id_md5}, 1, {level}) AS bucket,
+                   COUNT(*) AS rows,
+                   SUM(('x' || substr(md5({self._row_sql(spec)}), 1, {ROW_HASH_HEX_DIGITS}))::bit(60)::bigint) AS digest
+            FROM {spec['dim_table']}
+            WHERE is_current {where}
+            GROUP BY 1
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(query, (prefixes,) if prefixes else None)
+        rows = cursor.fetchall()
+        cursor.close()
+
+        return pd.DataFrame(
+            [(bucket, int(count), str(int(digest))) for bucket, count, digest in rows],
+            columns=['bucket', 'rows', 'digest']
+        )
+
+    def warehouse_rows(self, entity: str, level: int, buckets: List[str]) -> pd.DataFrame:
+        """Id y hash de fila de los registros del warehouse en los buckets dados"""
+        spec = RECONCILE_SPECS[entity]
+        query = f"""
+            SELECT {spec['dim_id']}::text AS id,
+                   ('x' || substr(md5({self._row_sql(spec)}), 1, {ROW_HASH_HEX_DIGITS}))::bit(60)::bigint AS row_hash
+            FROM {spec['dim_table']}
+            WHERE is_current AND substr(md5({spec['dim_id']}::text), 1, {level}) = ANY(%s)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(query, (buckets,))
+        rows = cursor.fetchall()
+        cursor.close()
+
+        return pd.DataFrame(rows, columns=['id', 'row_hash'])
+
+    def reconcile(self, entity: str) -> Dict:
+        """
+        Reconcilia una entidad entre el lake y el warehouse
+
+        Returns:
+            Diccionario con conteos, niveles recorridos y los ids que faltan
+            en cada lado o cuyo contenido difiere
+        """
+        lake = self.lake_hashes(entity)
+        report = {
+            'entity': entity,
+            'lake_rows': len(lake),
+            'warehouse_rows': 0,
+            'levels': 0,
+            'buckets_compared': 0,
+            'missing_in_warehouse': [],
+            'missing_in_lake': [],
+            'mismatched': []
+        }
+
+        prefixes = None
+        for level in range(1, self.max_depth + 1):
+            lake_level = lake if prefixes is None else lake[lake['id_md5'].str[:level - 1].isin(prefixes)]
+            lake_digest = lake_level.groupby(lake_level['id_md5'].str[:level]).agg(
+                rows=('row_hash', 'size'), digest=('row_hash', lambda h: str(sum(int(x) for x in h)))
+            )
+            wh_digest = self.warehouse_digests(entity, level, prefixes).set_index('bucket')
+
+            if level == 1:
+                report['warehouse_rows'] = int(wh_digest['rows'].sum())
+
+            compared = lake_digest.join(wh_digest, how='outer', lsuffix='_lake', rsuffix='_wh')
+            differs = (compared['rows_lake'] != compared['rows_wh']) | (compared['digest_lake'] != compared['digest_wh'])
+            diff_buckets = compared.index[differs].tolist()
+
+            report['levels'] = level
+            report['buckets_compared'] += len(compared)
+
+            if not diff_buckets:
+                return report
+
+            pending_rows = compared.loc[differs, ['rows_lake', 'rows_wh']].fillna(0).max(axis=1).sum()
+            if pending_rows <= self.row_threshold or level == self.max_depth:
+                break
+
+            prefixes = diff_buckets
+
+        # Comparación id por id dentro de los buckets que difieren
+        lake_rows = lake[lake['id_md5'].str[:level].isin(diff_buckets)].set_index('id')['row_hash']
+        wh_rows = self.warehouse_rows(entity, level, diff_buckets).set_index('id')['row_hash']
+
+        report['missing_in_warehouse'] = sorted(set(lake_rows.index) - set(wh_rows.index))
+        report['missing_in_lake'] = sorted(set(wh_rows.index) - set(lake_rows.index))
+        common = lake_rows.index.intersection(wh_rows.index)
+        report['mismatched'] = sorted(common[lake_rows[common].values != wh_rows[common].values])
+
+        return report
+
+    def run(self, entities: Optional[List[str]] = None) -> List[Dict]:
+        """Reconcilia las entidades indicadas (por defecto todas)"""
+        if not self.connect():
+            return []
+
+        try:
+            return [self.reconcile(entity) for entity in (entities or list(RECONCILE_SPECS))]
+        finally:
+            self.disconnect()
+
+
+def print_report(report: Dict, max_ids: int = 10):
+    """Imprime el resultado de la reconciliación de una entidad"""
+    differences = len(report['missing_in_warehouse']) + len(report['missing_in_lake']) + len(report['mismatched'])
+    status = "✅" if differences == 0 else "⚠️"
+
+    print(f"\n{status} {report['entity'].upper()}: lake {report['lake_rows']:,} / warehouse {report['warehouse_rows']:,} registros "
+          f"({report['buckets_compared']} buckets, {report['levels']} niveles)")
+
+    for key, label in [('missing_in_warehouse', 'Faltan en warehouse'),
+                       ('missing_in_lake', 'Faltan en lake'),
+                       ('mismatched', 'Contenido distinto')]:
+        ids = report[key]
+        if ids:
+            sample = ', '.join(ids[:max_ids]) + (' ...' if len(ids) > max_ids else '')
+            print(f"   {label}: {len(ids):,} → {sample}")
+
+
+def main():
+    """Función principal"""
+    args = sys.argv[1:]
+    environment = DEFAULT_ENVIRONMENT
+    if args and args[0] in ['development', 'production']:
+        environment = args.pop(0)
+
+    unknown = [a for a in args if a not in RECONCILE_SPECS]
+    if unknown:
+        print(f"❌ Entidades desconocidas: {unknown}. Use: {list(RECONCILE_SPECS)}")
+        sys.exit(1)
+
+    print("="*60)
+    print("RECONCILIACIÓN DELTA LAKE ↔ DATA WAREHOUSE")
+    print("="*60)
+
+    reports = WarehouseReconciler(environment).run(args or None)
+    for report in reports:
+        print_report(report)
+
+    in_sync = bool(reports) and all(
+        not (r['missing_in_warehouse'] or r['missing_in_lake'] or r['mismatched']) for r in reports
+    )
+    sys.exit(0 if in_sync else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Mantenimiento SCD Tipo 2 de las dimensiones
+Cada fila vigente guarda en row_hash el md5 de sus columnas versionadas
+(tracked_columns de DIMENSION_TABLES). Al aplicar una staging:
+
+1. Las filas vigentes cuyo hash cambió se cierran (is_current = FALSE,
+   expiration_date = ayer).
+2. Se inserta una versión nueva para los ids nuevos y los que cambiaron
+   (effective_date = hoy).
+3. Las filas sin cambios no se tocan.
+
+Las fechas de vigencia son inclusivas: la versión válida el día d cumple
+d BETWEEN effective_date AND expiration_date, y como la versión cerrada
+expira el día anterior al inicio de la nueva, la consulta devuelve una sola
+fila. Una versión creada y sustituida el mismo día queda con
+expiration_date < effective_date (no fue la vigente ningún día).
+
+Ambos pasos son sentencias por conjuntos sobre la staging deduplicada; los
+hashes se calculan en el servidor con la misma expresión que en el destino.
+El llamador decide cuándo hacer commit.
+"""
+import logging
+from typing import Dict, Iterable, Sequence
+
+from fase2_warehouse.bulk_loader import BulkLoader
+from fase2_warehouse.etl_config import DIMENSION_TABLES
+
+# Fecha de expiración de las versiones vigentes
+OPEN_EXPIRATION_DATE = '9999-12-31'
+
+# Expiración de una versión que se cierra hoy (último día en que fue vigente)
+CLOSED_EXPIRATION_SQL = "CURRENT_DATE - 1"
+
+
+def row_hash_sql(columns, alias: str = None) -> str:
+    """Expresión SQL del hash de las columnas versionadas de una fila"""
+    prefix = f"{alias}." if alias else ""
+    return f"md5(ROW({', '.join(prefix + col for col in columns)})::text)"
+
+
+class SCD2Loader:
+    """Aplica registros a una dimensión como SCD Tipo 2"""
+
+    def __init__(self, conn, bulk: BulkLoader = None, logger: logging.Logger = None):
+        """
+        Args:
+            conn: Conexión psycopg2 (no se hace commit aquí)
+            bulk: BulkLoader sobre la misma conexión
+            logger: Logger del ETL
+        """
+        self.conn = conn
+        self.bulk = bulk or BulkLoader(conn)
+        self.logger = logger or logging.getLogger("SCD2Loader")
+
+    def _execute(self, sql: str) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(sql)
+        count = cursor.rowcount
+        cursor.close()
+        return count
+
+    def apply(self, dim_table: str, staging: str) -> Dict[str, int]:
+        """
+        Aplica una tabla de staging (columnas de la dimensión + _ord) a la
+        dimensión; si un id se repite gana la última fila
+
+        Returns:
+            Conteos de ids nuevos, versionados y sin cambios
+        """
+        spec = DIMENSION_TABLES[dim_table]
+        key = spec['natural_key']
+        columns = spec['columns']
+        source = f"_scd2_{dim_table}"
+
+        self._execute(f"DROP TABLE IF EXISTS {source}")
+        received = self._execute(f"""
+            CREATE TEMP TABLE {source} AS
+            SELECT DISTINCT ON ({key}) {', '.join(columns)},
+                   {row_hash_sql(spec['tracked_columns'])} AS row_hash
+            FROM {staging}
+            WHERE {key} IS NOT NULL
+            ORDER BY {key}, _ord DESC
+        """)
+        self._execute(f"CREATE INDEX ON {source} ({key})")
+
+        changed = self._execute(f"""
+            UPDATE {dim_table} d
+            SET is_current = FALSE, expiration_date = {CLOSED_EXPIRATION_SQL}
+            FROM {source} s
+            WHERE d.{key} = s.{key}
+              AND d.is_current
+              AND d.row_hash IS DISTINCT FROM s.row_hash
+        """)
+        inserted = self._execute(f"""
+            INSERT INTO {dim_table} ({', '.join(columns)}, row_hash, effective_date, expiration_date, is_current)
+            SELECT {', '.join(f's.{col}' for col in columns)}, s.row_hash,
+                   CURRENT_DATE, DATE '{OPEN_EXPIRATION_DATE}', TRUE
+            FROM {source} s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {dim_table} d
+                WHERE d.{key} = s.{key} AND d.is_current
+            )
+        """)
+        self._execute(f"DROP TABLE {source}")
+
+        result = {
+            'new': inserted - changed,
+            'changed': changed,
+            'unchanged': received - inserted
+        }
+        self.logger.info(
+            f"✅ {dim_table}: {result['new']} nuevos, {result['changed']} versionados, "
+            f"{result['unchanged']} sin cambios"
+        )
+        return result
+
+    def load(self, dim_table: str, records: Iterable[Sequence]) -> Dict[str, int]:
+        """
+        Copia registros (columnas de DIMENSION_TABLES) a una staging temporal
+        y la aplica como SCD Tipo 2
+        """
+        columns = DIMENSION_TABLES[dim_table]['columns']
+        staging = self.bulk.create_staging(dim_table, columns)
+        self.bulk.copy_rows(staging, columns, records)
+        result = self.apply(dim_table, staging)
+        self.bulk.drop_staging(staging)
+        return result
@@ -6,6 +6,7 @@
 -- Eliminar tablas existentes (en orden inverso de dependencias)
 DROP TABLE IF EXISTS fact_market_metrics CASCADE;
 DROP TABLE IF EXISTS bridge_market_tag CASCADE;
+DROP TABLE IF EXISTS tag_closure CASCADE;
 DROP TABLE IF EXISTS dim_tag CASCADE;
 DROP TABLE IF EXISTS dim_series CASCADE;
 DROP TABLE IF EXISTS dim_event CASCADE;
@@ -16,7 +17,8 @@ DROP TABLE IF EXISTS dim_time CASCADE;
 -- DIMENSIÓN: TIEMPO
 -- ============================================================
 CREATE TABLE dim_time (
-    time_key SERIAL PRIMARY KEY,
+    -- Clave inteligente yyyymmdd: el ETL la calcula sin consultar la tabla
+    time_key INTEGER PRIMARY KEY,
     date_value DATE NOT NULL UNIQUE,
     year INTEGER NOT NULL,
     quarter INTEGER NOT NULL,
@@ -35,7 +37,8 @@ CREATE TABLE dim_time (
     is_year_end BOOLEAN NOT NULL,
     fiscal_year INTEGER,
     fiscal_quarter INTEGER,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_dim_time_key CHECK (time_key = year * 10000 + month * 100 + day_of_month)
 );
 
 CREATE INDEX idx_dim_time_date ON dim_time(date_value);
@@ -47,7 +50,7 @@ CREATE INDEX idx_dim_time_quarter ON dim_time(year, quarter);
 -- ============================================================
 CREATE TABLE dim_series (
     series_key SERIAL PRIMARY KEY,
-    series_id VARCHAR(100) NOT NULL UNIQUE,
+    series_id VARCHAR(100) NOT NULL,
     slug VARCHAR(255) NOT NULL,
     title TEXT,
     description TEXT,
@@ -68,6 +71,7 @@ CREATE TABLE dim_series (
     created_by VARCHAR(100),
     updated_by VARCHAR(100),
     -- SCD Type 2 fields
+    row_hash CHAR(32), -- md5 de las columnas versionadas
     effective_date DATE DEFAULT CURRENT_DATE,
     expiration_date DATE DEFAULT '9999-12-31',
     is_current BOOLEAN DEFAULT TRUE,
@@ -77,13 +81,15 @@ CREATE TABLE dim_series (
 CREATE INDEX idx_dim_series_id ON dim_series(series_id);
 CREATE INDEX idx_dim_series_slug ON dim_series(slug);
 CREATE INDEX idx_dim_series_current ON dim_series(is_current);
+-- Una sola versión vigente por id (SCD Tipo 2)
+CREATE UNIQUE INDEX uq_dim_series_current ON dim_series(series_id) WHERE is_current;
 
 -- ============================================================
 -- DIMENSIÓN: EVENTO
 -- ============================================================
 CREATE TABLE dim_event (
     event_key SERIAL PRIMARY KEY,
-    event_id INTEGER NOT NULL UNIQUE,
+    event_id INTEGER NOT NULL,
     ticker VARCHAR(255),
     slug VARCHAR(255) NOT NULL,
     title TEXT NOT NULL,
@@ -136,6 +142,7 @@ CREATE TABLE dim_event (
     game_status VARCHAR(50),
     
     -- SCD Type 2 fields
+    row_hash CHAR(32), -- md5 de las columnas versionadas
     effective_date DATE DEFAULT CURRENT_DATE,
     expiration_date DATE DEFAULT '9999-12-31',
     is_current BOOLEAN DEFAULT TRUE,
@@ -146,6 +153,8 @@ CREATE INDEX idx_dim_event_id ON dim_event(event_id);
 CREATE INDEX idx_dim_event_slug ON dim_event(slug);
 CREATE INDEX idx_dim_event_category ON dim_event(category);
 CREATE INDEX idx_dim_event_current ON dim_event(is_current);
+-- Una sola versión vigente por id (SCD Tipo 2)
+CREATE UNIQUE INDEX uq_dim_event_current ON dim_event(event_id) WHERE is_current;
 CREATE INDEX idx_dim_event_series_slug ON dim_event(series_slug);
 
 -- ============================================================
@@ -153,7 +162,7 @@ CREATE INDEX idx_dim_event_series_slug ON dim_event(series_slug);
 -- ============================================================
 CREATE TABLE dim_market (
     market_key SERIAL PRIMARY KEY,
-    market_id VARCHAR(100) NOT NULL UNIQUE,
+    market_id VARCHAR(100) NOT NULL,
     condition_id VARCHAR(200),
     slug VARCHAR(255) NOT NULL,
     question TEXT NOT NULL,
@@ -206,6 +215,7 @@ CREATE TABLE dim_market (
     market_maker_address VARCHAR(200),
     
     -- SCD Type 2 fields
+    row_hash CHAR(32), -- md5 de las columnas versionadas
     effective_date DATE DEFAULT CURRENT_DATE,
     expiration_date DATE DEFAULT '9999-12-31',
     is_current BOOLEAN DEFAULT TRUE,
@@ -216,6 +226,8 @@ CREATE INDEX idx_dim_market_id ON dim_market(market_id);
 CREATE INDEX idx_dim_market_slug ON dim_market(slug);
 CREATE INDEX idx_dim_market_category ON dim_market(category);
 CREATE INDEX idx_dim_market_current ON dim_market(is_current);
+-- Una sola versión vigente por id (SCD Tipo 2)
+CREATE UNIQUE INDEX uq_dim_market_current ON dim_market(market_id) WHERE is_current;
 CREATE INDEX idx_dim_market_type ON dim_market(market_type);
 
 -- ============================================================
@@ -223,7 +235,7 @@ CREATE INDEX idx_dim_market_type ON dim_market(market_type);
 -- ============================================================
 CREATE TABLE dim_tag (
     tag_key SERIAL PRIMARY KEY,
-    tag_id VARCHAR(100) NOT NULL UNIQUE,
+    tag_id VARCHAR(100) NOT NULL,
     label VARCHAR(255) NOT NULL,
     slug VARCHAR(255) NOT NULL,
     
@@ -246,6 +258,7 @@ CREATE TABLE dim_tag (
     updated_by VARCHAR(100),
     
     -- SCD Type 2 fields
+    row_hash CHAR(32), -- md5 de las columnas versionadas
     effective_date DATE DEFAULT CURRENT_DATE,
     expiration_date DATE DEFAULT '9999-12-31',
     is_current BOOLEAN DEFAULT TRUE,
@@ -257,6 +270,22 @@ CREATE INDEX idx_dim_tag_slug ON dim_tag(slug);
 CREATE INDEX idx_dim_tag_parent ON dim_tag(parent_tag_id);
 CREATE INDEX idx_dim_tag_level ON dim_tag(level);
 CREATE INDEX idx_dim_tag_current ON dim_tag(is_current);
+-- Una sola versión vigente por id (SCD Tipo 2)
+CREATE UNIQUE INDEX uq_dim_tag_current ON dim_tag(tag_id) WHERE is_current;
+
+-- ============================================================
+-- CLAUSURA DE LA JERARQUÍA DE TAGS
+-- Un par por ancestro-descendiente de las versiones vigentes (cada
+-- tag consigo mismo a profundidad 0); la mantiene tag_hierarchy.py
+-- ============================================================
+CREATE TABLE tag_closure (
+    ancestor_key INTEGER NOT NULL REFERENCES dim_tag(tag_key),
+    descendant_key INTEGER NOT NULL REFERENCES dim_tag(tag_key),
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_key, descendant_key)
+);
+
+CREATE INDEX idx_tag_closure_descendant ON tag_closure(descendant_key);
 
 -- ============================================================
 -- TABLA PUENTE: MARKET-TAG (Many-to-Many)
@@ -274,9 +303,11 @@ CREATE INDEX idx_bridge_tag ON bridge_market_tag(tag_key);
 
 -- ============================================================
 -- TABLA DE HECHOS: MÉTRICAS DE MERCADO
+-- Particionada por rango mensual sobre snapshot_date_key; las
+-- particiones las crea y archiva fact_partitions.py
 -- ============================================================
 CREATE TABLE fact_market_metrics (
-    fact_key SERIAL PRIMARY KEY,
+    fact_key SERIAL,
     
     -- Foreign Keys a dimensiones
     market_key INTEGER NOT NULL REFERENCES dim_market(market_key),
@@ -347,12 +378,13 @@ CREATE TABLE fact_market_metrics (
     extraction_timestamp TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     
-    -- Constraints
+    -- Constraints (deben incluir la clave de partición)
+    PRIMARY KEY (fact_key, snapshot_date_key),
     UNIQUE(market_key, snapshot_date_key)
-);
+) PARTITION BY RANGE (snapshot_date_key);
 
--- Índices para optimizar consultas analíticas
-CREATE INDEX idx_fact_market_key ON fact_market_metrics(market_key);
+-- Índices para optimizar consultas analíticas (se crean en cada partición).
+-- El UNIQUE(market_key, snapshot_date_key) ya cubre las búsquedas por mercado.
 CREATE INDEX idx_fact_event_key ON fact_market_metrics(event_key);
 CREATE INDEX idx_fact_series_key ON fact_market_metrics(series_key);
 CREATE INDEX idx_fact_snapshot_date ON fact_market_metrics(snapshot_date_key);
@@ -362,7 +394,6 @@ CREATE INDEX idx_fact_volume ON fact_market_metrics(volume);
 CREATE INDEX idx_fact_liquidity ON fact_market_metrics(liquidity);
 
 -- Índices compuestos para consultas comunes
-CREATE INDEX idx_fact_market_snapshot ON fact_market_metrics(market_key, snapshot_date_key);
 CREATE INDEX idx_fact_series_snapshot ON fact_market_metrics(series_key, snapshot_date_key);
 
 -- ============================================================
@@ -374,9 +405,12 @@ COMMENT ON TABLE dim_series IS 'Dimensión de series de mercados (ej: NBA, Elect
 COMMENT ON TABLE dim_event IS 'Dimensión de eventos que contienen mercados';
 COMMENT ON TABLE dim_market IS 'Dimensión de mercados de predicción';
 COMMENT ON TABLE dim_tag IS 'Dimensión de tags con jerarquía para categorización';
+COMMENT ON TABLE tag_closure IS 'Clausura transitiva de la jerarquía de tags (ancestro, descendiente, profundidad)';
 COMMENT ON TABLE bridge_market_tag IS 'Tabla puente para relación many-to-many entre markets y tags';
 COMMENT ON TABLE fact_market_metrics IS 'Tabla de hechos con métricas de mercado (volumen, liquidez, precios)';
 
+COMMENT ON COLUMN dim_time.time_key IS 'Clave yyyymmdd de la fecha (ej: 20250131)';
 COMMENT ON COLUMN dim_tag.path IS 'Ruta jerárquica completa del tag (ej: /sports/nba/playoffs)';
+COMMENT ON COLUMN fact_market_metrics.snapshot_date_key IS 'Clave yyyymmdd del snapshot; clave de partición (un mes por partición)';
 COMMENT ON COLUMN fact_market_metrics.outcome_price_yes IS 'Precio desanidado del outcome "Yes" del array outcomePrices';
 COMMENT ON COLUMN fact_market_metrics.outcome_price_no IS 'Precio desanidado del outcome "No" del array outcomePrices';
@@ -0,0 +1,261 @@
+"""
+Carga del Data Warehouse por staging
+1. Los registros se copian (COPY) a tablas UNLOGGED stg_* con los ids
+   naturales del origen, sin resolver claves en Python.
+2. Las claves subrogadas (market_key, event_key, time_key...) se resuelven
+   en el servidor con joins contra las dimensiones.
+3. Dimensiones (SCD Tipo 2), tabla puente y hechos se aplican con
+   sentencias por conjuntos (UPDATE / INSERT ... SELECT) dentro de una
+   sola transacción. Los hechos, ya con sus claves, pasan por
+   SnapshotFactLoader igual que en la carga completa (snapshot por día,
+   skip_unchanged, modo de carga masiva e INSERT ... ON CONFLICT, que no
+   requiere PostgreSQL 15 como MERGE).
+
+El llamador decide cuándo hacer commit: si algo falla, el rollback deja el
+warehouse como estaba.
+"""
+import logging
+from typing import Dict, Iterable, List, Sequence
+
+from fase2_warehouse.bridge import sync_bridge
+from fase2_warehouse.bulk_loader import BulkLoader
+from fase2_warehouse.etl_config import (
+    DIMENSION_TABLES, FACT_METRIC_COLUMNS, FACT_UPDATE_COLUMNS,
+    STAGING_CONFIG, STAGING_LINK_TABLES
+)
+from fase2_warehouse.fact_partitions import FACT_TABLE
+from fase2_warehouse.fact_snapshot import SnapshotFactLoader
+from fase2_warehouse.scd2 import SCD2Loader
+from fase2_warehouse.time_dimension import extend_dim_time_to
+
+# Columnas de staging de la tabla de hechos: ids y fechas naturales
+FACT_NATURAL_COLUMNS = {
+    'market_id': 'VARCHAR(100)',
+    'snapshot_date': 'DATE',
+    'start_date': 'TIMESTAMP',
+    'end_date': 'TIMESTAMP',
+    'closed_time': 'TIMESTAMP'
+}
+
+FACT_STAGING_COLUMNS = list(FACT_NATURAL_COLUMNS) + FACT_METRIC_COLUMNS
+
+# Tipos de las tablas de relación en staging
+LINK_COLUMN_TYPES = {
+    'event_id': 'INTEGER',
+    'market_id': 'VARCHAR(100)',
+    'tag_id': 'VARCHAR(100)',
+    'series_id': 'VARCHAR(100)'
+}
+
+
+class StagedLoader:
+    """Carga set-based: COPY a stg_*, SCD Tipo 2 en dimensiones y snapshot de hechos"""
+
+    def __init__(self, conn, bulk: BulkLoader = None, logger: logging.Logger = None,
+                 skip_unchanged: bool = False):
+        """
+        Args:
+            conn: Conexión psycopg2 (no se hace commit aquí)
+            bulk: BulkLoader sobre la misma conexión
+            logger: Logger del ETL
+            skip_unchanged: Omitir mercados con las mismas métricas que su
+                            último snapshot
+        """
+        self.conn = conn
+        self.bulk = bulk or BulkLoader(conn)
+        self.logger = logger or logging.getLogger("StagedLoader")
+        self.scd2 = SCD2Loader(conn, self.bulk, self.logger)
+        self.snapshots = SnapshotFactLoader(conn, self.bulk, skip_unchanged, self.logger)
+
+    @staticmethod
+    def staging_name(name: str) -> str:
+        """Nombre de la tabla de staging de una tabla o relación"""
+        return f"{STAGING_CONFIG['prefix']}{name}"
+
+    def _execute(self, sql: str) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(sql)
+        count = cursor.rowcount
+        cursor.close()
+        return count
+
+    def _create(self, staging: str, body: str):
+        """(Re)crea una tabla de staging; body es 'AS SELECT ...' o '(columnas)'"""
+        unlogged = "UNLOGGED " if STAGING_CONFIG['unlogged'] else ""
+        self._execute(f"DROP TABLE IF EXISTS {staging}")
+        self._execute(f"CREATE {unlogged}TABLE {staging} {body}")
+
+    def create_staging_tables(self):
+        """
+        Crea las tablas de staging vacías
+
+        Las de dimensiones copian los tipos de la tabla destino; todas llevan
+        _ord con el orden de llegada (si una clave se repite gana la última).
+        """
+        for dim_table, spec in DIMENSION_TABLES.items():
+            staging = self.staging_name(dim_table)
+            self._create(staging, f"AS SELECT {', '.join(spec['columns'])} FROM {dim_table} WITH NO DATA")
+            self._execute(f"ALTER TABLE {staging} ADD COLUMN _ord BIGSERIAL")
+
+        natural = ', '.join(f"NULL::{sql_type} AS {col}" for col, sql_type in FACT_NATURAL_COLUMNS.items())
+        staging = self.staging_name('fact_market_metrics')
+        self._create(staging, f"""
+            AS SELECT {natural}, {', '.join(FACT_METRIC_COLUMNS)}
+            FROM fact_market_metrics WITH NO DATA
+        """)
+        self._execute(f"ALTER TABLE {staging} ADD COLUMN _ord BIGSERIAL")
+
+        for link_table, columns in STAGING_LINK_TABLES.items():
+            definition = ', '.join(f"{col} {LINK_COLUMN_TYPES[col]}" for col in columns)
+            self._create(self.staging_name(link_table), f"({definition})")
+
+        self.logger.info("   Tablas de staging creadas")
+
+    def stage(self, name: str, columns: List[str], records: Iterable[Sequence]) -> int:
+        """Copia registros a la tabla de staging de name"""
+        count = self.bulk.copy_rows(self.staging_name(name), columns, records)
+        self.logger.info(f"   {self.staging_name(name)}: {count} registros en staging")
+        return count
+
+    def stage_dimension(self, dim_table: str, records: Iterable[Sequence]) -> int:
+        """Copia los registros de una dimensión (columnas de DIMENSION_TABLES)"""
+        return self.stage(dim_table, DIMENSION_TABLES[dim_table]['columns'], records)
+
+    def stage_facts(self, records: Iterable[Sequence]) -> int:
+        """Copia los registros de hechos (columnas de FACT_STAGING_COLUMNS)"""
+        return self.stage('fact_market_metrics', FACT_STAGING_COLUMNS, records)
+
+    def stage_links(self, manager) -> Dict[str, int]:
+        """
+        Copia las tablas de relación del lake (event_markets, event_tags...)
+
+        Args:
+            manager: DeltaLakeManager (o función tabla → manager) de origen
+        """
+        results = {}
+        for link_table, columns in STAGING_LINK_TABLES.items():
+            source = manager(link_table) if callable(manager) else manager
+            if not source.table_exists(link_table):
+                self.logger.warning(f"   {link_table} no existe en el lake: se omite")
+                continue
+
+            rows = (
+                row
+                for batch in source.iter_batches(link_table, columns=columns)
+                for row in zip(*[batch.column(col).to_pylist() for col in columns])
+            )
+            results[link_table] = self.stage(link_table, columns, rows)
+
+        return results
+
+    def merge_dimension(self, dim_table: str) -> int:
+        """
+        Aplica la staging de una dimensión como SCD Tipo 2
+
+        Solo se escriben los ids nuevos y los que cambiaron en sus columnas
+        versionadas (cierre de la versión vigente + versión nueva).
+
+        Returns:
+            Versiones insertadas
+        """
+        result = self.scd2.apply(dim_table, self.staging_name(dim_table))
+        return result['new'] + result['changed']
+
+    def merge_bridge(self) -> int:
+        """
+        Reemplaza las relaciones market-tag de los mercados en staging
+
+        Se borran solo los pares de la versión vigente que ya no existen y se
+        insertan los nuevos (las versiones cerradas conservan sus tags).
+
+        Returns:
+            Relaciones insertadas
+        """
+        count, removed = sync_bridge(
+            self.conn, self.staging_name('event_markets'), self.staging_name('event_tags')
+        )
+        self.logger.info(f"✅ bridge_market_tag: {count} relaciones nuevas, {removed} eliminadas")
+        return count
+
+    def extend_dim_time(self) -> int:
+        """
+        Extiende dim_time hasta cubrir todas las fechas de la staging de hechos
+
+        Returns:
+            Fechas nuevas en dim_time
+        """
+        date_columns = [col for col, sql_type in FACT_NATURAL_COLUMNS.items() if sql_type in ('DATE', 'TIMESTAMP')]
+        count = extend_dim_time_to(self.conn, self.staging_name('fact_market_metrics'), date_columns)
+        if count:
+            self.logger.info(f"📅 dim_time extendida: {count} fechas nuevas")
+        return count
+
+    def merge_facts(self) -> int:
+        """
+        Aplica la staging de hechos resolviendo todas las claves en el servidor
+
+        event_key y series_key salen de las relaciones evento-mercado y
+        evento-serie; las claves de fecha, de dim_time. Las filas resueltas
+        se escriben con SnapshotFactLoader, como en la carga completa:
+        particiones, skip_unchanged, modo de carga masiva
+        (FACT_BULK_MODE_CONFIG) e INSERT ... ON CONFLICT.
+
+        Returns:
+            Filas insertadas o actualizadas
+        """
+        insert_columns = [
+            'market_key', 'event_key', 'series_key', 'snapshot_date_key',
+            'start_date_key', 'end_date_key', 'closed_date_key'
+        ] + FACT_METRIC_COLUMNS
+
+        resolved = self.bulk.create_staging(FACT_TABLE, insert_columns)
+        self._resolve_facts(resolved, self.staging_name('fact_market_metrics'), insert_columns)
+        result = self.snapshots.apply(resolved, insert_columns, FACT_UPDATE_COLUMNS)
+        self.bulk.drop_staging(resolved)
+
+        self.logger.info(
+            f"✅ fact_market_metrics: {result['written']} registros insertados/actualizados, "
+            f"{result['skipped']} sin cambios omitidos"
+        )
+        return result['written']
+
+    def _resolve_facts(self, resolved: str, staging: str, insert_columns: List[str]) -> int:
+        """Copia la staging de hechos a resolved con las claves subrogadas"""
+        metrics = ', '.join(f"f.{col}" for col in FACT_METRIC_COLUMNS)
+        return self._execute(f"""
+            INSERT INTO {resolved} ({', '.join(insert_columns)})
+            SELECT DISTINCT ON (m.market_key, ts.time_key)
+                   m.market_key, e.event_key, ds.series_key,
+                   ts.time_key AS snapshot_date_key,
+                   t1.time_key AS start_date_key,
+                   t2.time_key AS end_date_key,
+                   t3.time_key AS closed_date_key,
+                   {metrics}
+            FROM {staging} f
+            JOIN dim_market m ON m.market_id = f.market_id AND m.is_current
+            JOIN dim_time ts ON ts.date_value = f.snapshot_date
+            LEFT JOIN dim_time t1 ON t1.date_value = f.start_date::date
+            LEFT JOIN dim_time t2 ON t2.date_value = f.end_date::date
+            LEFT JOIN dim_time t3 ON t3.date_value = f.closed_time::date
+            LEFT JOIN (
+                SELECT DISTINCT ON (market_id) market_id, event_id
+                FROM {self.staging_name('event_markets')}
+                ORDER BY market_id, event_id
+            ) em ON em.market_id = f.market_id
+            LEFT JOIN dim_event e ON e.event_id = em.event_id AND e.is_current
+            LEFT JOIN (
+                SELECT DISTINCT ON (event_id) event_id, series_id
+                FROM {self.staging_name('event_series')}
+                ORDER BY event_id, series_id
+            ) es ON es.event_id = em.event_id
+            LEFT JOIN dim_series ds ON ds.series_id = es.series_id AND ds.is_current
+            ORDER BY m.market_key, ts.time_key, f._ord DESC
+        """)
+
+    def merge_all(self) -> Dict[str, int]:
+        """Aplica toda la staging en orden de dependencias (sin commit)"""
+        results = {dim_table: self.merge_dimension(dim_table) for dim_table in DIMENSION_TABLES}
+        results['bridge_market_tag'] = self.merge_bridge()
+        results['dim_time'] = self.extend_dim_time()
+        results['fact_market_metrics'] = self.merge_facts()
+        return results
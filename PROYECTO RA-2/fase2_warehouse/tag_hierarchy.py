@@ -0,0 +1,227 @@
+"""
+Jerarquía de tags y tabla de clausura
+Los tags del origen no traen padre explícito: la jerarquía se deduce de
+las relaciones evento-tag. Un tag B es hijo de A si casi todos los eventos
+de B también tienen A (cobertura >= min_coverage) y A tiene estrictamente
+más eventos; entre varios candidatos se elige el más específico (el de
+menos eventos). Como el padre siempre tiene más eventos que el hijo, el
+resultado es un bosque sin ciclos.
+
+parent_tag_id, level y path se sobrescriben en la versión vigente de cada
+tag (atributos tipo 1: no generan versiones SCD2) y tag_closure guarda
+todos los pares (ancestro, descendiente, profundidad), incluido cada tag
+consigo mismo a profundidad 0. Así "todos los mercados del tag X y sus
+subtags" es un solo join indexado:
+
+    SELECT DISTINCT b.market_key
+    FROM tag_closure c
+    JOIN bridge_market_tag b ON b.tag_key = c.descendant_key
+    WHERE c.ancestor_key = %s
+
+La definición de tag_closure vive solo en schema_ddl.sql; en un esquema
+creado antes de que existiera se crea con esa misma definición.
+
+El llamador decide cuándo hacer commit.
+"""
+import logging
+import os
+from typing import Dict, Optional
+
+import pandas as pd
+
+from fase2_warehouse.bulk_loader import BulkLoader
+from fase2_warehouse.etl_config import TAG_HIERARCHY_CONFIG
+from fase2_warehouse.transform import python_values, to_records
+
+
+def tag_closure_ddl() -> str:
+    """CREATE TABLE e índice de tag_closure tomados de schema_ddl.sql"""
+    sql_file = os.path.join(os.path.dirname(__file__), 'schema_ddl.sql')
+    with open(sql_file, 'r', encoding='utf-8') as f:
+        script = f.read()
+    start = script.index("CREATE TABLE tag_closure")
+    end = script.index("-- =====", start)
+    return script[start:end]
+
+
+def infer_parents(event_tags: pd.DataFrame, min_events: int, min_coverage: float) -> pd.Series:
+    """
+    Padre de cada tag deducido de la coocurrencia en eventos
+
+    Args:
+        event_tags: Pares (event_id, tag_id)
+        min_events: Eventos mínimos de un tag para buscarle padre
+        min_coverage: Fracción mínima de sus eventos que comparte con el padre
+
+    Returns:
+        Serie tag_id → parent_tag_id (solo tags con padre)
+    """
+    links = event_tags[['event_id', 'tag_id']].dropna().drop_duplicates()
+    counts = links.groupby('tag_id').size()
+
+    children = links[links['tag_id'].map(counts) >= min_events]
+    pairs = children.merge(links, on='event_id', suffixes=('', '_parent'))
+    pairs = pairs[pairs['tag_id'] != pairs['tag_id_parent']]
+
+    shared = pairs.groupby(['tag_id', 'tag_id_parent']).size().rename('shared').reset_index()
+    shared['tag_events'] = shared['tag_id'].map(counts)
+    shared['parent_events'] = shared['tag_id_parent'].map(counts)
+
+    candidates = shared[
+        (shared['shared'] >= min_coverage * shared['tag_events'])
+        & (shared['parent_events'] > shared['tag_events'])
+    ]
+    best = candidates.sort_values(['tag_id', 'parent_events', 'tag_id_parent']).drop_duplicates('tag_id')
+    return best.set_index('tag_id')['tag_id_parent']
+
+
+def tag_paths(tags: pd.DataFrame, parents: pd.Series, max_depth: int) -> pd.DataFrame:
+    """
+    Nivel y ruta de cada tag, resueltos por niveles (una pasada vectorizada
+    por profundidad)
+
+    Args:
+        tags: Tags con tag_id y slug
+        parents: Serie tag_id → parent_tag_id
+
+    Returns:
+        DataFrame tag_id, parent_tag_id, level, path
+    """
+    frame = tags[['tag_id', 'slug']].drop_duplicates('tag_id').set_index('tag_id')
+    frame['parent_tag_id'] = parents.reindex(frame.index)
+    frame['parent_tag_id'] = frame['parent_tag_id'].where(frame['parent_tag_id'].isin(frame.index))
+
+    roots = frame['parent_tag_id'].isna()
+    frame['level'] = pd.Series(1, index=frame.index).where(roots)
+    frame['path'] = ('/' + frame['slug']).where(roots)
+
+    for _ in range(max_depth - 1):
+        parent_level = frame['parent_tag_id'].map(frame['level'])
+        ready = frame['level'].isna() & parent_level.notna()
+        if not ready.any():
+            break
+        frame.loc[ready, 'path'] = frame.loc[ready, 'parent_tag_id'].map(frame['path']) + '/' + frame.loc[ready, 'slug']
+        frame.loc[ready, 'level'] = parent_level[ready] + 1
+
+    # Más profundos que max_depth: se cargan como raíz
+    unresolved = frame['level'].isna()
+    frame.loc[unresolved, 'parent_tag_id'] = None
+    frame.loc[unresolved, 'level'] = 1
+    frame.loc[unresolved, 'path'] = '/' + frame.loc[unresolved, 'slug']
+
+    frame['level'] = frame['level'].astype('Int64')
+    return frame.reset_index()[['tag_id', 'parent_tag_id', 'level', 'path']]
+
+
+class TagHierarchyLoader:
+    """Resuelve la jerarquía de dim_tag y mantiene tag_closure"""
+
+    def __init__(self, conn, bulk: BulkLoader = None, logger: logging.Logger = None,
+                 config: Optional[dict] = None):
+        """
+        Args:
+            conn: Conexión psycopg2 (no se hace commit aquí)
+            bulk: BulkLoader sobre la misma conexión
+            logger: Logger del ETL
+            config: Umbrales (por defecto TAG_HIERARCHY_CONFIG)
+        """
+        self.conn = conn
+        self.bulk = bulk or BulkLoader(conn)
+        self.logger = logger or logging.getLogger("TagHierarchyLoader")
+        self.config = config or TAG_HIERARCHY_CONFIG
+
+    def _execute(self, sql: str) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(sql)
+        count = cursor.rowcount
+        cursor.close()
+        return count
+
+    def current_tags(self) -> pd.DataFrame:
+        """tag_id y slug de las versiones vigentes de dim_tag"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT tag_id, slug FROM dim_tag WHERE is_current")
+        rows = cursor.fetchall()
+        cursor.close()
+        return pd.DataFrame(rows, columns=['tag_id', 'slug'])
+
+    def apply(self, hierarchy: pd.DataFrame) -> int:
+        """
+        Sobrescribe parent_tag_id, level y path de las versiones vigentes
+
+        Returns:
+            Tags actualizados
+        """
+        columns = ['tag_id', 'parent_tag_id', 'level', 'path']
+        self._execute("DROP TABLE IF EXISTS _tag_hierarchy")
+        self._execute("""
+            CREATE TEMP TABLE _tag_hierarchy AS
+            SELECT tag_id, parent_tag_id, level, path FROM dim_tag WITH NO DATA
+        """)
+        self.bulk.copy_rows('_tag_hierarchy', columns, to_records(python_values(hierarchy[columns])))
+
+        updated = self._execute("""
+            UPDATE dim_tag d
+            SET parent_tag_id = h.parent_tag_id, level = h.level, path = h.path
+            FROM _tag_hierarchy h
+            WHERE d.tag_id = h.tag_id
+              AND d.is_current
+              AND (d.parent_tag_id, d.level, d.path) IS DISTINCT FROM (h.parent_tag_id, h.level, h.path)
+        """)
+        self._execute("DROP TABLE _tag_hierarchy")
+        return updated
+
+    def rebuild_closure(self) -> int:
+        """
+        Reconstruye tag_closure desde parent_tag_id de las versiones vigentes
+
+        Returns:
+            Pares (ancestro, descendiente) guardados
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT to_regclass('tag_closure') IS NULL")
+        missing = cursor.fetchone()[0]
+        cursor.close()
+        if missing:
+            self._execute(tag_closure_ddl())
+
+        self._execute("DELETE FROM tag_closure")
+        return self._execute(f"""
+            INSERT INTO tag_closure (ancestor_key, descendant_key, depth)
+            WITH RECURSIVE closure AS (
+                SELECT tag_key AS ancestor_key, tag_key AS descendant_key, tag_id, 0 AS depth
+                FROM dim_tag
+                WHERE is_current
+                UNION ALL
+                SELECT c.ancestor_key, t.tag_key, t.tag_id, c.depth + 1
+                FROM closure c
+                JOIN dim_tag t ON t.parent_tag_id = c.tag_id AND t.is_current
+                WHERE c.depth < {self.config['max_depth']}
+            )
+            SELECT ancestor_key, descendant_key, MIN(depth)
+            FROM closure
+            GROUP BY ancestor_key, descendant_key
+        """)
+
+    def load(self, event_tags: pd.DataFrame) -> Dict[str, int]:
+        """
+        Deduce la jerarquía de los pares (event_id, tag_id), la aplica a
+        dim_tag y reconstruye tag_closure
+
+        Returns:
+            Tags con padre, tags actualizados y pares de la clausura
+        """
+        parents = infer_parents(event_tags, self.config['min_events'], self.config['min_coverage'])
+        hierarchy = tag_paths(self.current_tags(), parents, self.config['max_depth'])
+
+        result = {
+            'with_parent': int(hierarchy['parent_tag_id'].notna().sum()),
+            'updated': self.apply(hierarchy),
+            'closure': self.rebuild_closure()
+        }
+        self.logger.info(
+            f"🌳 dim_tag: {result['with_parent']} tags con padre (nivel máximo "
+            f"{hierarchy['level'].max() if len(hierarchy) else 0}), {result['updated']} actualizados; "
+            f"tag_closure: {result['closure']} pares"
+        )
+        return result
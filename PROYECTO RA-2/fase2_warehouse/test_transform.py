@@ -0,0 +1,73 @@
+"""
+Pruebas de la transformación columnar (transform.py)
+
+Uso:
+    python -m pytest fase2_warehouse/test_transform.py
+"""
+import sys
+import os
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from fase2_warehouse.transform import (
+    NUMERIC_MAX, complete_mapping, transform, as_text, numeric, source, const
+)
+
+
+def test_as_text_drops_float_suffix():
+    """Los ids float enteros de CSV se cargan sin '.0'; los nulos quedan nulos"""
+    df = pd.DataFrame({'id': [12.0, 7.0, None]})
+    assert as_text('id')(df).tolist()[:2] == ['12', '7']
+    assert pd.isna(as_text('id')(df).iloc[2])
+
+
+def test_as_text_keeps_text_and_blank_is_null():
+    df = pd.DataFrame({'id': ['0xabc', '  ', '42']})
+    values = as_text('id')(df)
+    assert values.iloc[0] == '0xabc'
+    assert pd.isna(values.iloc[1])
+    assert values.iloc[2] == '42'
+
+
+def test_as_text_missing_column_is_null():
+    df = pd.DataFrame({'other': [1, 2]})
+    assert as_text('id')(df).isna().all()
+
+
+def test_numeric_max_abs_nulls_overflow():
+    """Valores fuera de NUMERIC(20, 10) pasan a nulo; los no numéricos también"""
+    df = pd.DataFrame({'volume': ['1.5', str(NUMERIC_MAX), str(-NUMERIC_MAX * 2), 'abc', None]})
+    values = numeric('volume', max_abs=NUMERIC_MAX)(df)
+    assert values.iloc[0] == 1.5
+    assert values.iloc[1:].isna().all()
+
+
+def test_numeric_without_max_abs_keeps_large_values():
+    df = pd.DataFrame({'volume': [NUMERIC_MAX * 10]})
+    assert numeric('volume')(df).iloc[0] == NUMERIC_MAX * 10
+
+
+def test_complete_mapping_fills_defaults_and_nulls():
+    """Las columnas sin expresión toman su default o nulo, en el orden destino"""
+    mapping = complete_mapping(
+        ['tag_id', 'label', 'level', 'parent_tag_id'],
+        {'tag_id': as_text('id'), 'label': source('label')},
+        defaults={'level': 1}
+    )
+    assert [col for col, _ in mapping] == ['tag_id', 'label', 'level', 'parent_tag_id']
+
+    frame = transform(pd.DataFrame({'id': [3.0], 'label': ['Crypto']}), mapping)
+    assert frame.iloc[0].tolist() == ['3', 'Crypto', 1, None]
+
+
+def test_transform_returns_python_values():
+    """Nulos como None y tipos de Python (listos para COPY)"""
+    df = pd.DataFrame({'id': [1.0, None], 'liquidity': ['10', '']})
+    frame = transform(df, [
+        ('market_id', as_text('id')),
+        ('liquidity', numeric('liquidity')),
+        ('level', const(1)),
+    ])
+    assert frame.iloc[0].tolist() == ['1', 10.0, 1]
+    assert frame.iloc[1].tolist() == [None, None, 1]
@@ -0,0 +1,110 @@
+"""
+Dimensión de tiempo generada en el servidor
+Las fechas y sus atributos de calendario se calculan con generate_series en
+una sola sentencia INSERT ... SELECT (sin construir filas en Python). La
+dimensión se extiende bajo demanda para cubrir el rango de fechas de los
+datos que se van a cargar; las fechas ya existentes no se tocan.
+"""
+from datetime import date
+from typing import List, Optional, Union
+
+from fase2_warehouse.etl_config import DIM_TIME_CONFIG
+
+DateLike = Union[date, str]
+
+# Atributos de calendario de cada día d; mismos valores que la carga anterior
+# con pandas (nombres en inglés, day_of_week 0 = lunes, semana ISO)
+DIM_TIME_INSERT_SQL = """
+    INSERT INTO dim_time (
+        time_key, date_value, year, quarter, month, month_name, week_of_year,
+        day_of_month, day_of_week, day_name, is_weekend,
+        is_month_start, is_month_end, is_quarter_start, is_quarter_end,
+        is_year_start, is_year_end, fiscal_year, fiscal_quarter
+    )
+    SELECT
+        (EXTRACT(YEAR FROM d) * 10000 + EXTRACT(MONTH FROM d) * 100 + EXTRACT(DAY FROM d))::INTEGER,
+        d,
+        EXTRACT(YEAR FROM d)::INTEGER,
+        EXTRACT(QUARTER FROM d)::INTEGER,
+        EXTRACT(MONTH FROM d)::INTEGER,
+        to_char(d, 'FMMonth'),
+        EXTRACT(WEEK FROM d)::INTEGER,
+        EXTRACT(DAY FROM d)::INTEGER,
+        EXTRACT(ISODOW FROM d)::INTEGER - 1,
+        to_char(d, 'FMDay'),
+        EXTRACT(ISODOW FROM d) >= 6,
+        EXTRACT(DAY FROM d) = 1,
+        d = (date_trunc('month', d) + INTERVAL '1 month - 1 day')::DATE,
+        EXTRACT(DAY FROM d) = 1 AND EXTRACT(MONTH FROM d) IN (1, 4, 7, 10),
+        d = (date_trunc('month', d) + INTERVAL '1 month - 1 day')::DATE
+            AND EXTRACT(MONTH FROM d) IN (3, 6, 9, 12),
+        EXTRACT(DAY FROM d) = 1 AND EXTRACT(MONTH FROM d) = 1,
+        EXTRACT(DAY FROM d) = 31 AND EXTRACT(MONTH FROM d) = 12,
+        EXTRACT(YEAR FROM d)::INTEGER,
+        EXTRACT(QUARTER FROM d)::INTEGER
+    FROM (
+        SELECT g::DATE AS d
+        FROM ({bounds}) b,
+             generate_series(
+                 GREATEST(b.start_date, %(min_date)s::DATE),
+                 LEAST(b.end_date, %(max_date)s::DATE),
+                 INTERVAL '1 day'
+             ) g
+    ) days
+    ON CONFLICT (date_value) DO NOTHING
+"""
+
+# Rango por defecto: desde start_date hasta el fin del año actual + years_ahead
+DEFAULT_BOUNDS_SQL = """
+    SELECT COALESCE(%(start_date)s::DATE, %(config_start)s::DATE) AS start_date,
+           COALESCE(
+               %(end_date)s::DATE,
+               (date_trunc('year', CURRENT_DATE) + make_interval(years => %(years_ahead)s + 1) - INTERVAL '1 day')::DATE
+           ) AS end_date
+"""
+
+
+def _insert_days(conn, bounds: str, params: dict) -> int:
+    """Inserta los días del rango que devuelve bounds (start_date, end_date)"""
+    cursor = conn.cursor()
+    cursor.execute(
+        DIM_TIME_INSERT_SQL.format(bounds=bounds),
+        {**params, 'min_date': DIM_TIME_CONFIG['min_date'], 'max_date': DIM_TIME_CONFIG['max_date']}
+    )
+    count = cursor.rowcount
+    cursor.close()
+    return count
+
+
+def ensure_dim_time(conn, start_date: Optional[DateLike] = None, end_date: Optional[DateLike] = None) -> int:
+    """
+    Asegura que dim_time contiene todas las fechas del rango (sin commit)
+
+    Args:
+        conn: Conexión psycopg2
+        start_date: Primera fecha (None = DIM_TIME_CONFIG['start_date'])
+        end_date: Última fecha (None = fin del año actual + years_ahead)
+
+    Returns:
+        Fechas nuevas insertadas
+    """
+    return _insert_days(conn, DEFAULT_BOUNDS_SQL, {
+        'start_date': start_date,
+        'end_date': end_date,
+        'config_start': DIM_TIME_CONFIG['start_date'],
+        'years_ahead': DIM_TIME_CONFIG['years_ahead']
+    })
+
+
+def extend_dim_time_to(conn, table: str, date_columns: List[str]) -> int:
+    """
+    Extiende dim_time hasta cubrir las fechas mínima y máxima de las
+    columnas de una tabla (p.ej. la staging de hechos), en el servidor
+
+    Returns:
+        Fechas nuevas insertadas
+    """
+    minimum = ', '.join(f"MIN({col}::DATE)" for col in date_columns)
+    maximum = ', '.join(f"MAX({col}::DATE)" for col in date_columns)
+    bounds = f"SELECT LEAST({minimum}) AS start_date, GREATEST({maximum}) AS end_date FROM {table}"
+    return _insert_days(conn, bounds, {})
@@ -0,0 +1,251 @@
+"""
+Transformación columnar de DataFrames a registros del warehouse
+Sustituye los bucles df.iterrows() + clean_value() por operaciones
+vectorizadas de pandas: cada columna destino se calcula de una vez para
+todo el DataFrame (limpieza de nulos y strings vacíos, renombrado, tipos,
+extracción de JSON y recorte de valores fuera de rango).
+
+Un mapeo es una lista de (columna_destino, expresión), donde la expresión
+recibe el DataFrame de origen y retorna una Serie alineada con su índice:
+
+    MAPPING = [
+        ('market_id', as_text('id')),
+        ('liquidity', numeric('liquidity', max_abs=1e10)),
+        ('outcome_price_yes', list_item('outcomePrices', 0)),
+        ('level', const(1)),
+    ]
+    frame = transform(df, MAPPING)
+    for records in iter_record_batches(frame, 5000):
+        bulk.upsert(...)
+"""
+import ast
+import json
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+Expression = Callable[[pd.DataFrame], pd.Series]
+Mapping = List[Tuple[str, Expression]]
+
+# Tipos inferidos de columnas object sobre las que se puede usar .str
+TEXT_TYPES = ('string', 'mixed', 'mixed-integer')
+
+# Números dentro de un texto (para listas serializadas: '["0.52", "0.48"]')
+NUMBER_PATTERN = r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?'
+
+# Límite de NUMERIC(20, 10) y NUMERIC(30, 20): 10 dígitos enteros
+NUMERIC_MAX = 1e10
+
+TRUE_VALUES = {'true': True, '1': True, '1.0': True, 't': True, 'yes': True}
+FALSE_VALUES = {'false': False, '0': False, '0.0': False, 'f': False, 'no': False}
+
+
+def _expression(func: Expression, source: Optional[str] = None) -> Expression:
+    """Marca la columna de origen de una expresión (para benchmarks y trazas)"""
+    func.source = source
+    return func
+
+
+def column(df: pd.DataFrame, name: str) -> pd.Series:
+    """
+    Columna limpia: strings vacíos → nulo (nulos como NaN/None)
+
+    Si la columna no existe se retorna una serie de nulos, igual que
+    row.get(name) en los bucles por fila.
+    """
+    if name not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+
+    values = df[name]
+    is_text = pd.api.types.is_string_dtype(values) or values.dtype == object
+    if is_text and pd.api.types.infer_dtype(values, skipna=True) in TEXT_TYPES:
+        values = values.mask(values.str.strip().eq(''))
+    return values
+
+
+def _to_float(values: pd.Series) -> pd.Series:
+    """Numérico float64 (valores no numéricos → NaN)"""
+    return pd.to_numeric(values, errors='coerce').astype(float)
+
+
+def source(name: str) -> Expression:
+    """Valor de la columna de origen sin conversión de tipo"""
+    return _expression(lambda df: column(df, name), name)
+
+
+def const(value) -> Expression:
+    """Valor constante para todas las filas"""
+    return _expression(lambda df: pd.Series([value] * len(df), index=df.index, dtype=object))
+
+
+def as_text(name: str) -> Expression:
+    """Identificador como texto (los float enteros de CSV pierden el '.0')"""
+    def expr(df):
+        values = column(df, name)
+        if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            values = values.astype('Int64')
+        return values.astype(str).where(values.notna())
+    return _expression(expr, name)
+
+
+def as_int(name: str) -> Expression:
+    """Entero (valores no numéricos → nulo)"""
+    return _expression(lambda df: _to_float(column(df, name)).round().astype('Int64'), name)
+
+
+def numeric(name: str, max_abs: Optional[float] = None) -> Expression:
+    """
+    Numérico; con max_abs, los valores con |x| >= max_abs pasan a nulo
+    (evita overflow en columnas NUMERIC(p, s))
+    """
+    def expr(df):
+        values = _to_float(column(df, name))
+        if max_abs is not None:
+            values = values.where(values.abs() < max_abs)
+        return values
+    return _expression(expr, name)
+
+
+def boolean(name: str) -> Expression:
+    """Booleano desde bool o texto ('true'/'false', '1'/'0'...)"""
+    def expr(df):
+        values = column(df, name)
+        if pd.api.types.is_bool_dtype(values):
+            return values
+        text = values.astype(str).str.strip().str.lower()
+        return text.map({**TRUE_VALUES, **FALSE_VALUES}).where(values.notna())
+    return _expression(expr, name)
+
+
+def as_date(name: str) -> Expression:
+    """Fecha (día) de un timestamp o texto"""
+    def expr(df):
+        values = pd.to_datetime(column(df, name), errors='coerce', utc=True, format='mixed')
+        return values.dt.date.where(values.notna())
+    return _expression(expr, name)
+
+
+def prefixed(prefix: str, name: str) -> Expression:
+    """Texto con prefijo (p.ej. path '/slug'); nulo si el origen es nulo"""
+    def expr(df):
+        values = column(df, name)
+        return (prefix + values.astype(str)).where(values.notna())
+    return _expression(expr, name)
+
+
+def parse_json(value):
+    """Parsea JSON tolerante (comillas simples o repr de Python)"""
+    for parse in (json.loads, lambda v: json.loads(v.replace("'", '"')), ast.literal_eval):
+        try:
+            return parse(value)
+        except Exception:
+            continue
+    return None
+
+
+def _map_unique(values: pd.Series, func: Callable) -> pd.Series:
+    """Aplica func una sola vez por valor distinto (no nulo) de la serie"""
+    valid = values.notna()
+    text = values[valid].astype(str)
+    mapping = {value: func(value) for value in text.unique()}
+    return text.map(mapping).reindex(values.index)
+
+
+def parsed_json(name: str) -> Expression:
+    """
+    Objetos Python (listas, diccionarios) de una columna JSON; los textos se
+    parsean una vez por valor distinto y los valores nativos se conservan
+    """
+    def expr(df):
+        values = column(df, name)
+        is_text = values.map(lambda value: isinstance(value, str))
+        return values.astype(object).mask(is_text, _map_unique(values[is_text], parse_json))
+    return _expression(expr, name)
+
+
+def json_text(name: str) -> Expression:
+    """
+    JSON normalizado como texto (para columnas JSONB); listas o
+    diccionarios vacíos e inválidos → nulo
+    """
+    def to_json(value):
+        parsed = parse_json(value)
+        return json.dumps(parsed) if parsed else None
+    return _expression(lambda df: _map_unique(column(df, name), to_json), name)
+
+
+def list_item(name: str, index: int, max_abs: Optional[float] = None) -> Expression:
+    """
+    Elemento numérico de una lista serializada o nativa (p.ej. outcomePrices)
+
+    Los números se extraen con una expresión regular vectorizada en lugar
+    de parsear el JSON de cada fila.
+    """
+    def expr(df):
+        values = column(df, name)
+        items = values.astype(str).str.findall(NUMBER_PATTERN).str.get(index)
+        numbers = _to_float(items).where(values.notna())
+        if max_abs is not None:
+            numbers = numbers.where(numbers.abs() < max_abs)
+        return numbers
+    return _expression(expr, name)
+
+
+def date_keys(values: pd.Series) -> pd.Series:
+    """
+    Clave yyyymmdd (time_key de dim_time) de cada fecha de una serie
+
+    Acepta date, timestamps o texto; los valores que no son fecha → nulo.
+    """
+    dates = pd.to_datetime(values, errors='coerce', utc=True, format='mixed')
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).astype('Int64')
+
+
+def date_key(value) -> Optional[int]:
+    """Clave yyyymmdd de una fecha (None si no es fecha)"""
+    key = date_keys(pd.Series([value], dtype=object)).iloc[0]
+    return None if pd.isna(key) else int(key)
+
+
+def complete_mapping(columns: List[str], expressions: dict, defaults: Optional[dict] = None) -> Mapping:
+    """
+    Mapeo para todas las columnas destino: las que no tienen expresión
+    toman su valor de defaults (o nulo)
+    """
+    defaults = defaults or {}
+    return [(col, expressions.get(col) or const(defaults.get(col))) for col in columns]
+
+
+def transform(df: pd.DataFrame, mapping: Mapping) -> pd.DataFrame:
+    """
+    Aplica un mapeo columnar a un DataFrame
+
+    Returns:
+        DataFrame con las columnas destino en orden, dtype object y None en
+        los nulos (tipos de Python, listo para COPY o execute_values)
+    """
+    frame = pd.DataFrame({target: expr(df) for target, expr in mapping}, index=df.index)
+    return python_values(frame)
+
+
+def python_values(frame: pd.DataFrame) -> pd.DataFrame:
+    """Convierte un DataFrame a dtype object con tipos de Python y None en los nulos"""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None)
+
+
+def to_records(frame: pd.DataFrame) -> List[tuple]:
+    """Filas del DataFrame transformado como tuplas"""
+    return list(frame.itertuples(index=False, name=None))
+
+
+def iter_record_batches(frame: pd.DataFrame, batch_size: int) -> Iterator[List[tuple]]:
+    """Lotes de tuplas de a lo sumo batch_size filas"""
+    for start in range(0, len(frame), batch_size):
+        yield to_records(frame.iloc[start:start + batch_size])
+
+
+def source_columns(mapping: Mapping) -> List[str]:
+    """Columnas de origen que usa un mapeo"""
+    return [expr.source for _, expr in mapping if getattr(expr, 'source', None)]
+
@@ -7,6 +7,24 @@ from contextlib import contextmanager
 from typing import Generator
 from config import settings
 
+# fact_market_metrics guarda un snapshot por mercado y día: las métricas
+# "actuales" de un mercado son las de su último snapshot (con
+# --skip-unchanged puede ser de un día anterior). Cada snapshot apunta a la
+# versión (SCD2) del mercado vigente cuando se cargó, así que se busca entre
+# todas las versiones del market_id y se toma una sola fila. Se usa tras
+# "FROM dim_market m" y expone la fila como f.
+LATEST_METRICS_JOIN = """
+    LEFT JOIN LATERAL (
+        SELECT lf.*
+        FROM fact_market_metrics lf
+        WHERE lf.market_key IN (
+            SELECT mv.market_key FROM dim_market mv WHERE mv.market_id = m.market_id
+        )
+        ORDER BY lf.snapshot_date_key DESC
+        LIMIT 1
+    ) f ON TRUE
+"""
+
 @contextmanager
 def get_db_connection() -> Generator:
     """
@@ -7,7 +7,7 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 
 from models import CategoryStats, VolumeTrend
-from database import execute_query
+from database import execute_query, LATEST_METRICS_JOIN
 
 router = APIRouter(
     prefix="/analytics",
@@ -25,6 +25,9 @@ async def get_category_statistics(
     Retorna métricas clave por categoría: número de mercados, volumen total,
     volumen promedio y liquidez. Ordenado por volumen total descendente.
     Útil para identificar las categorías más activas.
+    
+    Se agrega el último snapshot de cada mercado: sumar todo el histórico de
+    fact_market_metrics haría crecer los totales con cada carga.
     """
     
     query = """
@@ -36,7 +39,7 @@ async def get_category_statistics(
         COALESCE(AVG(f.volume), 0) as avg_volume,
         COALESCE(SUM(f.liquidity), 0) as total_liquidity
     FROM dim_market m
-    LEFT JOIN fact_market_metrics f ON m.market_key = f.market_key
+    """ + LATEST_METRICS_JOIN + """
     WHERE m.is_current = TRUE
         AND m.category IS NOT NULL
     GROUP BY m.category
@@ -64,6 +67,8 @@ async def get_volume_trends(
     Útil para analizar la evolución de la actividad en la plataforma.
     """
     
+    # El filtro directo sobre snapshot_date_key limita la lectura a las
+    # particiones mensuales del rango (partition pruning)
     query = """
     SELECT 
         TO_CHAR(t.date_value, 'YYYY-MM-DD') as date,
@@ -76,16 +81,19 @@ async def get_volume_trends(
         END as avg_volume_per_market
     FROM dim_time t
     LEFT JOIN fact_market_metrics f ON t.time_key = f.snapshot_date_key
+        AND f.snapshot_date_key >= TO_CHAR(CURRENT_DATE - %s, 'YYYYMMDD')::INTEGER
     """
     
-    params = []
+    params = [days]
     
     if category:
+        # Categoría de la versión vigente, resuelta por market_id: cada
+        # snapshot apunta a la versión (SCD2) vigente cuando se cargó
         query += """
-        LEFT JOIN dim_market m ON f.market_key = m.market_key
+        LEFT JOIN dim_market mv ON f.market_key = mv.market_key
+        LEFT JOIN dim_market m ON m.market_id = mv.market_id AND m.is_current = TRUE
         WHERE t.date_value >= CURRENT_DATE - INTERVAL '%s days'
             AND m.category = %s
-            AND m.is_current = TRUE
         """
         params.extend([days, category])
     else:
@@ -113,8 +121,9 @@ async def get_top_categories_by_liquidity(
     """
     Obtiene las categorías con mayor liquidez total
     
-    Retorna las categorías ordenadas por liquidez total, útil para identificar
-    dónde se concentra el capital en la plataforma.
+    Retorna las categorías ordenadas por liquidez total (último snapshot de
+    cada mercado), útil para identificar dónde se concentra el capital en la
+    plataforma.
     """
     
     query = """
@@ -124,7 +133,7 @@ async def get_top_categories_by_liquidity(
         COUNT(DISTINCT m.market_key) as total_markets,
         COALESCE(AVG(f.liquidity), 0) as avg_liquidity
     FROM dim_market m
-    LEFT JOIN fact_market_metrics f ON m.market_key = f.market_key
+    """ + LATEST_METRICS_JOIN + """
     WHERE m.is_current = TRUE
         AND m.category IS NOT NULL
     GROUP BY m.category
@@ -146,6 +155,7 @@ async def get_market_metrics_summary():
     
     Retorna estadísticas globales: total de mercados, mercados activos,
     volumen total, liquidez total, y promedios. Útil para dashboard general.
+    Volumen y liquidez salen del último snapshot de cada mercado.
     """
     
     query = """
@@ -159,7 +169,7 @@ async def get_market_metrics_summary():
         COALESCE(AVG(f.liquidity), 0) as avg_liquidity,
         COUNT(DISTINCT m.category) as total_categories
     FROM dim_market m
-    LEFT JOIN fact_market_metrics f ON m.market_key = f.market_key
+    """ + LATEST_METRICS_JOIN + """
     WHERE m.is_current = TRUE
     """
     
@@ -191,7 +201,7 @@ async def get_trending_markets(
         f.outcome_price_yes,
         m.active
     FROM dim_market m
-    LEFT JOIN fact_market_metrics f ON m.market_key = f.market_key
+    """ + LATEST_METRICS_JOIN + """
     WHERE m.is_current = TRUE
         AND m.active = TRUE
     ORDER BY COALESCE(f.volume_24hr, 0) DESC
@@ -16,7 +16,7 @@ from models import (
     MarketMetrics,
     PaginatedResponse
 )
-from database import execute_query, execute_single_query
+from database import execute_query, execute_single_query, LATEST_METRICS_JOIN
 
 router = APIRouter(
     prefix="/markets",
@@ -46,7 +46,7 @@ async def get_top_volume_markets(
         COALESCE(f.liquidity, 0) as liquidity,
         f.outcome_price_yes
     FROM dim_market m
-    LEFT JOIN fact_market_metrics f ON m.market_key = f.market_key
+    """ + LATEST_METRICS_JOIN + """
     WHERE m.is_current = TRUE
         AND m.active = TRUE
     """
@@ -96,7 +96,7 @@ async def get_closing_soon_markets(
         f.outcome_price_yes,
         m.active
     FROM dim_market m
-    LEFT JOIN fact_market_metrics f ON m.market_key = f.market_key
+    """ + LATEST_METRICS_JOIN + """
     WHERE m.is_current = TRUE
         AND m.active = TRUE
         AND m.end_date IS NOT NULL
@@ -117,7 +117,8 @@ async def get_market_detail(market_id: str):
     """
     Obtiene los detalles completos de un mercado específico
     
-    Incluye información del mercado, configuración, fechas y métricas actuales.
+    Incluye información del mercado, configuración, fechas y métricas de su
+    último snapshot.
     """
     
     query = """
@@ -145,7 +146,7 @@ async def get_market_detail(market_id: str):
         f.last_trade_price,
         f.spread
     FROM dim_market m
-    LEFT JOIN fact_market_metrics f ON m.market_key = f.market_key
+    """ + LATEST_METRICS_JOIN + """
     WHERE m.market_id = %s
         AND m.is_current = TRUE
     """
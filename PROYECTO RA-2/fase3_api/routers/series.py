@@ -84,8 +84,22 @@ async def get_series_markets(
     
     series_data = dict(series_result)
     
-    # Ahora obtener los mercados de la serie
-    markets_query = """
+    # Mercados con hechos en la serie, por market_id: los snapshots antiguos
+    # apuntan a versiones anteriores (SCD2) del mercado
+    series_markets = """
+    WITH series_markets AS (
+        SELECT DISTINCT m.market_id
+        FROM fact_market_metrics f
+        INNER JOIN dim_market m ON f.market_key = m.market_key
+        INNER JOIN dim_event e ON f.event_key = e.event_key
+        WHERE e.series_slug = (
+            SELECT slug FROM dim_series WHERE series_id = %s AND is_current = TRUE
+        )
+    )
+    """
+    
+    # Ahora obtener los mercados de la serie (versión vigente)
+    markets_query = series_markets + """
     SELECT 
         m.market_id,
         m.question,
@@ -95,12 +109,8 @@ async def get_series_markets(
         m.active,
         m.closed
     FROM dim_market m
-    INNER JOIN fact_market_metrics f ON m.market_key = f.market_key
-    INNER JOIN dim_event e ON f.event_key = e.event_key
-    WHERE e.series_slug = (
-        SELECT slug FROM dim_series WHERE series_id = %s AND is_current = TRUE
-    )
-    AND m.is_current = TRUE
+    WHERE m.market_id IN (SELECT market_id FROM series_markets)
+        AND m.is_current = TRUE
     """
     
     params = [series_id]
@@ -117,15 +127,11 @@ async def get_series_markets(
     markets_results = execute_query(markets_query, tuple(params))
     
     # Contar total de mercados
-    count_query = """
+    count_query = series_markets + """
     SELECT COUNT(DISTINCT m.market_key) as total
     FROM dim_market m
-    INNER JOIN fact_market_metrics f ON m.market_key = f.market_key
-    INNER JOIN dim_event e ON f.event_key = e.event_key
-    WHERE e.series_slug = (
-        SELECT slug FROM dim_series WHERE series_id = %s AND is_current = TRUE
-    )
-    AND m.is_current = TRUE
+    WHERE m.market_id IN (SELECT market_id FROM series_markets)
+        AND m.is_current = TRUE
     """
     
     count_params = [series_id]
@@ -151,6 +157,11 @@ async def get_series_probability_evolution(
     
     Retorna la probabilidad implícita promedio (outcome_price_yes) de todos los mercados
     de la serie a lo largo del tiempo. Útil para analizar tendencias en series recurrentes.
+    
+    Los filtros sobre snapshot_date_key limitan la lectura de fact_market_metrics
+    a las particiones mensuales del rango (partition pruning). Los mercados se
+    cuentan por market_id: cada snapshot apunta a la versión (SCD2) del mercado
+    vigente cuando se cargó.
     """
     
     # Verificar que la serie existe
@@ -164,28 +175,28 @@ async def get_series_probability_evolution(
     
     query = """
     WITH series_markets AS (
-        SELECT DISTINCT m.market_key
-        FROM dim_market m
-        INNER JOIN fact_market_metrics f ON m.market_key = f.market_key
+        SELECT DISTINCT f.market_key
+        FROM fact_market_metrics f
         INNER JOIN dim_event e ON f.event_key = e.event_key
         WHERE e.series_slug = (
             SELECT slug FROM dim_series WHERE series_id = %s AND is_current = TRUE
         )
-        AND m.is_current = TRUE
+        AND f.snapshot_date_key >= TO_CHAR(CURRENT_DATE - %s, 'YYYYMMDD')::INTEGER
     )
     SELECT 
         TO_CHAR(t.date_value, 'YYYY-MM-DD') as date,
         AVG(f.outcome_price_yes) as avg_probability_yes,
-        COUNT(DISTINCT f.market_key) as market_count
+        COUNT(DISTINCT m.market_id) as market_count
     FROM fact_market_metrics f
     INNER JOIN dim_time t ON f.snapshot_date_key = t.time_key
+    INNER JOIN dim_market m ON f.market_key = m.market_key
     WHERE f.market_key IN (SELECT market_key FROM series_markets)
-        AND t.date_value >= CURRENT_DATE - INTERVAL '%s days'
+        AND f.snapshot_date_key >= TO_CHAR(CURRENT_DATE - %s, 'YYYYMMDD')::INTEGER
     GROUP BY t.date_value
     ORDER BY t.date_value ASC
     """
     
-    results = execute_query(query, (series_id, days))
+    results = execute_query(query, (series_id, days, days))
     
     if not results:
         return []
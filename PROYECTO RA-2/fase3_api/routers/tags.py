@@ -84,6 +84,7 @@ async def get_tag_detail(tag_id: str):
 async def get_tag_markets(
     tag_id: str,
     active_only: bool = Query(default=True, description="Solo mercados activos"),
+    include_subtags: bool = Query(default=False, description="Incluir mercados de los subtags"),
     limit: int = Query(default=50, ge=1, le=200, description="Número de mercados a retornar")
 ):
     """
@@ -91,6 +92,7 @@ async def get_tag_markets(
     
     Retorna los detalles del tag junto con todos los mercados que están etiquetados con él.
     Útil para explorar todos los mercados de una categoría específica (ej: todos los mercados de crypto).
+    Con include_subtags también se incluyen los mercados de sus descendientes (vía tag_closure).
     """
     
     # Primero obtener el tag
@@ -115,8 +117,27 @@ async def get_tag_markets(
     
     tag_data = dict(tag_result)
     
+    # Mercados del tag (y de sus descendientes con include_subtags)
+    if include_subtags:
+        tag_markets = """
+        SELECT bmt.market_key
+        FROM dim_tag t
+        INNER JOIN tag_closure tc ON tc.ancestor_key = t.tag_key
+        INNER JOIN bridge_market_tag bmt ON bmt.tag_key = tc.descendant_key
+        WHERE t.tag_id = %s
+            AND t.is_current = TRUE
+        """
+    else:
+        tag_markets = """
+        SELECT bmt.market_key
+        FROM bridge_market_tag bmt
+        INNER JOIN dim_tag t ON bmt.tag_key = t.tag_key
+        WHERE t.tag_id = %s
+            AND t.is_current = TRUE
+        """
+    
     # Ahora obtener los mercados del tag
-    markets_query = """
+    markets_query = f"""
     SELECT 
         m.market_id,
         m.question,
@@ -126,10 +147,7 @@ async def get_tag_markets(
         m.active,
         m.closed
     FROM dim_market m
-    INNER JOIN bridge_market_tag bmt ON m.market_key = bmt.market_key
-    INNER JOIN dim_tag t ON bmt.tag_key = t.tag_key
-    WHERE t.tag_id = %s
-        AND t.is_current = TRUE
+    WHERE m.market_key IN ({tag_markets})
         AND m.is_current = TRUE
     """
     
@@ -147,13 +165,10 @@ async def get_tag_markets(
     markets_results = execute_query(markets_query, tuple(params))
     
     # Contar total de mercados
-    count_query = """
-    SELECT COUNT(DISTINCT m.market_key) as total
+    count_query = f"""
+    SELECT COUNT(*) as total
     FROM dim_market m
-    INNER JOIN bridge_market_tag bmt ON m.market_key = bmt.market_key
-    INNER JOIN dim_tag t ON bmt.tag_key = t.tag_key
-    WHERE t.tag_id = %s
-        AND t.is_current = TRUE
+    WHERE m.market_key IN ({tag_markets})
         AND m.is_current = TRUE
     """
     